@@ -0,0 +1,106 @@
+# coding=utf-8
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from core.base import IMarketAdapter
+from utils.logger import default_logger as logger
+
+try:
+    from gm import api as gm_api
+except ImportError:
+    gm_api = None
+
+
+class GMAdapter(IMarketAdapter):
+    """掘金量化平台适配器，直接转发到gm.api"""
+
+    def __init__(self, config):
+        if gm_api is None:
+            raise ImportError("未安装掘金量化SDK(gm)，请执行 pip install gm 或改用replay适配器")
+        self.config = config
+
+    def history(self, symbol, frequency: str, start_time, end_time, fields: str = None,
+                skip_suspended: bool = True, fill_missing: str = None, df: bool = True):
+        return gm_api.history(
+            symbol=symbol,
+            frequency=frequency,
+            start_time=start_time,
+            end_time=end_time,
+            fields=fields,
+            skip_suspended=skip_suspended,
+            fill_missing=fill_missing,
+            df=df
+        )
+
+    def current(self, symbols, fields: str = '') -> List[Dict[str, Any]]:
+        return gm_api.current(symbols=symbols, fields=fields)
+
+    def order_volume(self, symbol: str, volume: int, side: int, order_type: int,
+                     position_effect: int, price: float = 0) -> List[Dict[str, Any]]:
+        return gm_api.order_volume(
+            symbol=symbol,
+            volume=volume,
+            side=side,
+            order_type=order_type,
+            position_effect=position_effect,
+            price=price
+        )
+
+    def order_target_percent(self, symbol: str, percent: float, position_side: int, order_type: int,
+                             price: float = 0) -> List[Dict[str, Any]]:
+        return gm_api.order_target_percent(
+            symbol=symbol,
+            percent=percent,
+            position_side=position_side,
+            order_type=order_type,
+            price=price
+        )
+
+    def subscribe(self, symbols, frequency: str = '1d', count: int = 1, unsubscribe_previous: bool = False):
+        gm_api.subscribe(symbols=symbols, frequency=frequency, count=count,
+                         unsubscribe_previous=unsubscribe_previous)
+
+    def unsubscribe(self, symbols, frequency: str = '1d'):
+        gm_api.unsubscribe(symbols=symbols, frequency=frequency)
+
+    def schedule(self, schedule_func, date_rule: str, time_rule: str):
+        gm_api.schedule(schedule_func=schedule_func, date_rule=date_rule, time_rule=time_rule)
+
+    def get_instrumentinfos(self, symbols=None, exchanges=None, sec_types=None, fields: str = None,
+                            df: bool = False):
+        return gm_api.get_instrumentinfos(symbols=symbols, exchanges=exchanges, sec_types=sec_types,
+                                          fields=fields, df=df)
+
+    def stk_get_index_constituents(self, index: str, trade_date: str = None) -> pd.DataFrame:
+        if trade_date is None:
+            return gm_api.stk_get_index_constituents(index=index)
+        return gm_api.stk_get_index_constituents(index=index, trade_date=trade_date)
+
+    def run(self, callbacks):
+        """通过掘金终端运行策略，掘金按filename加载策略文件中的回调函数"""
+        config = self.config
+        if config.mode == 'BACKTEST':
+            run_params = {
+                'strategy_id': config.strategy_id,
+                'filename': "main.py",
+                'mode': gm_api.MODE_BACKTEST,
+                'token': config.token,
+                'backtest_start_time': config.backtest_start,
+                'backtest_end_time': config.backtest_end,
+                'backtest_initial_cash': config.initial_cash,
+                'backtest_commission_ratio': config.commission_ratio,
+                'backtest_slippage_ratio': config.slippage_ratio
+            }
+            # 添加可选参数
+            if hasattr(config, 'backtest_transaction_ratio'):
+                run_params['backtest_transaction_ratio'] = config.backtest_transaction_ratio
+            logger.info(f"回测参数: {run_params}")
+            gm_api.run(**run_params)
+        else:
+            gm_api.run(
+                strategy_id=config.strategy_id,
+                filename="main.py",
+                mode=gm_api.MODE_LIVE,
+                token=config.token
+            )
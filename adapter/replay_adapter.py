@@ -0,0 +1,434 @@
+# coding=utf-8
+import glob
+import os
+from datetime import datetime, time as dt_time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.base import IMarketAdapter
+from core.constants import (ExecType_Trade, OrderSide_Buy, OrderSide_Sell, OrderStatus_Filled,
+                            OrderStatus_Rejected, OrderType_Limit, PositionEffect_Close, PositionEffect_Open)
+from data.bar_store import TIMEZONE, eob_to_ns, from_ns, to_ns
+from utils.logger import default_logger as logger
+
+# 日线收盘时间，之前以当日开盘价作为现价，之后以收盘价作为现价
+MARKET_CLOSE = dt_time(15, 0)
+
+
+class ReplayCash(dict):
+    """资金信息，同时支持下标与属性访问（与gm一致）"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class ReplayAccount:
+    """回放账户"""
+
+    def __init__(self, adapter: 'ReplayAdapter', initial_cash: float):
+        self.adapter = adapter
+        self.available = initial_cash
+        self._positions: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def cash(self) -> ReplayCash:
+        nav = self.available + self.market_value()
+        return ReplayCash(available=self.available, nav=nav, pnl=nav - self.adapter.config.initial_cash)
+
+    def positions(self, symbol: str = None) -> List[Dict[str, Any]]:
+        """持仓列表，价格按当前时间刷新"""
+        result = []
+        for pos in self._positions.values():
+            if pos['volume'] <= 0 or (symbol is not None and pos['symbol'] != symbol):
+                continue
+            price = self.adapter.get_price(pos['symbol'])
+            if price is not None:
+                pos['price'] = price
+            result.append(dict(pos))
+        return result
+
+    def market_value(self) -> float:
+        total = 0.0
+        for pos in self._positions.values():
+            price = self.adapter.get_price(pos['symbol'])
+            total += pos['volume'] * (price if price is not None else pos['price'])
+        return total
+
+
+class ReplayContext:
+    """回放上下文，提供与gm context一致的now与account()"""
+
+    def __init__(self, adapter: 'ReplayAdapter', initial_cash: float):
+        self.now: Optional[datetime] = None
+        self.market_adapter = adapter
+        self._account = ReplayAccount(adapter, initial_cash)
+
+    def account(self) -> ReplayAccount:
+        return self._account
+
+
+class ReplayAdapter(IMarketAdapter):
+    """
+    离线回放适配器
+
+    从本地K线文件（{replay_data_dir}/{frequency}/{symbol}.csv 或 .parquet，
+    列为eob,open,high,low,close,volume,amount）提供history/current，
+    按日线价格模拟成交：收盘前以当日开盘价成交，收盘后以收盘价成交；
+    订阅了K线的标的在定时任务之间按eob推送on_bar，推送后以最新K线收盘价成交
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.data_dir = config.replay_data_dir
+        if not os.path.isabs(self.data_dir):
+            self.data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), self.data_dir)
+        self.context = ReplayContext(self, config.initial_cash)
+        self._bars: Dict[tuple, Optional[pd.DataFrame]] = {}
+        self._eobs: Dict[tuple, np.ndarray] = {}
+        self._schedules: List[tuple] = []
+        self._callbacks = None
+        self._order_id = 0
+        self._subscriptions: Dict[str, set] = {}
+        self._bar_prices: Dict[str, float] = {}  # 当日已推送K线的最新收盘价
+
+    # ---------------- 行情 ----------------
+    def _load(self, symbol: str, frequency: str) -> Optional[pd.DataFrame]:
+        key = (symbol, frequency)
+        if key not in self._bars:
+            data = None
+            base = os.path.join(self.data_dir, frequency, symbol)
+            if os.path.exists(base + '.parquet'):
+                data = pd.read_parquet(base + '.parquet')
+            elif os.path.exists(base + '.csv'):
+                data = pd.read_csv(base + '.csv')
+            if data is not None and not data.empty:
+                eob = pd.to_datetime(data['eob'])
+                data['eob'] = eob.dt.tz_localize(TIMEZONE) if eob.dt.tz is None else eob.dt.tz_convert(TIMEZONE)
+                data = data.sort_values('eob').reset_index(drop=True)
+                data.insert(0, 'symbol', symbol)
+                self._eobs[key] = eob_to_ns(data['eob'])
+            else:
+                data = None
+            self._bars[key] = data
+        return self._bars[key]
+
+    def available_symbols(self, frequency: str = '1d') -> List[str]:
+        """本地有K线文件的标的"""
+        files = glob.glob(os.path.join(self.data_dir, frequency, '*.csv'))
+        files += glob.glob(os.path.join(self.data_dir, frequency, '*.parquet'))
+        return sorted({os.path.splitext(os.path.basename(path))[0] for path in files})
+
+    def history(self, symbol, frequency: str, start_time, end_time, fields: str = None,
+                skip_suspended: bool = True, fill_missing: str = None, df: bool = True):
+        symbols = symbol.split(',') if isinstance(symbol, str) else list(symbol)
+        start_ns = to_ns(start_time)
+        end_ns = to_ns(end_time)
+        if self.context.now is not None:
+            # 与回测一致，不返回当前时间之后的K线
+            end_ns = min(end_ns, to_ns(self.context.now))
+        frames = []
+        for symbol_str in symbols:
+            data = self._load(symbol_str.strip(), frequency)
+            if data is None:
+                continue
+            eobs = self._eobs[(symbol_str.strip(), frequency)]
+            start = np.searchsorted(eobs, start_ns, side='left')
+            end = np.searchsorted(eobs, end_ns, side='right')
+            frames.append(data.iloc[start:end])
+        result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if fields and not result.empty:
+            columns = [field.strip() for field in fields.split(',') if field.strip() in result.columns]
+            result = result[columns]
+        return result if df else result.to_dict('records')
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        """当前时间的价格：当日K线收盘前取开盘价，收盘后取收盘价，当日无K线取最近收盘价"""
+        if symbol in self._bar_prices:
+            return self._bar_prices[symbol]
+        data = self._load(symbol, '1d')
+        if data is None or self.context.now is None:
+            return None
+        now = self.context.now
+        day_end = to_ns(datetime.combine(now.date(), dt_time(23, 59, 59)))
+        idx = int(np.searchsorted(self._eobs[(symbol, '1d')], day_end, side='right')) - 1
+        if idx < 0:
+            return None
+        if data['eob'].iat[idx].date() == now.date() and now.time() < MARKET_CLOSE:
+            return float(data['open'].iat[idx])
+        return float(data['close'].iat[idx])
+
+    def current(self, symbols, fields: str = '') -> List[Dict[str, Any]]:
+        symbol_list = symbols.split(',') if isinstance(symbols, str) else list(symbols)
+        result = []
+        for symbol in symbol_list:
+            symbol = symbol.strip()
+            price = self.get_price(symbol)
+            if price is None:
+                continue
+            result.append({
+                'symbol': symbol,
+                'price': price,
+                'open': price,
+                'high': price,
+                'low': price,
+                'volume': 0.0,
+                'amount': 0.0,
+                'created_at': self.context.now
+            })
+        return result
+
+    # ---------------- 交易 ----------------
+    def order_volume(self, symbol: str, volume: int, side: int, order_type: int,
+                     position_effect: int, price: float = 0) -> List[Dict[str, Any]]:
+        return [self._execute(symbol, int(volume), side, order_type, position_effect, price)]
+
+    def order_target_percent(self, symbol: str, percent: float, position_side: int, order_type: int,
+                             price: float = 0) -> List[Dict[str, Any]]:
+        quote = self.get_price(symbol)
+        account = self.context.account()
+        position = account._positions.get(symbol)
+        holding = position['volume'] if position else 0
+        if quote is None or quote <= 0:
+            return [self._execute(symbol, holding, OrderSide_Sell, order_type, PositionEffect_Close, price)]
+        target_volume = int(account.cash.nav * percent / quote / 100) * 100
+        if target_volume >= holding:
+            return [self._execute(symbol, target_volume - holding, OrderSide_Buy, order_type,
+                                  PositionEffect_Open, price)]
+        return [self._execute(symbol, holding - target_volume, OrderSide_Sell, order_type,
+                              PositionEffect_Close, price)]
+
+    def _execute(self, symbol: str, volume: int, side: int, order_type: int,
+                 position_effect: int, price: float) -> Dict[str, Any]:
+        """按当前价格模拟成交，成交时回调on_execution_report，并回调on_order_status"""
+        self._order_id += 1
+        account = self.context.account()
+        quote = self.get_price(symbol)
+        order = {
+            'cl_ord_id': f"replay-{self._order_id}",
+            'symbol': symbol,
+            'side': side,
+            'position_effect': position_effect,
+            'order_type': order_type,
+            'price': price or (quote or 0.0),
+            'volume': volume,
+            'value': volume * (price or quote or 0.0),
+            'status': OrderStatus_Filled,
+            'filled_volume': 0,
+            'filled_vwap': 0.0,
+            'filled_amount': 0.0,
+            'filled_commission': 0.0,
+            'created_at': self.context.now,
+            'updated_at': self.context.now,
+            'ord_rej_reason_detail': ''
+        }
+
+        reject_reason = ''
+        fill_price = 0.0
+        if quote is None or quote <= 0:
+            reject_reason = '无行情'
+        elif volume <= 0:
+            reject_reason = '委托数量为0'
+        else:
+            slippage = self.config.slippage_ratio
+            fill_price = quote * (1 + slippage) if side == OrderSide_Buy else quote * (1 - slippage)
+            if order_type == OrderType_Limit and price > 0:
+                if (side == OrderSide_Buy and price < quote) or (side == OrderSide_Sell and price > quote):
+                    reject_reason = '限价未成交'
+                else:
+                    fill_price = min(fill_price, price) if side == OrderSide_Buy else max(fill_price, price)
+            if side == OrderSide_Buy:
+                volume = int(volume * self.config.backtest_transaction_ratio / 100) * 100
+            else:
+                position = account._positions.get(symbol)
+                volume = min(volume, position['volume'] if position else 0)
+            if not reject_reason and volume <= 0:
+                reject_reason = '可成交数量为0'
+
+        if not reject_reason:
+            amount = fill_price * volume
+            commission = amount * self.config.commission_ratio
+            if side == OrderSide_Buy:
+                if amount + commission > account.available:
+                    reject_reason = '可用资金不足'
+                else:
+                    account.available -= amount + commission
+                    position = account._positions.setdefault(symbol, {
+                        'symbol': symbol, 'volume': 0, 'vwap': 0.0, 'price': fill_price,
+                        'created_at': self.context.now, 'updated_at': self.context.now
+                    })
+                    total_volume = position['volume'] + volume
+                    position['vwap'] = (position['vwap'] * position['volume'] + amount) / total_volume
+                    position['volume'] = total_volume
+                    position['price'] = fill_price
+                    position['updated_at'] = self.context.now
+            else:
+                account.available += amount - commission
+                position = account._positions[symbol]
+                position['volume'] -= volume
+                position['price'] = fill_price
+                position['updated_at'] = self.context.now
+                if position['volume'] <= 0:
+                    del account._positions[symbol]
+
+        if reject_reason:
+            order['status'] = OrderStatus_Rejected
+            order['ord_rej_reason_detail'] = reject_reason
+        else:
+            order['filled_volume'] = volume
+            order['filled_vwap'] = fill_price
+            order['filled_amount'] = fill_price * volume
+            order['filled_commission'] = fill_price * volume * self.config.commission_ratio
+            if self._callbacks is not None and hasattr(self._callbacks, 'on_execution_report'):
+                self._callbacks.on_execution_report(self.context, {
+                    'cl_ord_id': order['cl_ord_id'],
+                    'exec_id': f"replay-exec-{self._order_id}",
+                    'symbol': symbol,
+                    'side': side,
+                    'position_effect': position_effect,
+                    'exec_type': ExecType_Trade,
+                    'price': fill_price,
+                    'volume': volume,
+                    'amount': amount,
+                    'commission': commission,
+                    'created_at': self.context.now
+                })
+        if self._callbacks is not None and hasattr(self._callbacks, 'on_order_status'):
+            self._callbacks.on_order_status(self.context, order)
+        return order
+
+    # ---------------- 基础数据 ----------------
+    def get_instrumentinfos(self, symbols=None, exchanges=None, sec_types=None, fields: str = None,
+                            df: bool = False):
+        path = os.path.join(self.data_dir, 'instruments.csv')
+        if os.path.exists(path):
+            data = pd.read_csv(path, dtype=str).fillna('')
+        else:
+            all_symbols = self.available_symbols()
+            data = pd.DataFrame({'symbol': all_symbols, 'sec_name': all_symbols})
+        if symbols:
+            wanted = symbols.split(',') if isinstance(symbols, str) else list(symbols)
+            data = data[data['symbol'].isin(wanted)]
+        if exchanges:
+            prefixes = tuple(exchanges.split(',') if isinstance(exchanges, str) else exchanges)
+            data = data[data['symbol'].str.startswith(prefixes)]
+        if fields:
+            data = data[[field.strip() for field in fields.split(',') if field.strip() in data.columns]]
+        data = data.reset_index(drop=True)
+        return data if df else data.to_dict('records')
+
+    def stk_get_index_constituents(self, index: str, trade_date: str = None) -> pd.DataFrame:
+        """本地成分股文件{replay_data_dir}/constituents/{index}.csv，缺省时以全部本地标的作为成分股"""
+        path = os.path.join(self.data_dir, 'constituents', f"{index}.csv")
+        if os.path.exists(path):
+            data = pd.read_csv(path, dtype=str)
+            if trade_date is not None and 'trade_date' in data.columns:
+                dates = data.loc[data['trade_date'] <= trade_date, 'trade_date']
+                if dates.empty:
+                    return pd.DataFrame(columns=['symbol'])
+                data = data[data['trade_date'] == dates.max()]
+            return data.reset_index(drop=True)
+        return pd.DataFrame({'symbol': self.available_symbols()})
+
+    # ---------------- 运行 ----------------
+    def subscribe(self, symbols, frequency: str = '1d', count: int = 1, unsubscribe_previous: bool = False):
+        symbol_list = symbols.split(',') if isinstance(symbols, str) else list(symbols)
+        if unsubscribe_previous:
+            self._subscriptions.clear()
+        self._subscriptions.setdefault(frequency, set()).update(symbol.strip() for symbol in symbol_list)
+
+    def unsubscribe(self, symbols, frequency: str = '1d'):
+        symbol_list = symbols.split(',') if isinstance(symbols, str) else list(symbols)
+        self._subscriptions.get(frequency, set()).difference_update(symbol.strip() for symbol in symbol_list)
+
+    def schedule(self, schedule_func, date_rule: str, time_rule: str):
+        self._schedules.append((time_rule, schedule_func))
+        self._schedules.sort(key=lambda item: item[0])
+
+    def run(self, callbacks):
+        """按交易日依次执行定时任务，结束时回调on_backtest_finished"""
+        self._callbacks = callbacks
+        start = pd.Timestamp(self.config.backtest_start).tz_localize(TIMEZONE)
+        end = pd.Timestamp(self.config.backtest_end).tz_localize(TIMEZONE)
+        trade_dates = set()
+        for symbol in self.available_symbols():
+            data = self._load(symbol, '1d')
+            if data is not None:
+                eob = data['eob']
+                trade_dates.update(eob[(eob >= start) & (eob <= end)].dt.date)
+        trade_dates = sorted(trade_dates)
+        if not trade_dates:
+            logger.warning(f"回放数据目录无可用日线: {self.data_dir}")
+            return
+
+        self.context.now = start.to_pydatetime()
+        callbacks.init(self.context)
+        equity = []
+        for trade_date in trade_dates:
+            self._bar_prices = {}
+            last_ns = to_ns(datetime.combine(trade_date, dt_time(0, 0)))
+            for time_rule, func in self._schedules:
+                run_time = datetime.strptime(time_rule, '%H:%M:%S').time()
+                run_ns = to_ns(datetime.combine(trade_date, run_time))
+                self._push_bars(last_ns, run_ns)
+                last_ns = run_ns
+                self.context.now = pd.Timestamp(datetime.combine(trade_date, run_time)).tz_localize(TIMEZONE).to_pydatetime()
+                func(self.context)
+            self._push_bars(last_ns, to_ns(datetime.combine(trade_date, dt_time(23, 59, 59))))
+            self.context.now = pd.Timestamp(datetime.combine(trade_date, MARKET_CLOSE)).tz_localize(TIMEZONE).to_pydatetime()
+            equity.append(self.context.account().cash.nav)
+
+        if hasattr(callbacks, 'on_backtest_finished'):
+            callbacks.on_backtest_finished(self.context, self._indicator(equity))
+
+    def _push_bars(self, start_ns: int, end_ns: int):
+        """按eob顺序推送已订阅标的在 (start_ns, end_ns] 内的K线，同一时刻的K线一次推送"""
+        if not hasattr(self._callbacks, 'on_bar'):
+            return
+        events: Dict[int, List[Dict[str, Any]]] = {}
+        for frequency, symbols in self._subscriptions.items():
+            for symbol in symbols:
+                data = self._load(symbol, frequency)
+                if data is None:
+                    continue
+                eobs = self._eobs[(symbol, frequency)]
+                start = int(np.searchsorted(eobs, start_ns, side='right'))
+                end = int(np.searchsorted(eobs, end_ns, side='right'))
+                for idx in range(start, end):
+                    bar = data.iloc[idx]
+                    events.setdefault(int(eobs[idx]), []).append({
+                        'symbol': symbol,
+                        'frequency': frequency,
+                        'open': float(bar['open']),
+                        'high': float(bar['high']),
+                        'low': float(bar['low']),
+                        'close': float(bar['close']),
+                        'volume': float(bar['volume']),
+                        'amount': float(bar['amount']),
+                        'eob': bar['eob'].to_pydatetime()
+                    })
+        for eob in sorted(events):
+            self.context.now = from_ns(eob).to_pydatetime()
+            for bar in events[eob]:
+                self._bar_prices[bar['symbol']] = bar['close']
+            self._callbacks.on_bar(self.context, events[eob])
+
+    def _indicator(self, equity: List[float]) -> Dict[str, float]:
+        """由每日净值计算回测指标"""
+        equity = np.asarray(equity, dtype=np.float64)
+        pnl_ratio = equity[-1] / self.config.initial_cash - 1
+        daily_returns = np.diff(np.concatenate(([self.config.initial_cash], equity))) / \
+            np.concatenate(([self.config.initial_cash], equity[:-1]))
+        std = np.std(daily_returns)
+        peak = np.maximum.accumulate(equity)
+        return {
+            'pnl_ratio': pnl_ratio,
+            'pnl_ratio_annual': (1 + pnl_ratio) ** (252 / len(equity)) - 1,
+            'sharpe': np.mean(daily_returns) / std * np.sqrt(252) if std > 0 else 0,
+            'max_drawdown': float(np.max((peak - equity) / peak)),
+            'volatility': std * np.sqrt(252)
+        }
@@ -1,4 +1,5 @@
 # coding=utf-8
+import hashlib
 import os
 from dataclasses import dataclass
 from typing import Dict, Any
@@ -9,6 +10,8 @@ class TradingConfig:
     """交易配置数据类"""
     # 基础配置【BACKTEST:回测模式, MODE_LIVE:模拟盘实盘模式】
     mode: str = 'BACKTEST'
+    adapter_type: str = "gm"  # gm:掘金量化, replay:本地数据离线回放
+    replay_data_dir: str = "replay_data"  # 离线回放K线目录，相对路径基于项目根目录
     strategy_id: str = "策略id"
     token: str = os.getenv('GM_TOKEN', '掘金量化token')
     benchmark: str = "SHSE.000300"
@@ -20,6 +23,21 @@ class TradingConfig:
     stock_pool_size: int = 300  # 股票池大小
     max_positions: int = 3  # 最大持仓
 
+    # 数据配置
+    history_batch_size: int = 100  # 批量获取行情时单次请求的股票数量
+    data_cache_dir: str = "data_cache"  # 本地数据缓存目录，相对路径基于项目根目录
+    bar_store_enabled: bool = True  # 启用本地K线存储
+    cache_max_entries: int = 10000  # 行情缓存最大条目数，0表示不限制
+    cache_max_bytes: int = 512 * 1024 * 1024  # 行情缓存内存上限（字节），0表示不限制
+    cache_ttl: float = 0  # 行情缓存过期时间（秒），0表示不过期
+    compact_storage: bool = False  # 紧凑存储：价格float32、成交量整数、共享时间索引，内存约为DataFrame的1/3
+    incremental_refresh: bool = True  # 每日增量滚动日线缓存，关闭则每日清空缓存
+    constituent_index: str = "SHSE.000300"  # 指数成分股股票池使用的指数
+    constituent_refresh_days: int = 90  # 成分股快照最长复用天数（跨过定期调整日时立即刷新）
+    prefetch_enabled: bool = True  # 开盘前预取股票池历史数据
+    prefetch_time: str = "09:00:00"  # 预取任务执行时间
+    prefetch_workers: int = 4  # 预取并发线程数
+
     # 仓位配置
     max_position_ratio: float = 0.34  # 单只股票的最大持仓
     total_position_ratio: float = 1  # 总持仓比率
@@ -34,6 +52,8 @@ class TradingConfig:
     timing_enabled: bool = True
     trading_start_time: str = "09:30:00"
     trading_end_time: str = "14:55:00"
+    streaming_enabled: bool = False  # 流式模式：订阅持仓及候选股票K线，在on_bar中增量更新指标并即时判断信号
+    streaming_frequency: str = "60s"  # 流式模式订阅的K线频率
 
     # 回测配置
     backtest_start: str = "2019-01-01 08:00:00"
@@ -46,15 +66,45 @@ class TradingConfig:
 
     # 策略组件选择
     data_manager_type: str = "fixed"  # fixed, index 1.选择股票池【】
-    stock_selection_type: str = "momentum"  # momentum, mean_reversion,volatility  2.选择股票评分系统【】
+    stock_selection_type: str = "momentum"  # momentum, mean_reversion,volatility,factor  2.选择股票评分系统【】
     timing_strategy_type: str = "ma"  # ma, momentum, rsi  3.计算交易信号【】
     trade_executor_type: str = "base"  # base, limit,vwap   4.执行交易指令【】
     risk_manager_type: str = "base"  # base, conservative, 5.风控系统【】
     black_list: list = None  # 黑名单
+    factor_weights: dict = None  # 多因子选股(factor)的因子权重，因子名称见factor/registry.py
+    factor_store_enabled: bool = True  # 因子值按交易日持久化到data_cache/factors，只补算缺失部分
 
     def __post_init__(self):
         self.black_list = [
         ]
+        if self.factor_weights is None:
+            self.factor_weights = {
+                'momentum_20': 1.0,
+                'ma_deviation_5': 0.5,
+                'volatility_20': 0.5,
+                'volume_ratio_5_20': 0.5,
+            }
+
+    def get_cache_path(self, *parts: str) -> str:
+        """获取本地数据缓存路径"""
+        root = self.data_cache_dir
+        if not os.path.isabs(root):
+            root = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), root)
+        return os.path.join(root, *parts)
+
+    def get_data_source(self) -> str:
+        """
+        行情数据来源标识，用于区分本地K线、因子值等由行情计算出的持久化数据
+
+        掘金为adapter_type；离线回放附加回放目录的哈希，不同回放数据集、回放与掘金的数据互不混用
+        """
+        if self.adapter_type != 'replay':
+            return self.adapter_type
+        data_dir = self.replay_data_dir
+        if not os.path.isabs(data_dir):
+            data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), data_dir)
+        digest = hashlib.md5(os.path.normpath(data_dir).encode('utf-8')).hexdigest()[:8]
+        return f"replay_{digest}"
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Tuple, Optional, Any
+from collections import abc
+from typing import List, Dict, Tuple, Optional, Any, Sequence
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
+from core.market_panel import MarketPanel
+from utils.data_converter import DataConverter
+
 
 @dataclass
 class StockInfo:
@@ -15,6 +20,72 @@ class StockInfo:
     market_cap: float = 0.0
 
 
+class SelectionResult(abc.Sequence):
+    """
+    选股结果
+
+    按得分降序保存入选股票的代码与得分数组，按下标访问时才创建StockInfo，
+    只交易前几只股票时不必为整个股票池创建对象
+    """
+
+    def __init__(self, symbols: Sequence[str] = (), scores: Optional[Sequence[float]] = None):
+        self.symbols: List[str] = list(symbols)
+        self.scores = np.asarray(scores if scores is not None else [], dtype=np.float64)
+        self._items: Dict[int, StockInfo] = {}
+
+    @classmethod
+    def top_k(cls, symbols: Sequence[str], scores: Sequence[float], k: int) -> 'SelectionResult':
+        """部分选择得分最高的k只股票，结果与按得分稳定降序排序后取前k只一致，NaN得分排在最后"""
+        scores = np.asarray(scores, dtype=np.float64)
+        n = len(scores)
+        if k <= 0 or n == 0:
+            return cls()
+        # NaN按负无穷参与比较，否则可能被选为第k名的分界值，导致入选数量不足k只
+        keys = np.where(np.isnan(scores), -np.inf, scores)
+        if k < n:
+            kth = np.partition(keys, n - k)[n - k]
+            above = np.flatnonzero(keys > kth)
+            # 与第k名同分的股票按原顺序补足
+            ties = np.flatnonzero(keys == kth)[:k - len(above)]
+            indices = np.concatenate([above, ties])
+        else:
+            indices = np.arange(n)
+        order = indices[np.lexsort((indices, -keys[indices]))]
+        return cls([symbols[i] for i in order], scores[order])
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("选股结果下标越界")
+        item = self._items.get(index)
+        if item is None:
+            item = StockInfo(symbol=self.symbols[index], score=float(self.scores[index]))
+            self._items[index] = item
+        return item
+
+    @property
+    def total_score(self) -> float:
+        """入选股票得分之和"""
+        return sum(self.scores.tolist())
+
+    def describe(self, top: int = 3) -> str:
+        """结果摘要，用于日志"""
+        if not self.symbols:
+            return "无入选股票"
+        leaders = ', '.join(f"{symbol}({score:.3f})" for symbol, score in
+                            zip(self.symbols[:top], self.scores[:top].tolist()))
+        return f"得分区间[{self.scores[-1]:.3f}, {self.scores[0]:.3f}]，前{min(top, len(self))}名: {leaders}"
+
+    def __repr__(self) -> str:
+        return f"SelectionResult({len(self)}只, {self.describe()})"
+
+
 @dataclass
 class PositionRecord:
     """持仓记录数据类"""
@@ -26,6 +97,60 @@ class PositionRecord:
     volume: int = 0
 
 
+@dataclass
+class PortfolioSnapshot:
+    """
+    账户持仓快照
+
+    一次遍历账户持仓汇总现金、总资产、各标的持仓市值和持仓数量，
+    同一回调内的风控检查与交易执行共用，避免重复扫描持仓
+    """
+    cash: float
+    total_position_value: float
+    total_assets: float
+    market_values: Dict[str, float]
+    volumes: Dict[str, float]
+    position_count: int
+
+    @classmethod
+    def from_account(cls, context) -> 'PortfolioSnapshot':
+        """读取当前账户构建快照"""
+        account = context.account()
+        cash = DataConverter.safe_float(account.cash)
+        total_position_value = 0
+        position_count = 0
+        market_values: Dict[str, float] = {}
+        volumes: Dict[str, float] = {}
+        for pos in account.positions():
+            volume = DataConverter.safe_float(pos['volume'])
+            price = DataConverter.safe_float(pos['price'])
+            position_value = volume * price
+            total_position_value += position_value
+            if volume > 0:
+                position_count += 1
+            market_values.setdefault(pos['symbol'], position_value)
+            volumes.setdefault(pos['symbol'], volume)
+        return cls(
+            cash=cash,
+            total_position_value=total_position_value,
+            total_assets=cash + total_position_value,
+            market_values=market_values,
+            volumes=volumes,
+            position_count=position_count
+        )
+
+    def market_value(self, symbol: str) -> float:
+        return self.market_values.get(symbol, 0)
+
+    def volume(self, symbol: str) -> float:
+        return self.volumes.get(symbol, 0)
+
+    @property
+    def holdings(self) -> List[str]:
+        """持仓数量大于0的标的"""
+        return [symbol for symbol, volume in self.volumes.items() if volume > 0]
+
+
 class IDataManager(ABC):
     """数据管理器接口"""
 
@@ -37,10 +162,41 @@ class IDataManager(ABC):
     def get_stock_data(self, context, symbol: str, count: int, frequency: str = '1d') -> pd.DataFrame:
         pass
 
+    @abstractmethod
+    def get_stock_data_batch(self, context, symbols: List[str], count: int,
+                             frequency: str = '1d') -> Dict[str, pd.DataFrame]:
+        pass
+
+    @abstractmethod
+    def get_market_panel(self, context, symbols: List[str], count: int, frequency: str = '1d') -> MarketPanel:
+        pass
+
+    @abstractmethod
+    def get_fields(self, context, symbol: str, fields: Sequence[str], count: int,
+                   frequency: str = '1d') -> Dict[str, np.ndarray]:
+        pass
+
+    @abstractmethod
+    def get_close(self, context, symbol: str, count: int, frequency: str = '1d') -> np.ndarray:
+        pass
+
+    @abstractmethod
+    def get_close_matrix(self, context, symbols: List[str], count: int, frequency: str = '1d') -> np.ndarray:
+        pass
+
+    @abstractmethod
+    def get_field_matrix(self, context, symbols: List[str], field: str, count: int,
+                         frequency: str = '1d') -> np.ndarray:
+        pass
+
     @abstractmethod
     def get_current_data(self, context, symbols: List[str]) -> Dict[str, Any]:
         pass
 
+    @abstractmethod
+    def get_current_price(self, context, symbol: str) -> float:
+        pass
+
 
 class ITimingStrategy(ABC):
     """择时策略接口"""
@@ -50,12 +206,17 @@ class ITimingStrategy(ABC):
                    position_symbols: list = None, selected_symbols: list = None) -> Tuple[bool, bool, bool]:
         pass
 
+    @abstractmethod
+    def get_signals(self, context, symbols: List[str],
+                    data_manager: IDataManager) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        pass
+
 
 class IStockSelectionStrategy(ABC):
     """选股策略接口"""
 
     @abstractmethod
-    def select_stocks(self, context, data_manager: IDataManager) -> List[StockInfo]:
+    def select_stocks(self, context, data_manager: IDataManager) -> SelectionResult:
         pass
 
     @abstractmethod
@@ -78,6 +239,10 @@ class IRiskManager(ABC):
     def can_sell_today(self, context, symbol: str) -> bool:
         pass
 
+    @abstractmethod
+    def holds(self, symbol: str) -> bool:
+        pass
+
     @abstractmethod
     def update_position_record(self, context, symbol: str, avg_cost: float, volume: int,update_time:Any):
         pass
@@ -86,6 +251,26 @@ class IRiskManager(ABC):
     def update_position_all(self,context):
         pass
 
+    @abstractmethod
+    def apply_execution(self, context, execrpt: Dict[str, Any]):
+        pass
+
+    @abstractmethod
+    def begin_callback(self):
+        pass
+
+    @abstractmethod
+    def end_callback(self):
+        pass
+
+    @abstractmethod
+    def get_portfolio(self, context) -> PortfolioSnapshot:
+        pass
+
+    @abstractmethod
+    def invalidate_portfolio(self):
+        pass
+
 
 class ITradeExecutor(ABC):
     """交易执行器接口"""
@@ -100,4 +285,53 @@ class ITradeExecutor(ABC):
 
     @abstractmethod
     def execute_reduce_position(self, context, symbol: str, weight: float) -> bool:
-        pass
\ No newline at end of file
+        pass
+
+
+class IMarketAdapter(ABC):
+    """行情与交易接口适配器，方法签名与gm.api保持一致"""
+
+    @abstractmethod
+    def history(self, symbol, frequency: str, start_time, end_time, fields: str = None,
+                skip_suspended: bool = True, fill_missing: str = None, df: bool = True):
+        pass
+
+    @abstractmethod
+    def current(self, symbols, fields: str = '') -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def order_volume(self, symbol: str, volume: int, side: int, order_type: int,
+                     position_effect: int, price: float = 0) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def order_target_percent(self, symbol: str, percent: float, position_side: int, order_type: int,
+                             price: float = 0) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def subscribe(self, symbols, frequency: str = '1d', count: int = 1, unsubscribe_previous: bool = False):
+        pass
+
+    @abstractmethod
+    def unsubscribe(self, symbols, frequency: str = '1d'):
+        pass
+
+    @abstractmethod
+    def schedule(self, schedule_func, date_rule: str, time_rule: str):
+        pass
+
+    @abstractmethod
+    def get_instrumentinfos(self, symbols=None, exchanges=None, sec_types=None, fields: str = None,
+                            df: bool = False):
+        pass
+
+    @abstractmethod
+    def stk_get_index_constituents(self, index: str, trade_date: str = None) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def run(self, callbacks):
+        """启动策略，callbacks为包含init、on_order_status等回调函数的模块"""
+        pass
@@ -0,0 +1,32 @@
+# coding=utf-8
+"""交易常量，取值与掘金量化gm.api保持一致，使策略组件不直接依赖gm"""
+
+# 运行模式
+MODE_LIVE = 1
+MODE_BACKTEST = 2
+
+# 委托方向
+OrderSide_Buy = 1
+OrderSide_Sell = 2
+
+# 委托类型
+OrderType_Limit = 1
+OrderType_Market = 2
+
+# 开平仓类型
+PositionEffect_Open = 1
+PositionEffect_Close = 2
+
+# 持仓方向
+PositionSide_Long = 1
+PositionSide_Short = 2
+
+# 委托状态
+OrderStatus_New = 1
+OrderStatus_PartiallyFilled = 2
+OrderStatus_Filled = 3
+OrderStatus_Canceled = 5
+OrderStatus_Rejected = 8
+
+# 成交回报类型
+ExecType_Trade = 15
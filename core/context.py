@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 from typing import List, Optional
 
-from core.base import StockInfo, IDataManager, ITimingStrategy, IStockSelectionStrategy, IRiskManager, ITradeExecutor
+from core.base import SelectionResult, IDataManager, ITimingStrategy, IStockSelectionStrategy, IRiskManager, ITradeExecutor, \
+    IMarketAdapter
 
 
 @dataclass
@@ -9,6 +10,7 @@ class TradingContext:
     """交易上下文，封装策略运行环境"""
 
     # 策略组件
+    market_adapter: Optional[IMarketAdapter] = None
     data_manager: Optional[IDataManager] = None
     timing_strategy: Optional[ITimingStrategy] = None
     stock_selection_strategy: Optional[IStockSelectionStrategy] = None
@@ -16,7 +18,7 @@ class TradingContext:
     trade_executor: Optional[ITradeExecutor] = None
 
     # 选股结果
-    selected_stocks: List[StockInfo] = None
+    selected_stocks: SelectionResult = None
     last_selection_date: Optional[str] = None
     # 待买入的股票
     buy_stocks: List[str] = None
@@ -32,7 +34,7 @@ class TradingContext:
 
     def __post_init__(self):
         if self.selected_stocks is None:
-            self.selected_stocks = []
+            self.selected_stocks = SelectionResult()
 
         if self.buy_stocks is None:
             self.buy_stocks = []
@@ -45,7 +47,7 @@ class TradingContext:
 
     def reset_daily(self):
         """重置每日数据"""
-        self.selected_stocks.clear()
+        self.selected_stocks = SelectionResult()
 
     def record_trade(self, symbol: str, returns: float):
         """记录交易结果"""
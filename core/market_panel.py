@@ -0,0 +1,132 @@
+# coding=utf-8
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class MarketPanel:
+    """
+    全市场行情面板
+
+    逻辑上为 symbol × time × field 的三维数组，按字段分块存储。每行为该标的最近的K线，
+    按K线右对齐：最后一列为各标的最新一根K线，停牌日不占列，上市不足的部分在左侧为NaN，
+    与逐只读取的K线窗口一致；每个单元的时间由eobs矩阵给出（UTC纳秒，缺失为0）。
+    panel.close、panel.field('volume') 等返回 symbol × time 的零拷贝只读视图，如 panel.close[:, -20:]
+    """
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume', 'amount')
+
+    def __init__(self, symbols: Sequence[str], eobs: np.ndarray, data: np.ndarray,
+                 fields: Sequence[str] = FIELDS):
+        """
+        Args:
+            symbols: 标的列表
+            eobs: 形状为 (标的数, 时间数) 的K线时间矩阵
+            data: 形状为 (字段数, 标的数, 时间数) 的数组
+            fields: 字段名称
+        """
+        self.symbols: List[str] = list(symbols)
+        self.fields: List[str] = list(fields)
+        self.eobs = eobs
+        self.eobs.flags.writeable = False
+        self._data = data
+        self._data.flags.writeable = False
+        self._symbol_index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._field_index: Dict[str, int] = {field: i for i, field in enumerate(self.fields)}
+        # 构建面板的交易日，由数据管理器设置
+        self.trade_date: Optional[str] = None
+
+    @classmethod
+    def from_arrays(cls, symbols: Sequence[str], rows: Sequence[Dict[str, np.ndarray]], width: int,
+                    fields: Sequence[str] = FIELDS) -> 'MarketPanel':
+        """由各标的按时间升序的字段数组（含eob）构建面板，每行取最近width根K线右对齐"""
+        data = np.full((len(fields), len(symbols), width), np.nan, dtype=np.float64)
+        eobs = np.zeros((len(symbols), width), dtype=np.int64)
+        for i, arrays in enumerate(rows):
+            n = min(width, len(arrays['eob']))
+            if n == 0:
+                continue
+            eobs[i, width - n:] = arrays['eob'][-n:]
+            for j, field in enumerate(fields):
+                data[j, i, width - n:] = arrays[field][-n:]
+        return cls(symbols, eobs, data, fields)
+
+    def field(self, name: str) -> np.ndarray:
+        """获取字段的 symbol × time 视图"""
+        return self._data[self._field_index[name]]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.field('open')
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.field('high')
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.field('low')
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.field('close')
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.field('volume')
+
+    @property
+    def amount(self) -> np.ndarray:
+        return self.field('amount')
+
+    @property
+    def values(self) -> np.ndarray:
+        """symbol × time × field 视图"""
+        return np.moveaxis(self._data, 0, -1)
+
+    @property
+    def shape(self):
+        return len(self.symbols), self.width, len(self.fields)
+
+    @property
+    def width(self) -> int:
+        """每个标的保存的K线数"""
+        return self.eobs.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + self.eobs.nbytes
+
+    def index_of(self, symbol: str) -> int:
+        """标的所在行，不存在返回-1"""
+        return self._symbol_index.get(symbol, -1)
+
+    def row(self, symbol: str, name: str = 'close') -> np.ndarray:
+        """单个标的某字段的时间序列视图"""
+        return self.field(name)[self._symbol_index[symbol]]
+
+    def valid_counts(self, name: str = 'close') -> np.ndarray:
+        """每个标的非缺失值数量"""
+        return np.count_nonzero(~np.isnan(self.field(name)), axis=1)
+
+    def matrix(self, symbols: Sequence[str], name: str, count: int) -> np.ndarray:
+        """
+        按symbols顺序取某字段最近count列的只读矩阵，面板中没有的标的为NaN行
+
+        symbols与面板标的顺序一致时返回零拷贝视图，否则按行复制
+        """
+        view = self.field(name)[:, self.width - count:]
+        if list(symbols) == self.symbols:
+            return view
+        rows = np.fromiter((self._symbol_index.get(symbol, -1) for symbol in symbols),
+                           dtype=np.int64, count=len(symbols))
+        result = view[np.maximum(rows, 0)] if len(self.symbols) else np.full((len(rows), count), np.nan)
+        result[rows < 0] = np.nan
+        result.flags.writeable = False
+        return result
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._symbol_index
@@ -0,0 +1,178 @@
+# coding=utf-8
+import bisect
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# 本地K线记录格式，eob为UTC纳秒时间戳
+BAR_DTYPE = np.dtype([
+    ('eob', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('amount', '<f8'),
+])
+BAR_COLUMNS = [name for name in BAR_DTYPE.names if name != 'eob']
+TIMEZONE = 'Asia/Shanghai'
+_EPOCH = pd.Timestamp('1970-01-01', tz='UTC')
+_EPOCH_DATETIME = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_ns(value) -> int:
+    """时间转换为UTC纳秒时间戳，无时区的时间按北京时间处理"""
+    if type(value) is datetime and value.tzinfo is not None:
+        # 带时区的datetime（推送K线的eob）直接计算，不创建Timestamp
+        return (value - _EPOCH_DATETIME) // _MICROSECOND * 1000
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(TIMEZONE)
+    return int((ts - _EPOCH) // pd.Timedelta(1, 'ns'))
+
+
+def from_ns(value: int) -> pd.Timestamp:
+    """UTC纳秒时间戳转换为北京时间"""
+    return pd.Timestamp(int(value), unit='ns', tz='UTC').tz_convert(TIMEZONE)
+
+
+def frequency_to_ns(frequency: str) -> int:
+    """K线周期长度（纳秒），无法识别的频率返回0"""
+    if frequency.endswith('d') and frequency[:-1].isdigit():
+        return int(frequency[:-1]) * 86400 * 10 ** 9
+    if frequency.endswith('s') and frequency[:-1].isdigit():
+        return int(frequency[:-1]) * 10 ** 9
+    return 0
+
+
+def eob_to_ns(eob: pd.Series) -> np.ndarray:
+    """eob列转换为UTC纳秒时间戳数组"""
+    eob = pd.to_datetime(eob)
+    if eob.dt.tz is None:
+        eob = eob.dt.tz_localize(TIMEZONE)
+    return ((eob - _EPOCH) // pd.Timedelta(1, 'ns')).to_numpy(dtype=np.int64)
+
+
+def frame_to_records(data: pd.DataFrame) -> np.ndarray:
+    """行情DataFrame转换为按时间排序的记录数组"""
+    records = np.empty(len(data), dtype=BAR_DTYPE)
+    records['eob'] = eob_to_ns(data['eob'])
+    for column in BAR_COLUMNS:
+        records[column] = data[column].to_numpy(dtype=np.float64)
+    records.sort(order='eob')
+    return records
+
+
+def records_to_frame(symbol: str, records: np.ndarray) -> pd.DataFrame:
+    """记录数组转换为与history返回格式一致的DataFrame"""
+    data = pd.DataFrame({column: records[column] for column in BAR_COLUMNS})
+    data.insert(0, 'eob', pd.to_datetime(records['eob'], unit='ns', utc=True).tz_convert(TIMEZONE))
+    data.insert(0, 'symbol', symbol)
+    return data
+
+
+class BarStore:
+    """本地K线存储，每个标的/频率一个定长记录文件，新K线只追加到文件末尾"""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, frequency: str) -> str:
+        return os.path.join(self.root_dir, frequency, f"{symbol}.bin")
+
+    def _record_count(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // BAR_DTYPE.itemsize
+
+    def load(self, symbol: str, frequency: str) -> np.ndarray:
+        """读取全部K线记录"""
+        path = self._path(symbol, frequency)
+        count = self._record_count(path)
+        if count == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        # 只读取完整记录，忽略异常中断写入的残缺尾部
+        return np.fromfile(path, dtype=BAR_DTYPE, count=count)
+
+    def read(self, symbol: str, frequency: str, end_ns: int, count: Optional[int] = None) -> np.ndarray:
+        """
+        读取截止end_ns（含）的最近count根K线
+
+        文件以内存映射方式打开，在eob列上二分查找截止位置，只复制所需的记录，
+        不读取整个文件
+        """
+        path = self._path(symbol, frequency)
+        total = self._record_count(path)
+        if total == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        records = np.memmap(path, dtype=BAR_DTYPE, mode='r', shape=(total,))
+        # bisect逐个访问元素，只触及O(log n)个页面；np.searchsorted会先复制整个跨步的eob列
+        end = bisect.bisect_right(records['eob'], end_ns)
+        start = 0 if count is None else max(0, end - count)
+        result = np.array(records[start:end])
+        del records
+        return result
+
+    def first_eob(self, symbol: str, frequency: str) -> Optional[int]:
+        """最早一根K线的时间戳"""
+        path = self._path(symbol, frequency)
+        if self._record_count(path) == 0:
+            return None
+        return int(np.fromfile(path, dtype=BAR_DTYPE, count=1)['eob'][0])
+
+    def last_eob(self, symbol: str, frequency: str) -> Optional[int]:
+        """最新一根K线的时间戳"""
+        path = self._path(symbol, frequency)
+        count = self._record_count(path)
+        if count == 0:
+            return None
+        last = np.fromfile(path, dtype=BAR_DTYPE, count=1, offset=(count - 1) * BAR_DTYPE.itemsize)
+        return int(last['eob'][0])
+
+    def append(self, symbol: str, frequency: str, data: pd.DataFrame) -> int:
+        """追加晚于最新记录的K线，返回追加数量"""
+        if data is None or data.empty:
+            return 0
+        records = frame_to_records(data)
+        with self._lock:
+            last = self.last_eob(symbol, frequency)
+            if last is not None:
+                records = records[records['eob'] > last]
+            if len(records) == 0:
+                return 0
+            path = self._path(symbol, frequency)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path):
+                # 截掉残缺尾部，保证追加的记录与定长记录边界对齐
+                size = self._record_count(path) * BAR_DTYPE.itemsize
+                if os.path.getsize(path) != size:
+                    os.truncate(path, size)
+            with open(path, 'ab') as f:
+                records.tofile(f)
+        return len(records)
+
+    def prepend(self, symbol: str, frequency: str, data: pd.DataFrame) -> int:
+        """补充早于最早记录的K线（需要重写文件），返回补充数量"""
+        if data is None or data.empty:
+            return 0
+        records = frame_to_records(data)
+        with self._lock:
+            existing = self.load(symbol, frequency)
+            if len(existing) > 0:
+                records = records[records['eob'] < existing['eob'][0]]
+            if len(records) == 0:
+                return 0
+            path = self._path(symbol, frequency)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                records.tofile(f)
+                existing.tofile(f)
+            os.replace(tmp_path, path)
+        return len(records)
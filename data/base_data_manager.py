@@ -1,22 +1,72 @@
 # coding=utf-8
 from datetime import timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
-from gm.api import *
 
-from core.base import IDataManager
-from utils.cache_manager import CacheManager
-from utils.data_converter import DataConverter
+from core.base import IDataManager, IMarketAdapter
+from core.market_panel import MarketPanel
+from data.bar_store import BarStore, eob_to_ns, frequency_to_ns, from_ns, records_to_frame, to_ns
+from data.compact_bars import CompactBars, DateCalendar
+from data.instrument_cache import InstrumentInfoCache
+from data.quote_snapshot import QuoteSnapshot
+from utils.cache_manager import CacheManager, estimate_size
 from utils.logger import default_logger as logger
 
 
+# 行情字段，包含symbol与eob以便多标的请求后按标的拆分、按时间排序
+BAR_FIELDS = 'symbol,eob,open,high,low,close,volume,amount'
+# 提供数组访问的数值字段
+ARRAY_FIELDS = ('open', 'high', 'low', 'close', 'volume', 'amount')
+EMPTY_ARRAY = np.empty(0, dtype=np.float64)
+EMPTY_ARRAY.flags.writeable = False
+
+
+# A股每个交易日的连续竞价时长（秒），用于估算日内K线需要回看的交易日数
+TRADING_SECONDS_PER_DAY = 4 * 3600
+
+
+def lookback_window(count: int, frequency: str) -> timedelta:
+    """
+    获取count根K线需要回看的时间范围
+
+    日线按2倍自然日估算；日内K线按每个交易日的K线数折算交易日数，
+    再按每周5个交易日换算为自然日并留出周末余量，避免预热少量分钟K线时下载数十天的数据
+    """
+    period = frequency_to_ns(frequency) // 10 ** 9
+    if 0 < period < 86400:
+        bars_per_day = max(1, TRADING_SECONDS_PER_DAY // period)
+        trade_days = -(-count // bars_per_day)
+        return timedelta(days=trade_days * 7 // 5 + 3)
+    return timedelta(days=count * 2)
+
+
 class BaseDataManager(IDataManager):
     """基础数据管理器"""
 
-    def __init__(self, config):
+    def __init__(self, config, adapter: IMarketAdapter):
         self.config = config
-        self.cache = CacheManager()
+        self.adapter = adapter
+        self.cache = CacheManager(
+            max_size=config.cache_max_entries,
+            max_bytes=config.cache_max_bytes,
+            default_ttl=config.cache_ttl or None
+        )
+        # 本地K线存储，优先读取本地，只下载缺失的K线；按数据来源分目录，回放数据不会写入掘金的K线文件
+        self.bar_store = BarStore(config.get_cache_path('bars', config.get_data_source())) \
+            if config.bar_store_enabled else None
+        self._backfilled: Dict[Tuple[str, str], int] = {}  # 已补充历史的最早起点
+        self._window_counts: Dict[str, int] = {}  # 缓存窗口已满足的最大请求长度
+        self._refresh_date = None
+        # 各频率行情面板覆盖的(交易日, 标的, K线数)，面板失效后按此重建，日切时按前一日预先构建
+        self._panel_specs: Dict[str, Tuple[str, List[str], int]] = {}
+        # 紧凑存储模式下各频率共享的时间索引
+        self._calendars: Dict[str, DateCalendar] = {}
+        # 证券基础信息缓存，供股票池过滤与订单日志共享
+        self.instruments = InstrumentInfoCache(config, adapter)
+        # 实时行情快照，同一回调内的执行器、风控与止损检查共享
+        self.quotes = QuoteSnapshot(adapter)
 
     def get_stock_pool(self, context, size: int) -> List[str]:
         """获取股票池 - 基础实现"""
@@ -25,54 +75,371 @@ class BaseDataManager(IDataManager):
     def get_stock_data(self, context, symbol: str, count: int, frequency: str = '1d') -> pd.DataFrame:
         """获取股票数据"""
         symbol_str = str(symbol).strip()
-        cache_key = f"{symbol_str}_{frequency}_{count}"
-        cached_data = self.cache.get(cache_key)
-        if cached_data is not None:
-            return cached_data
         try:
-            end_time = context.now
-            start_time = end_time - timedelta(days=count * 2)
-            data = history(
-                symbol=symbol_str,
-                frequency=frequency,
-                start_time=start_time,
-                end_time=end_time,
-                fields='open,high,low,close,volume,amount',
-                df=True,
-                skip_suspended=True,
-                fill_missing='Last'
-            )
+            data = self._get_windows(context, [symbol_str], count, frequency).get(symbol_str)
             if data is None or data.empty:
                 logger.warning(f"获取{symbol_str}数据为空")
                 return pd.DataFrame()
-            data = data.sort_index()
-            if len(data) > count:
-                data = data.tail(count)
-            self.cache.set(cache_key, data)
             return data
         except Exception as e:
             logger.error(f"获取{symbol_str}数据失败: {e}")
             return pd.DataFrame()
 
-    def get_current_data(self, context, symbols: List[str]) -> Dict[str, Any]:
-        """获取当前数据"""
-        from gm.api import current
+    def get_stock_data_batch(self, context, symbols: List[str], count: int,
+                             frequency: str = '1d') -> Dict[str, pd.DataFrame]:
+        """批量获取多只股票数据，按批次合并history请求并一次性写入缓存"""
+        symbol_strs = [str(symbol).strip() for symbol in symbols if str(symbol).strip()]
         try:
-            if not symbols:
-                return {}
-            current_data = current(symbols=symbols, fields='open,high,low,price,volume,amount')
-            result = {}
-            for data in current_data:
-                symbol = data['symbol']
-                result[symbol] = {
-                    'open': DataConverter.safe_float(data.get('open', 0)),
-                    'high': DataConverter.safe_float(data.get('high', 0)),
-                    'low': DataConverter.safe_float(data.get('low', 0)),
-                    'price': DataConverter.safe_float(data.get('price', 0)),
-                    'volume': DataConverter.safe_float(data.get('volume', 0)),
-                    'amount': DataConverter.safe_float(data.get('amount', 0))
-                }
-            return result
+            result = self._get_windows(context, symbol_strs, count, frequency)
         except Exception as e:
-            logger.error(f"获取当前数据失败: {e}")
+            logger.error(f"批量获取{len(symbol_strs)}只股票数据失败: {e}")
+            return {}
+        logger.debug(f"批量获取数据完成，共{len(symbol_strs)}只，有数据{len(result)}只")
+        return result
+
+    def _get_windows(self, context, symbols: List[str], count: int, frequency: str,
+                     raw: bool = False) -> Dict[str, pd.DataFrame]:
+        """
+        获取最近count根K线
+
+        缓存按标的/频率保存请求过的最长窗口，较短的请求直接切片返回，
+        较长的请求只补充窗口之前缺少的K线；raw为True时命中的窗口按缓存原样返回
+        """
+        result = {}
+        to_load = []
+        to_extend = {}
+        for symbol in symbols:
+            key = f"{symbol}_{frequency}"
+            window = self.cache.get(key)
+            if window is None:
+                to_load.append(symbol)
+            elif len(window) >= count or self._window_counts.get(key, 0) >= count:
+                result[symbol] = window if raw else self._window_frame(window, count)
+            else:
+                to_extend[symbol] = self._window_frame(window)
+
+        if to_load:
+            for symbol, data in self._load_bars(context, to_load, count, frequency).items():
+                self._set_window(symbol, frequency, data, count)
+                result[symbol] = data
+        if to_extend:
+            for symbol, data in self._extend_windows(context, to_extend, count, frequency).items():
+                self._set_window(symbol, frequency, data, count)
+                result[symbol] = data
+        return result
+
+    def _set_window(self, symbol: str, frequency: str, data: pd.DataFrame, count: int):
+        """缓存标的窗口，并记录该窗口已满足的请求长度，窗口变化时丢弃旧的字段数组"""
+        key = f"{symbol}_{frequency}"
+        if self.config.compact_storage:
+            calendar = self._calendars.setdefault(frequency, DateCalendar())
+            self.cache.set(key, CompactBars.from_frame(symbol, data, calendar))
+        else:
+            self.cache.set(key, data)
+        self.cache.delete(f"{key}_arrays")
+        self._window_counts[key] = count
+        panel = self.cache.peek(f"panel_{frequency}")[0]
+        if panel is not None and symbol in panel:
+            # 面板中该标的的K线已变化，下次使用时重建
+            self.cache.delete(f"panel_{frequency}")
+
+    def get_fields(self, context, symbol: str, fields: Sequence[str], count: int,
+                   frequency: str = '1d') -> Dict[str, np.ndarray]:
+        """获取最近count根K线的字段数组，返回缓存数组的只读连续float64视图，eob为UTC纳秒int64"""
+        symbol_str = str(symbol).strip()
+        try:
+            window = self._get_windows(context, [symbol_str], count, frequency, raw=True).get(symbol_str)
+        except Exception as e:
+            logger.error(f"获取{symbol_str}数据失败: {e}")
+            window = None
+        if window is None or window.empty:
+            logger.warning(f"获取{symbol_str}数据为空")
+            return {field: EMPTY_ARRAY for field in fields}
+        if isinstance(window, CompactBars):
+            # 紧凑窗口不额外缓存float64数组，按需还原最近count根
+            return {field: window.field(field, count) for field in fields}
+        arrays = self._field_arrays(symbol_str, frequency)
+        if arrays is None:
+            # 窗口未能写入缓存（如超出缓存容量），直接由本次结果构建
+            arrays = self._build_arrays(window)
+        return {field: arrays[field][-count:] for field in fields}
+
+    def get_close(self, context, symbol: str, count: int, frequency: str = '1d') -> np.ndarray:
+        """获取最近count根K线的收盘价数组"""
+        return self.get_fields(context, symbol, ('close',), count, frequency)['close']
+
+    def get_close_matrix(self, context, symbols: List[str], count: int, frequency: str = '1d') -> np.ndarray:
+        """获取股票池收盘价矩阵，每行按K线数右对齐，不足count根的部分在左侧补NaN"""
+        return self.get_field_matrix(context, symbols, 'close', count, frequency)
+
+    def get_field_matrix(self, context, symbols: List[str], field: str, count: int,
+                         frequency: str = '1d') -> np.ndarray:
+        """获取股票池某字段的只读矩阵，由当日行情面板切片，每行按K线数右对齐，不足count根的部分在左侧补NaN"""
+        symbol_strs = [str(symbol).strip() for symbol in symbols]
+        return self.get_market_panel(context, symbol_strs, count, frequency).matrix(symbol_strs, field, count)
+
+    def get_market_panel(self, context, symbols: List[str], count: int, frequency: str = '1d') -> MarketPanel:
+        """
+        获取覆盖symbols、每个标的至少count根K线的行情面板
+
+        面板按频率缓存，覆盖当日请求过的全部标的，同一交易日的评分矩阵都由它切片；
+        出现面板外的标的、更长的请求或面板中标的的K线变化时才补充窗口并重建
+        """
+        symbol_strs = [str(symbol).strip() for symbol in symbols if str(symbol).strip()]
+        trade_date = context.now.strftime('%Y-%m-%d')
+        panel = self.cache.get(f"panel_{frequency}")
+        if panel is not None and panel.trade_date == trade_date and panel.width >= count and \
+                all(symbol in panel for symbol in symbol_strs):
+            return panel
+        spec = self._panel_specs.get(frequency)
+        if spec is not None and spec[0] == trade_date:
+            symbol_strs = list(dict.fromkeys(spec[1] + symbol_strs))
+            count = max(count, spec[2])
+        return self._build_panel(context, symbol_strs, count, frequency, trade_date)
+
+    def _build_panel(self, context, symbols: List[str], count: int, frequency: str, trade_date: str) -> MarketPanel:
+        """批量补充窗口后由各标的字段数组构建面板并缓存"""
+        self.get_stock_data_batch(context, symbols, count, frequency)
+        fields = MarketPanel.FIELDS + ('eob',)
+        rows = [self.get_fields(context, symbol, fields, count, frequency) for symbol in symbols]
+        panel = MarketPanel.from_arrays(symbols, rows, count)
+        panel.trade_date = trade_date
+        self._panel_specs[frequency] = (trade_date, symbols, count)
+        self.cache.set(f"panel_{frequency}", panel)
+        logger.debug(f"构建行情面板完成，形状: {panel.shape}")
+        return panel
+
+    def _field_arrays(self, symbol: str, frequency: str) -> Optional[Dict[str, np.ndarray]]:
+        """获取缓存窗口对应的字段数组，每个窗口只转换一次"""
+        key = f"{symbol}_{frequency}"
+        arrays = self.cache.get(f"{key}_arrays")
+        if arrays is None:
+            window = self.cache.get(key)
+            if window is None or isinstance(window, CompactBars):
+                return None
+            arrays = self._build_arrays(window)
+            self.cache.set(f"{key}_arrays", arrays)
+        return arrays
+
+    @staticmethod
+    def _build_arrays(window: pd.DataFrame) -> Dict[str, np.ndarray]:
+        arrays = {}
+        for field in ARRAY_FIELDS:
+            array = np.array(window[field], dtype=np.float64)
+            array.flags.writeable = False
+            arrays[field] = array
+        eob = eob_to_ns(window['eob'])
+        eob.flags.writeable = False
+        arrays['eob'] = eob
+        return arrays
+
+    def _extend_windows(self, context, windows: Dict[str, pd.DataFrame], count: int,
+                        frequency: str) -> Dict[str, pd.DataFrame]:
+        """将已缓存的窗口向前扩展到count根K线"""
+        if self.bar_store is not None:
+            # 本地存储已包含窗口内的K线，只会下载更早缺少的部分
+            return self._load_bars(context, list(windows), count, frequency)
+
+        first_eobs = {symbol: to_ns(window['eob'].iloc[0]) for symbol, window in windows.items()}
+        start_time = context.now - lookback_window(count, frequency)
+        end_time = from_ns(max(first_eobs.values())) - timedelta(seconds=1)
+        frames = self._history_by_symbol(list(windows), frequency, start_time, end_time)
+        result = {}
+        for symbol, window in windows.items():
+            older = frames.get(symbol)
+            if older is not None and not older.empty:
+                older = older[eob_to_ns(older['eob']) < first_eobs[symbol]]
+                window = pd.concat([older, window], ignore_index=True)
+            result[symbol] = self._normalize_bars(window, count)
+        return result
+
+    def refresh_daily(self, context):
+        """
+        日切刷新缓存：增量模式下滚动日线窗口并丢弃其它频率，按前一日的标的与长度构建当日的日线面板；
+        否则清空缓存，面板在首次使用时构建
+        """
+        trade_date = context.now.strftime('%Y-%m-%d')
+        if self._refresh_date == trade_date:
+            return
+        self._refresh_date = trade_date
+        spec = self._panel_specs.get('1d')
+        self._panel_specs.clear()
+        if not self.config.incremental_refresh:
+            self.cache.clear()
+            self._window_counts.clear()
+            return
+        for key in self.cache.keys():
+            if not key.endswith('_1d'):
+                self.cache.delete(key)
+        rolled = self.roll_forward(context, '1d')
+        logger.info(f"增量刷新行情缓存，滚动{rolled}只股票")
+        if spec is not None:
+            self._build_panel(context, spec[1], spec[2], '1d', trade_date)
+
+    def roll_forward(self, context, frequency: str = '1d') -> int:
+        """一次批量请求所有已缓存标的的最新K线，追加到缓存窗口末尾并保持窗口长度，返回滚动的标的数"""
+        suffix = f"_{frequency}"
+        windows = {}
+        for key, count in list(self._window_counts.items()):
+            if not key.endswith(suffix):
+                continue
+            window = self.cache.get(key)
+            if window is None or window.empty:
+                self._window_counts.pop(key, None)
+                continue
+            windows[key[:-len(suffix)]] = self._window_frame(window)
+        if not windows:
+            return 0
+
+        last_eobs = {symbol: to_ns(window['eob'].iloc[-1]) for symbol, window in windows.items()}
+        since = from_ns(min(last_eobs.values())) + timedelta(seconds=1)
+        frames = self._history_by_symbol(list(windows), frequency, since, context.now)
+        for symbol, window in windows.items():
+            new_bars = frames.get(symbol)
+            if new_bars is None or new_bars.empty:
+                continue
+            new_bars = new_bars[eob_to_ns(new_bars['eob']) > last_eobs[symbol]]
+            if new_bars.empty:
+                continue
+            if self.bar_store is not None:
+                self.bar_store.append(symbol, frequency, new_bars)
+            count = self._window_counts[f"{symbol}{suffix}"]
+            window = self._normalize_bars(pd.concat([window, new_bars], ignore_index=True), count)
+            self._set_window(symbol, frequency, window, count)
+        return len(windows)
+
+    def _load_bars(self, context, symbols: List[str], count: int, frequency: str) -> Dict[str, pd.DataFrame]:
+        """获取多只股票最近count根K线，启用本地K线存储时优先读取本地"""
+        end_time = context.now
+        start_time = end_time - lookback_window(count, frequency)
+        if self.bar_store is None:
+            frames = self._history_by_symbol(symbols, frequency, start_time, end_time)
+            return {symbol: self._normalize_bars(data, count) for symbol, data in frames.items()}
+
+        end_ns = to_ns(end_time)
+        period_ns = frequency_to_ns(frequency)
+        empty_symbols = []
+        stale_symbols = []
+        for symbol in symbols:
+            last_eob = self.bar_store.last_eob(symbol, frequency)
+            if last_eob is None:
+                empty_symbols.append(symbol)
+            elif end_ns - last_eob >= period_ns:
+                stale_symbols.append((symbol, last_eob))
+
+        # 本地无数据：下载完整窗口
+        if empty_symbols:
+            frames = self._history_by_symbol(empty_symbols, frequency, start_time, end_time)
+            for symbol, data in frames.items():
+                self.bar_store.append(symbol, frequency, data)
+        # 本地已有数据：只下载最新记录之后的K线
+        if stale_symbols:
+            since = from_ns(min(last_eob for _, last_eob in stale_symbols)) + timedelta(seconds=1)
+            frames = self._history_by_symbol([symbol for symbol, _ in stale_symbols], frequency, since, end_time)
+            for symbol, data in frames.items():
+                self.bar_store.append(symbol, frequency, data)
+
+        result = {}
+        for symbol in symbols:
+            records = self.bar_store.read(symbol, frequency, end_ns, count)
+            if len(records) < count and self._backfill_bars(symbol, frequency, count, len(records), start_time):
+                records = self.bar_store.read(symbol, frequency, end_ns, count)
+            if len(records) > 0:
+                result[symbol] = records_to_frame(symbol, records)
+        return result
+
+    def _backfill_bars(self, symbol: str, frequency: str, count: int, available: int, start_time) -> bool:
+        """本地K线不足时补充更早的历史，同一起点只补充一次，避免上市较晚的标的反复请求"""
+        first_eob = self.bar_store.first_eob(symbol, frequency)
+        if first_eob is None:
+            return False
+        end_time = from_ns(first_eob) - timedelta(seconds=1)
+        start_time = min(from_ns(to_ns(start_time)), end_time - lookback_window(count - available, frequency))
+        key = (symbol, frequency)
+        start_ns = to_ns(start_time)
+        if self._backfilled.get(key, start_ns + 1) <= start_ns:
+            return False
+        self._backfilled[key] = start_ns
+        data = self._history_by_symbol([symbol], frequency, start_time, end_time).get(symbol)
+        return self.bar_store.prepend(symbol, frequency, data) > 0
+
+    def _history_by_symbol(self, symbols: List[str], frequency: str, start_time, end_time) -> Dict[str, pd.DataFrame]:
+        """分批请求多标的历史行情，并按标的拆分"""
+        result = {}
+        batch_size = max(1, self.config.history_batch_size)
+        for i in range(0, len(symbols), batch_size):
+            batch = symbols[i:i + batch_size]
+            try:
+                data = self.adapter.history(
+                    symbol=','.join(batch),
+                    frequency=frequency,
+                    start_time=start_time,
+                    end_time=end_time,
+                    fields=BAR_FIELDS,
+                    df=True,
+                    skip_suspended=True,
+                    fill_missing='Last'
+                )
+            except Exception as e:
+                logger.error(f"批量获取{len(batch)}只股票数据失败: {e}")
+                continue
+            if data is None or data.empty:
+                continue
+            for symbol, group in data.groupby('symbol', sort=False):
+                result[symbol] = group
+        return result
+
+    @staticmethod
+    def _window_frame(window, count: Optional[int] = None) -> pd.DataFrame:
+        """缓存窗口转换为DataFrame，紧凑窗口按需还原最近count根"""
+        if isinstance(window, CompactBars):
+            return window.to_frame(count)
+        return window.iloc[-count:] if count is not None and len(window) > count else window
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """统计行情窗口占用的内存，按标的、按K线平均"""
+        symbols = set()
+        windows = bars = total_bytes = 0
+        for key in list(self._window_counts):
+            window = self.cache.peek(key)[0]
+            if window is None:
+                continue
+            windows += 1
+            bars += len(window)
+            # 缓存未设置内存上限时不记录大小，这里单独估算
+            total_bytes += estimate_size(window)
+            arrays = self.cache.peek(f"{key}_arrays")[0]
+            if arrays is not None:
+                total_bytes += estimate_size(arrays)
+            symbols.add(key.rsplit('_', 1)[0])
+        total_bytes += sum(calendar.nbytes for calendar in self._calendars.values())
+        return {
+            'mode': 'compact' if self.config.compact_storage else 'dataframe',
+            'symbols': len(symbols),
+            'windows': windows,
+            'bars': bars,
+            'bytes': total_bytes,
+            'bytes_per_symbol': round(total_bytes / len(symbols), 1) if symbols else 0,
+            'bytes_per_bar': round(total_bytes / bars, 1) if bars else 0
+        }
+
+    @staticmethod
+    def _normalize_bars(data: pd.DataFrame, count: int) -> pd.DataFrame:
+        """按时间排序并截取最近count根K线"""
+        if 'eob' in data.columns:
+            data = data.sort_values('eob').reset_index(drop=True)
+        else:
+            data = data.sort_index()
+        if len(data) > count:
+            data = data.tail(count)
+        return data
+
+    def get_current_data(self, context, symbols: List[str]) -> Dict[str, Any]:
+        """批量获取当前数据，同一回调内重复查询直接读取快照"""
+        if not symbols:
             return {}
+        return self.quotes.load(symbols)
+
+    def get_current_price(self, context, symbol: str) -> float:
+        """获取最新价，优先读取本次回调已加载的快照"""
+        return self.quotes.get_price(symbol)
@@ -0,0 +1,123 @@
+# coding=utf-8
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BAR_DTYPE, eob_to_ns, records_to_frame
+
+# A股价格最多3位小数，float32还原为float64时按此精度取整，保证与原始价格一致
+PRICE_DECIMALS = 3
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+
+class DateCalendar:
+    """
+    共享时间索引
+
+    同一频率的所有标的共用一份eob时间戳，窗口只保存int32编码，
+    编码按首次出现顺序分配，已分配的编码不会改变
+    """
+
+    def __init__(self):
+        self._eobs = np.empty(0, dtype=np.int64)  # 编码 -> eob
+        self._sorted_eobs = np.empty(0, dtype=np.int64)
+        self._sorted_codes = np.empty(0, dtype=np.int32)
+        self._lock = threading.Lock()
+
+    def encode(self, eob_ns: np.ndarray) -> np.ndarray:
+        """eob纳秒时间戳编码为int32，新时间戳追加到索引末尾"""
+        eob_ns = np.asarray(eob_ns, dtype=np.int64)
+        with self._lock:
+            unique = np.unique(eob_ns)
+            known = np.isin(unique, self._sorted_eobs, assume_unique=True)
+            if not known.all():
+                new_eobs = unique[~known]
+                new_codes = np.arange(len(self._eobs), len(self._eobs) + len(new_eobs), dtype=np.int32)
+                self._eobs = np.concatenate([self._eobs, new_eobs])
+                sorted_eobs = np.concatenate([self._sorted_eobs, new_eobs])
+                sorted_codes = np.concatenate([self._sorted_codes, new_codes])
+                order = np.argsort(sorted_eobs, kind='stable')
+                self._sorted_eobs = sorted_eobs[order]
+                self._sorted_codes = sorted_codes[order]
+            sorted_eobs, sorted_codes = self._sorted_eobs, self._sorted_codes
+        return sorted_codes[np.searchsorted(sorted_eobs, eob_ns)]
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """int32编码还原为eob纳秒时间戳"""
+        return self._eobs[codes]
+
+    def __len__(self) -> int:
+        return len(self._eobs)
+
+    @property
+    def nbytes(self) -> int:
+        return self._eobs.nbytes + self._sorted_eobs.nbytes + self._sorted_codes.nbytes
+
+
+class CompactBars:
+    """
+    紧凑K线窗口
+
+    价格以float32、成交量以int64按列保存，时间只保存共享索引的编码，
+    每根K线约36字节，不创建DataFrame及索引对象，读取时按需还原
+    """
+
+    __slots__ = ('symbol', 'calendar', 'codes', 'prices', 'volume', 'amount')
+
+    def __init__(self, symbol: str, calendar: DateCalendar, codes: np.ndarray, prices: np.ndarray,
+                 volume: np.ndarray, amount: np.ndarray):
+        self.symbol = symbol
+        self.calendar = calendar
+        self.codes = codes
+        self.prices = prices  # 形状为 (4, K线数)，依次为open/high/low/close
+        self.volume = volume
+        self.amount = amount
+
+    @classmethod
+    def from_frame(cls, symbol: str, data: pd.DataFrame, calendar: DateCalendar) -> 'CompactBars':
+        """由按时间排序的行情DataFrame构建"""
+        prices = np.empty((len(PRICE_FIELDS), len(data)), dtype=np.float32)
+        for i, field in enumerate(PRICE_FIELDS):
+            prices[i] = data[field].to_numpy(dtype=np.float64)
+        return cls(
+            symbol=symbol,
+            calendar=calendar,
+            codes=calendar.encode(eob_to_ns(data['eob'])),
+            prices=prices,
+            volume=np.rint(data['volume'].to_numpy(dtype=np.float64)).astype(np.int64),
+            amount=data['amount'].to_numpy(dtype=np.float64).copy()
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.codes) == 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.prices.nbytes + self.volume.nbytes + self.amount.nbytes
+
+    def field(self, name: str, count: Optional[int] = None) -> np.ndarray:
+        """获取最近count根K线的字段，还原为只读float64数组"""
+        start = -count if count is not None else 0
+        if name in PRICE_FIELDS:
+            array = np.round(self.prices[PRICE_FIELDS.index(name), start:].astype(np.float64), PRICE_DECIMALS)
+        elif name == 'eob':
+            array = self.calendar.decode(self.codes[start:])
+        else:
+            array = getattr(self, name)[start:].astype(np.float64)
+        array.flags.writeable = False
+        return array
+
+    def to_frame(self, count: Optional[int] = None) -> pd.DataFrame:
+        """还原为与history返回格式一致的DataFrame"""
+        start = -count if count is not None else 0
+        records = np.empty(len(self.codes[start:]), dtype=BAR_DTYPE)
+        records['eob'] = self.calendar.decode(self.codes[start:])
+        for field in PRICE_FIELDS + ('volume', 'amount'):
+            records[field] = self.field(field, count)
+        return records_to_frame(self.symbol, records)
@@ -0,0 +1,143 @@
+# coding=utf-8
+import bisect
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from utils.logger import default_logger as logger
+
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _rebalance_dates(year: int) -> List[date]:
+    """指数定期调整生效日：6月、12月第二个星期五的下一个交易日（按下周一估算）"""
+    result = []
+    for month in (6, 12):
+        first = date(year, month, 1)
+        second_friday = first + timedelta(days=(4 - first.weekday()) % 7 + 7)
+        result.append(second_friday + timedelta(days=3))
+    return result
+
+
+class ConstituentHistoryStore:
+    """
+    指数成分股历史存储
+
+    以成分区间[起始快照日, 结束快照日]记录每只股票的成分身份，只在距上次快照超过
+    refresh_days或跨过定期调整日时才请求新快照，其余日期直接由内存区间回答
+    """
+
+    def __init__(self, config, index_symbol: str):
+        self.index_symbol = index_symbol
+        self.refresh_days = config.constituent_refresh_days
+        self.path = config.get_cache_path('constituents', f"{index_symbol}.json")
+        self._checkpoints: List[str] = []  # 已请求快照的日期，升序
+        self._intervals: Dict[str, List[List[str]]] = {}  # 标的 -> 成分区间列表
+        self._members_cache: Dict[str, List[str]] = {}
+        self._load()
+
+    def get_members(self, trade_date: str, loader: Callable[[str], List[str]]) -> List[str]:
+        """获取trade_date当日的成分股，必要时通过loader请求快照"""
+        checkpoint = self._latest_checkpoint(trade_date)
+        if checkpoint is None or self._needs_refresh(checkpoint, trade_date):
+            members = loader(trade_date)
+            if members:
+                self._insert(trade_date, members)
+                self._save()
+                checkpoint = trade_date
+            elif checkpoint is not None:
+                logger.warning(f"获取{trade_date}成分股快照失败，沿用{checkpoint}快照")
+            else:
+                return []
+        return self._members_at(checkpoint)
+
+    def _latest_checkpoint(self, trade_date: str) -> Optional[str]:
+        idx = bisect.bisect_right(self._checkpoints, trade_date)
+        return self._checkpoints[idx - 1] if idx > 0 else None
+
+    def _needs_refresh(self, checkpoint: str, trade_date: str) -> bool:
+        if checkpoint == trade_date:
+            return False
+        start = _parse_date(checkpoint)
+        end = _parse_date(trade_date)
+        if (end - start).days >= self.refresh_days:
+            return True
+        for year in range(start.year, end.year + 1):
+            for effective_date in _rebalance_dates(year):
+                if start < effective_date <= end:
+                    return True
+        return False
+
+    def _members_at(self, checkpoint: str) -> List[str]:
+        members = self._members_cache.get(checkpoint)
+        if members is None:
+            members = sorted(symbol for symbol, intervals in self._intervals.items()
+                             if any(start <= checkpoint <= end for start, end in intervals))
+            self._members_cache[checkpoint] = members
+        return members
+
+    def _insert(self, trade_date: str, members: List[str]):
+        """在快照序列中插入新快照并维护成分区间"""
+        idx = bisect.bisect_left(self._checkpoints, trade_date)
+        prev_checkpoint = self._checkpoints[idx - 1] if idx > 0 else None
+        next_checkpoint = self._checkpoints[idx] if idx < len(self._checkpoints) else None
+        member_set = set(members)
+
+        for symbol in member_set:
+            intervals = self._intervals.setdefault(symbol, [])
+            if any(start <= trade_date <= end for start, end in intervals):
+                continue
+            ended = next((iv for iv in intervals if iv[1] == prev_checkpoint), None)
+            started = next((iv for iv in intervals if iv[0] == next_checkpoint), None)
+            if ended is not None and started is not None:
+                ended[1] = started[1]
+                intervals.remove(started)
+            elif ended is not None:
+                ended[1] = trade_date
+            elif started is not None:
+                started[0] = trade_date
+            else:
+                intervals.append([trade_date, trade_date])
+                intervals.sort()
+
+        # 非成分股若原区间跨过新快照日，则在该日拆分
+        for symbol, intervals in self._intervals.items():
+            if symbol in member_set:
+                continue
+            for interval in list(intervals):
+                if interval[0] < trade_date < interval[1]:
+                    intervals.remove(interval)
+                    intervals.extend([[interval[0], prev_checkpoint], [next_checkpoint, interval[1]]])
+                    intervals.sort()
+
+        self._checkpoints.insert(idx, trade_date)
+        self._members_cache.clear()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._checkpoints = sorted(data.get('checkpoints', []))
+            self._intervals = data.get('intervals', {})
+            logger.debug(f"加载{self.index_symbol}成分股历史，快照{len(self._checkpoints)}个")
+        except Exception as e:
+            logger.warning(f"加载成分股历史失败: {e}")
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'index': self.index_symbol,
+                    'checkpoints': self._checkpoints,
+                    'intervals': self._intervals
+                }, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"保存成分股历史失败: {e}")
@@ -1,54 +1,29 @@
 # coding=utf-8
 from typing import List
-from gm.api import *
+from core.base import IMarketAdapter
 from data.base_data_manager import BaseDataManager
+from data.constituent_store import ConstituentHistoryStore
 from utils.logger import default_logger as logger
 
 
 class IndexConstituentsDataManager(BaseDataManager):
     """指数成分股数据管理器"""
 
+    def __init__(self, config, adapter: IMarketAdapter):
+        super().__init__(config, adapter)
+        # 成分股历史存储，成分股调整不频繁，大部分交易日直接由内存回答
+        self.constituents = ConstituentHistoryStore(config, config.constituent_index)
+
     def get_stock_pool(self, context, size: int) -> List[str]:
         """获取指数成分股"""
         try:
-            if self.config.mode == 'BACKTEST':
-                constituents_data = stk_get_index_constituents(
-                    index='SHSE.000300',
-                    trade_date=context.now.strftime('%Y-%m-%d')
-                )
-            else:
-                constituents_data = stk_get_index_constituents(index='SHSE.000300')
-
-            if constituents_data is None or len(constituents_data) == 0:
+            symbols = self.constituents.get_members(context.now.strftime('%Y-%m-%d'), self._load_constituents)
+            if not symbols:
                 logger.warning("获取到的成分股数据为空")
                 return []
 
-            if hasattr(constituents_data, 'columns') and 'symbol' in constituents_data.columns:
-                symbols = constituents_data['symbol'].tolist()
-            else:
-                logger.warning("成分股数据格式未知")
-                return []
-
-            filtered_symbols = []
-            for symbol in symbols[:size * 3]:
-                try:
-                    symbol_str = str(symbol).strip()
-                    if not symbol_str:
-                        continue
-                    stock_info_list = get_instrumentinfos(symbols=symbol_str)
-                    if not stock_info_list:
-                        continue
-                    stock_info = stock_info_list[0]
-                    symbol_name = getattr(stock_info, 'symbol_name', '')
-                    if symbol_name and ('ST' in symbol_name or '*ST' in symbol_name):
-                        continue
-                    if not symbol_str.startswith('BJ'):
-                        filtered_symbols.append(symbol_str)
-                except Exception as e:
-                    logger.debug(f"过滤股票{symbol}时出错: {e}")
-                    continue
-                if len(filtered_symbols) >= size:
-                    break
+            # 批量基础信息缓存过滤ST、北交所股票
+            filtered_symbols = self.instruments.filter_tradable(context, symbols)
 
             logger.info(f"获取到{len(filtered_symbols)}只成分股")
             return filtered_symbols[:size]
@@ -56,3 +31,21 @@ class IndexConstituentsDataManager(BaseDataManager):
         except Exception as e:
             logger.error(f"获取指数成分股失败: {e}")
             return []
+
+    def _load_constituents(self, trade_date: str) -> List[str]:
+        """请求指定日期的成分股快照"""
+        if self.config.mode == 'BACKTEST':
+            constituents_data = self.adapter.stk_get_index_constituents(
+                index=self.config.constituent_index,
+                trade_date=trade_date
+            )
+        else:
+            constituents_data = self.adapter.stk_get_index_constituents(index=self.config.constituent_index)
+
+        if constituents_data is None or len(constituents_data) == 0:
+            return []
+
+        if hasattr(constituents_data, 'columns') and 'symbol' in constituents_data.columns:
+            return constituents_data['symbol'].tolist()
+        logger.warning("成分股数据格式未知")
+        return []
@@ -0,0 +1,74 @@
+# coding=utf-8
+import os
+from datetime import datetime
+from typing import Dict, List
+
+import pandas as pd
+
+from core.base import IMarketAdapter
+from utils.logger import default_logger as logger
+
+
+class InstrumentInfoCache:
+    """
+    证券基础信息缓存
+
+    一次请求批量加载沪深全部股票的基础信息，按数据来源和交易日保存到本地，
+    供股票池过滤、订单日志显示股票名称等组件共享
+    """
+
+    FIELDS = 'symbol,sec_name'
+
+    def __init__(self, config, adapter: IMarketAdapter):
+        self.config = config
+        self.adapter = adapter
+        self.cache_dir = config.get_cache_path('instruments', config.get_data_source())
+        self._date = None
+        self._data = pd.DataFrame(columns=['symbol', 'sec_name'])
+        self._names: Dict[str, str] = {}
+
+    def _snapshot_date(self, context) -> str:
+        """快照日期：回测与实盘均按策略当前交易日，无context时按自然日"""
+        if context is None:
+            return datetime.now().strftime('%Y-%m-%d')
+        return context.now.strftime('%Y-%m-%d')
+
+    def load(self, context=None) -> pd.DataFrame:
+        """加载基础信息，同一日期只请求一次"""
+        snapshot_date = self._snapshot_date(context)
+        if self._date == snapshot_date:
+            return self._data
+
+        path = os.path.join(self.cache_dir, f"{snapshot_date}.csv")
+        data = None
+        if os.path.exists(path):
+            data = pd.read_csv(path, dtype=str).fillna('')
+        else:
+            try:
+                data = self.adapter.get_instrumentinfos(exchanges='SHSE,SZSE', sec_types=1, fields=self.FIELDS, df=True)
+            except Exception as e:
+                logger.error(f"批量获取证券基础信息失败: {e}")
+            if data is not None and not data.empty:
+                data = data[['symbol', 'sec_name']].astype(str)
+                os.makedirs(self.cache_dir, exist_ok=True)
+                data.to_csv(path, index=False)
+
+        if data is None or data.empty:
+            return self._data
+        self._date = snapshot_date
+        self._data = data.reset_index(drop=True)
+        self._names = dict(zip(self._data['symbol'], self._data['sec_name']))
+        logger.info(f"加载证券基础信息{len(self._data)}条")
+        return self._data
+
+    def get_name(self, symbol: str) -> str:
+        """获取股票名称，未加载时返回空字符串"""
+        return self._names.get(symbol, '')
+
+    def filter_tradable(self, context, symbols: List[str]) -> List[str]:
+        """过滤ST、北交所及无基础信息的股票，保持原有顺序"""
+        self.load(context)
+        pool = pd.Series([str(symbol).strip() for symbol in symbols], dtype=object)
+        names = pool.map(self._names)
+        mask = names.notna() & ~names.fillna('').str.contains('ST', regex=False) & ~pool.str.startswith('BJ')
+        return pool[mask].tolist()
@@ -0,0 +1,36 @@
+# coding=utf-8
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List
+
+from core.base import IDataManager
+from utils.logger import default_logger as logger
+
+
+class HistoryPrefetcher:
+    """开盘前历史数据预取器，线程池并发批量加载股票池历史数据到数据管理器缓存"""
+
+    def __init__(self, config, data_manager: IDataManager):
+        self.config = config
+        self.data_manager = data_manager
+        self.max_workers = max(1, config.prefetch_workers)
+
+    def prefetch(self, context, symbols: List[str], count: int, frequency: str = '1d') -> int:
+        """按批次并发预取，返回成功预取的股票数量"""
+        if not symbols or count <= 0:
+            return 0
+        start = time.perf_counter()
+        batch_size = max(1, self.config.history_batch_size)
+        batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+        prefetched = 0
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            futures = [executor.submit(self.data_manager.get_stock_data_batch, context, batch, count, frequency)
+                       for batch in batches]
+            for future in as_completed(futures):
+                try:
+                    prefetched += len(future.result())
+                except Exception as e:
+                    logger.error(f"预取历史数据失败: {e}")
+        elapsed = time.perf_counter() - start
+        logger.info(f"预取历史数据完成: {prefetched}/{len(symbols)}只，{count}根{frequency}K线，耗时{elapsed:.2f}秒")
+        return prefetched
@@ -0,0 +1,97 @@
+# coding=utf-8
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.base import IMarketAdapter
+from utils.data_converter import DataConverter
+from utils.logger import default_logger as logger
+
+
+class QuoteSnapshot:
+    """
+    实时行情快照
+
+    由策略在每个回调开始时begin、结束时end，快照只在该回调内有效，各组件共享；
+    回调开始时批量请求涉及的全部标的，之后的查询不再访问行情接口。
+    不依赖context.now判断时刻（实盘中为每次访问时的系统时间）；回调之外的查询直接请求接口，不缓存
+    """
+
+    FIELDS = ('open', 'high', 'low', 'price', 'volume', 'amount')
+
+    def __init__(self, adapter: IMarketAdapter):
+        self.adapter = adapter
+        self._depth = 0  # 回调嵌套层数，大于0时快照有效
+        self._quotes: Dict[str, Dict[str, float]] = {}
+        self._requested = set()  # 本次回调已请求过的标的，包括未返回行情的标的
+        self.callbacks = 0
+        self.requests = 0
+
+    def begin(self):
+        """回调开始，丢弃上一次回调的快照"""
+        if self._depth == 0:
+            self._quotes = {}
+            self._requested = set()
+            self.callbacks += 1
+        self._depth += 1
+
+    def end(self):
+        """回调结束，快照失效"""
+        self._depth = max(0, self._depth - 1)
+        if self._depth == 0:
+            self._quotes = {}
+            self._requested = set()
+
+    @property
+    def active(self) -> bool:
+        return self._depth > 0
+
+    def _fetch(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """一次请求批量获取行情"""
+        self.requests += 1
+        try:
+            current_data = self.adapter.current(symbols=symbols, fields=','.join(self.FIELDS))
+        except Exception as e:
+            logger.error(f"批量获取实时行情失败: {e}")
+            current_data = []
+        return {
+            data['symbol']: {field: DataConverter.safe_float(data.get(field, 0)) for field in self.FIELDS}
+            for data in current_data or []
+        }
+
+    def load(self, symbols: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """一次请求批量加载本次回调尚未请求过的标的行情，返回这些标的的快照"""
+        symbol_list = list(dict.fromkeys(str(symbol).strip() for symbol in symbols if str(symbol).strip()))
+        if not self.active:
+            return self._fetch(symbol_list) if symbol_list else {}
+        missing = [symbol for symbol in symbol_list if symbol not in self._requested]
+        if missing:
+            self._requested.update(missing)
+            self._quotes.update(self._fetch(missing))
+        return {symbol: self._quotes[symbol] for symbol in symbol_list if symbol in self._quotes}
+
+    def update(self, symbol: str, bar: Dict[str, Any]):
+        """用推送的K线更新本次回调的行情，之后的查询不再请求接口"""
+        if not self.active:
+            return
+        self._requested.add(symbol)
+        quote = self._quotes.get(symbol)
+        if quote is None:
+            quote = self._quotes[symbol] = {}
+        quote['open'] = DataConverter.safe_float(bar.get('open', 0))
+        quote['high'] = DataConverter.safe_float(bar.get('high', 0))
+        quote['low'] = DataConverter.safe_float(bar.get('low', 0))
+        quote['price'] = DataConverter.safe_float(bar.get('close', 0))
+        quote['volume'] = DataConverter.safe_float(bar.get('volume', 0))
+        quote['amount'] = DataConverter.safe_float(bar.get('amount', 0))
+
+    def get(self, symbol: str) -> Optional[Dict[str, float]]:
+        """获取单个标的快照，未预加载时单独请求"""
+        symbol = str(symbol).strip()
+        return self.load([symbol]).get(symbol)
+
+    def get_price(self, symbol: str) -> float:
+        """获取最新价，无行情时返回0"""
+        quote = self.get(symbol)
+        return quote['price'] if quote else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'callbacks': self.callbacks, 'symbols': len(self._quotes), 'requests': self.requests}
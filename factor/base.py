@@ -0,0 +1,54 @@
+# coding=utf-8
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+import numpy as np
+
+
+class Node(ABC):
+    """
+    因子计算图节点
+
+    name唯一标识节点（包含参数），同名节点在一次计算中只计算一次；
+    inputs为依赖的上游节点，lookback为计算所需的K线数量，
+    offset为节点输出的第一列之前消耗的K线数（如收益率为1）
+    """
+
+    offset: int = 0
+
+    def __init__(self, name: str, inputs: Sequence['Node'] = (), lookback: int = 0):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.lookback = max([lookback] + [node.lookback for node in self.inputs])
+
+    @abstractmethod
+    def compute(self, *values: np.ndarray) -> np.ndarray:
+        """由上游节点的值计算本节点的值"""
+        pass
+
+    @property
+    def signature(self) -> str:
+        """节点的完整定义（类型、参数及全部上游节点），定义不同的节点签名不同"""
+        if not self.inputs:
+            return f"{self.__class__.__name__}({self.name})"
+        inputs = ', '.join(node.signature for node in self.inputs)
+        return f"{self.__class__.__name__}({self.name}; {inputs})"
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name})"
+
+
+class Field(Node):
+    """行情字段叶子节点，值为 标的数 × K线数 的右对齐矩阵，由输入数据直接提供"""
+
+    def __init__(self, field: str):
+        super().__init__(field, lookback=1)
+
+    def compute(self, *values: np.ndarray) -> np.ndarray:
+        raise RuntimeError(f"行情字段{self.name}需由输入数据提供")
+
+
+class Factor(Node):
+    """因子节点，输出每只股票一个值的截面；higher_is_better为False时值越小排名越高"""
+
+    higher_is_better: bool = True
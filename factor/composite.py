@@ -0,0 +1,54 @@
+# coding=utf-8
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from factor.graph import FactorGraph
+from factor.registry import create_factor
+
+
+class CompositeFactorScorer:
+    """多因子合成：各因子按截面百分位排名后加权平均，因子值缺失的股票该因子不计权重"""
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = {name: weight for name, weight in weights.items() if weight}
+        if not self.weights:
+            raise ValueError("多因子权重为空")
+        self.factors = [create_factor(name) for name in self.weights]
+        self.graph = FactorGraph(self.factors)
+        self._subgraphs: Dict[Tuple[str, ...], FactorGraph] = {}
+
+    @property
+    def lookback(self) -> int:
+        return self.graph.lookback
+
+    @property
+    def fields(self):
+        return self.graph.fields
+
+    def subgraph(self, names: Sequence[str]) -> FactorGraph:
+        """部分因子的依赖图，用于只补算缺失的因子"""
+        key = tuple(names)
+        if key == tuple(self.weights):
+            return self.graph
+        if key not in self._subgraphs:
+            self._subgraphs[key] = FactorGraph([factor for factor in self.factors if factor.name in key])
+        return self._subgraphs[key]
+
+    def score(self, data: Dict[str, np.ndarray]) -> np.ndarray:
+        """由行情矩阵计算综合得分"""
+        return self.combine(self.graph.evaluate(data))
+
+    def combine(self, values: Dict[str, np.ndarray]) -> np.ndarray:
+        """由因子值计算综合得分，取值[0, 1]，所有因子都缺失的股票得分为0"""
+        total = None
+        weight_sum = None
+        for factor in self.factors:
+            ranks = pd.Series(values[factor.name]).rank(pct=True, ascending=factor.higher_is_better).to_numpy()
+            weight = self.weights[factor.name] * ~np.isnan(ranks)
+            contribution = np.nan_to_num(ranks) * weight
+            total = contribution if total is None else total + contribution
+            weight_sum = weight if weight_sum is None else weight_sum + weight
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(weight_sum > 0, total / weight_sum, 0.0)
@@ -0,0 +1,52 @@
+# coding=utf-8
+import numpy as np
+
+from factor.base import Factor
+from factor.primitives import CLOSE, VOLUME, Lag, Last, Returns, RollingMean, RollingStd
+
+
+class Momentum(Factor):
+    """k日动量"""
+
+    def __init__(self, k: int):
+        super().__init__(f"momentum_{k}", (Last(CLOSE), Lag(CLOSE, k)))
+
+    def compute(self, last: np.ndarray, lagged: np.ndarray) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (last - lagged) / lagged
+
+
+class MADeviation(Factor):
+    """相对window日均线的偏离，负偏离越大排名越高（均值回归）"""
+
+    higher_is_better = False
+
+    def __init__(self, window: int):
+        super().__init__(f"ma_deviation_{window}", (Last(CLOSE), RollingMean(CLOSE, window)))
+
+    def compute(self, last: np.ndarray, ma: np.ndarray) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (last - ma) / ma
+
+
+class Volatility(Factor):
+    """window日年化波动率，波动越低排名越高"""
+
+    higher_is_better = False
+
+    def __init__(self, window: int):
+        super().__init__(f"volatility_{window}", (RollingStd(Returns(CLOSE), window),))
+
+    def compute(self, std: np.ndarray) -> np.ndarray:
+        return std * np.sqrt(252)
+
+
+class VolumeRatio(Factor):
+    """短期与长期平均成交量之比"""
+
+    def __init__(self, short: int, long: int):
+        super().__init__(f"volume_ratio_{short}_{long}", (RollingMean(VOLUME, short), RollingMean(VOLUME, long)))
+
+    def compute(self, short_mean: np.ndarray, long_mean: np.ndarray) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return short_mean / long_mean
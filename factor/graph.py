@@ -0,0 +1,51 @@
+# coding=utf-8
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from factor.base import Factor, Field, Node
+
+
+class FactorGraph:
+    """
+    因子依赖图
+
+    按节点名称合并各因子共用的中间量（收益率、均线、标准差等），
+    构建时确定拓扑顺序，计算时每个节点只计算一次，所有因子共享一次数据读取
+    """
+
+    def __init__(self, factors: Sequence[Factor]):
+        self.factors: List[Factor] = list(factors)
+        self.nodes: List[Node] = []
+        seen = set()
+        for factor in self.factors:
+            self._visit(factor, seen)
+        self.fields: List[str] = [node.name for node in self.nodes if isinstance(node, Field)]
+        self.lookback: int = max([node.lookback for node in self.nodes] + [1])
+
+    def _visit(self, node: Node, seen: set):
+        """深度优先遍历，依赖节点排在前面，同名节点只保留第一个"""
+        if node.name in seen:
+            return
+        seen.add(node.name)
+        for upstream in node.inputs:
+            self._visit(upstream, seen)
+        self.nodes.append(node)
+
+    def evaluate(self, data: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        计算全部因子
+
+        Args:
+            data: 行情字段 -> 标的数 × K线数 的右对齐矩阵
+
+        Returns:
+            因子名称 -> 每只股票的因子值
+        """
+        values: Dict[str, np.ndarray] = {}
+        for node in self.nodes:
+            if isinstance(node, Field):
+                values[node.name] = data[node.name]
+            else:
+                values[node.name] = node.compute(*(values[upstream.name] for upstream in node.inputs))
+        return {factor.name: values[factor.name] for factor in self.factors}
@@ -0,0 +1,69 @@
+# coding=utf-8
+import numpy as np
+
+from factor.base import Field, Node
+from utils import indicators
+
+CLOSE = Field('close')
+VOLUME = Field('volume')
+
+
+class Returns(Node):
+    """简单收益率序列，列数比源矩阵少1"""
+
+    offset = 1
+
+    def __init__(self, source: Node = CLOSE):
+        super().__init__(f"{source.name}_returns", (source,), lookback=2 + source.offset)
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        return indicators.RateOfChange.compute(values, 1)[:, 1:]
+
+
+class Last(Node):
+    """最新值截面"""
+
+    def __init__(self, source: Node = CLOSE):
+        super().__init__(f"{source.name}_last", (source,), lookback=1 + source.offset)
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        return values[:, -1] if values.shape[1] > 0 else np.full(len(values), np.nan)
+
+
+class Lag(Node):
+    """k根K线之前的值截面，K线不足时为NaN"""
+
+    def __init__(self, source: Node, k: int):
+        super().__init__(f"{source.name}_lag_{k}", (source,), lookback=k + 1 + source.offset)
+        self.k = k
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        if values.shape[1] <= self.k:
+            return np.full(len(values), np.nan)
+        return values[:, -self.k - 1]
+
+
+class RollingMean(Node):
+    """最近window个值的均值截面，窗口内有缺失时为NaN"""
+
+    def __init__(self, source: Node, window: int):
+        super().__init__(f"{source.name}_mean_{window}", (source,), lookback=window + source.offset)
+        self.window = window
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        if values.shape[1] < self.window:
+            return np.full(len(values), np.nan)
+        return indicators.MovingAverage.compute(values[:, -self.window:], self.window)[:, -1]
+
+
+class RollingStd(Node):
+    """最近window个值的标准差截面（总体标准差），窗口内有缺失时为NaN"""
+
+    def __init__(self, source: Node, window: int):
+        super().__init__(f"{source.name}_std_{window}", (source,), lookback=window + source.offset)
+        self.window = window
+
+    def compute(self, values: np.ndarray) -> np.ndarray:
+        if values.shape[1] < self.window:
+            return np.full(len(values), np.nan)
+        return indicators.RollingStd.compute(values[:, -self.window:], self.window)[:, -1]
@@ -0,0 +1,29 @@
+# coding=utf-8
+from typing import Callable, Dict, List
+
+from factor.base import Factor
+from factor.factors import MADeviation, Momentum, Volatility, VolumeRatio
+
+# 因子名称 -> 构造函数，新增因子在此注册
+FACTORS: Dict[str, Callable[[], Factor]] = {
+    'momentum_5': lambda: Momentum(5),
+    'momentum_10': lambda: Momentum(10),
+    'momentum_20': lambda: Momentum(20),
+    'ma_deviation_5': lambda: MADeviation(5),
+    'ma_deviation_10': lambda: MADeviation(10),
+    'ma_deviation_20': lambda: MADeviation(20),
+    'volatility_10': lambda: Volatility(10),
+    'volatility_20': lambda: Volatility(20),
+    'volume_ratio_5_20': lambda: VolumeRatio(5, 20),
+}
+
+
+def create_factor(name: str) -> Factor:
+    """按名称创建因子"""
+    if name not in FACTORS:
+        raise ValueError(f"未知因子: {name}，可选: {', '.join(FACTORS)}")
+    return FACTORS[name]()
+
+
+def available_factors() -> List[str]:
+    return list(FACTORS)
@@ -0,0 +1,94 @@
+# coding=utf-8
+import hashlib
+import os
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from factor.base import Factor
+from utils.logger import default_logger as logger
+
+
+class FactorStore:
+    """
+    因子值持久化存储
+
+    按(因子, 交易日, 标的)保存因子值，每个因子每个交易日一个.npy文件，
+    内容为按代码排序的(symbol, value)结构化数组；已计算的截面直接读取，
+    新交易日或新增标的只补算缺失部分并合并写回。
+    存储目录按数据来源区分，因子以key()为键，参数或计算方式变化后不会读到旧的因子值
+    """
+
+    DTYPE = np.dtype([('symbol', 'U32'), ('value', '<f8')])
+
+    def __init__(self, config):
+        self.root_dir = config.get_cache_path('factors', config.get_data_source())
+        # 因子 -> (交易日, 记录)，只保留最近读取的交易日
+        self._memory: Dict[str, Tuple[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(factor: Factor) -> str:
+        """因子的存储键：因子名称加完整定义的哈希"""
+        digest = hashlib.md5(factor.signature.encode('utf-8')).hexdigest()[:8]
+        return f"{factor.name}_{digest}"
+
+    def _path(self, factor: str, trade_date: str) -> str:
+        return os.path.join(self.root_dir, factor, f"{trade_date}.npy")
+
+    def _records(self, factor: str, trade_date: str) -> np.ndarray:
+        cached = self._memory.get(factor)
+        if cached is not None and cached[0] == trade_date:
+            return cached[1]
+        records = np.empty(0, dtype=self.DTYPE)
+        path = self._path(factor, trade_date)
+        if os.path.exists(path):
+            try:
+                records = np.load(path)
+            except Exception as e:
+                logger.warning(f"读取因子{factor} {trade_date}失败: {e}")
+        self._memory[factor] = (trade_date, records)
+        return records
+
+    def load(self, factor: str, trade_date: str, symbols: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        读取因子截面
+
+        Returns:
+            (与symbols对齐的因子值, 是否已存储的掩码)，未存储的标的值为NaN，需要重新计算
+        """
+        records = self._records(factor, trade_date)
+        keys = np.asarray(symbols, dtype=self.DTYPE['symbol'])
+        if len(records) == 0 or len(keys) == 0:
+            return np.full(len(keys), np.nan), np.zeros(len(keys), dtype=bool)
+        positions = np.minimum(np.searchsorted(records['symbol'], keys), len(records) - 1)
+        stored = records['value'][positions]
+        # 早期版本可能写入过NaN，按未存储处理
+        found = (records['symbol'][positions] == keys) & np.isfinite(stored)
+        return np.where(found, stored, np.nan), found
+
+    def save(self, factor: str, trade_date: str, symbols: List[str], values: np.ndarray):
+        """合并写入因子值，同一标的以新值为准；NaN等非有限值（如行情获取失败）不保存，下次重新计算"""
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.isfinite(values)
+        if not finite.any():
+            return
+        new_records = np.empty(int(finite.sum()), dtype=self.DTYPE)
+        new_records['symbol'] = np.asarray(symbols)[finite]
+        new_records['value'] = values[finite]
+        with self._lock:
+            records = self._records(factor, trade_date)
+            records = records[~np.isin(records['symbol'], new_records['symbol'])]
+            records = np.concatenate([records, new_records])
+            records.sort(order='symbol')
+            path = self._path(factor, trade_date)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, records)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.warning(f"保存因子{factor} {trade_date}失败: {e}")
+            self._memory[factor] = (trade_date, records)
@@ -1,6 +1,9 @@
 from typing import Optional
 
+from adapter.gm_adapter import GMAdapter
+from adapter.replay_adapter import ReplayAdapter
 from config.trading_config import TradingConfig
+from core.base import IMarketAdapter
 # 数据管理
 from data.base_data_manager import BaseDataManager
 from data.fixed_data_manager import FixedStockPoolDataManager
@@ -11,6 +14,7 @@ from strategies.risk_managers.base_risk import BaseRiskManager
 from strategies.risk_managers.conservative_risk import ConservativeRiskManager
 # 选股策略
 from strategies.selection_strategies.base_selection import BaseStockSelectionStrategy
+from strategies.selection_strategies.factor_selection import CompositeFactorSelectionStrategy
 from strategies.selection_strategies.mean_reversion_selection import MeanReversionStockSelectionStrategy
 from strategies.selection_strategies.momentum_selection import MomentumStockSelectionStrategy
 from strategies.selection_strategies.volatility_selection import VolatilityStockSelectionStrategy
@@ -31,7 +35,20 @@ class StrategyFactory:
     """策略工厂类"""
 
     @staticmethod
-    def create_data_manager(config: TradingConfig,
+    def create_market_adapter(config: TradingConfig, adapter_type: Optional[str] = None) -> IMarketAdapter:
+        """创建行情与交易接口适配器"""
+        if adapter_type is None:
+            adapter_type = config.adapter_type
+
+        logger.info(f"创建接口适配器，类型: {adapter_type}")
+
+        if adapter_type == "replay":
+            return ReplayAdapter(config)
+        else:  # 默认使用掘金量化
+            return GMAdapter(config)
+
+    @staticmethod
+    def create_data_manager(config: TradingConfig, adapter: IMarketAdapter,
                             data_manager_type: Optional[str] = None) -> BaseDataManager:
         """创建数据管理器"""
         if data_manager_type is None:
@@ -40,9 +57,9 @@ class StrategyFactory:
         logger.info(f"创建数据管理器，类型: {data_manager_type}")
 
         if data_manager_type == "index":
-            return IndexConstituentsDataManager(config)
+            return IndexConstituentsDataManager(config, adapter)
         else:  # 默认使用固定股票池
-            return FixedStockPoolDataManager(config)
+            return FixedStockPoolDataManager(config, adapter)
 
     @staticmethod
     def create_timing_strategy(config: TradingConfig, timing_type: Optional[str] = None) -> BaseTimingStrategy:
@@ -72,6 +89,8 @@ class StrategyFactory:
             return MeanReversionStockSelectionStrategy(config)
         elif selection_type == "volatility":
             return VolatilityStockSelectionStrategy(config)
+        elif selection_type == "factor":
+            return CompositeFactorSelectionStrategy(config)
         else:  # 默认使用动量选股
             return MomentumStockSelectionStrategy(config)
 
@@ -91,8 +110,8 @@ class StrategyFactory:
             return BaseRiskManager(config)
 
     @staticmethod
-    def create_trade_executor(config: TradingConfig, risk_manager: BaseRiskManager,
-                              executor_type: Optional[str] = None) -> BaseTradeExecutor:
+    def create_trade_executor(config: TradingConfig, risk_manager: BaseRiskManager, adapter: IMarketAdapter,
+                              data_manager: BaseDataManager, executor_type: Optional[str] = None) -> BaseTradeExecutor:
         """创建交易执行器"""
         if executor_type is None:
             executor_type = config.trade_executor_type
@@ -100,8 +119,8 @@ class StrategyFactory:
         logger.info(f"创建交易执行器，类型: {executor_type}")
 
         if executor_type == "limit":
-            return LimitPriceTradeExecutor(config, risk_manager)
+            return LimitPriceTradeExecutor(config, risk_manager, adapter, data_manager)
         elif executor_type == "vwap":
-            return VWAPTradeExecutor(config, risk_manager)
+            return VWAPTradeExecutor(config, risk_manager, adapter, data_manager)
         else:  # 默认市价执行
-            return BaseTradeExecutor(config, risk_manager)
+            return BaseTradeExecutor(config, risk_manager, adapter, data_manager)
@@ -4,7 +4,6 @@ import sys
 from typing import Optional, Dict, Any
 from datetime import datetime
 try:
-    from gm.api import *
     from config.trading_config import TradingConfig
     from strategy.base_strategy import BaseStrategy
     from strategy.quantitative_strategy import QuantitativeTradingStrategy
@@ -14,7 +13,6 @@ except ImportError as e:
     root_path = os.path.dirname(os.path.abspath(__file__))
     if root_path not in sys.path:
         sys.path.append(root_path)
-    from gm.api import *
     from config.trading_config import TradingConfig
     from strategy.base_strategy import BaseStrategy
     from strategy.quantitative_strategy import QuantitativeTradingStrategy
@@ -147,13 +145,11 @@ def on_order_status(context, order: Dict[str, Any]) -> None:
             f"状态详情: {ord_rej_reason_detail}"
         )
         # 获取股票名称（如果有）
-        stock_name = ""
-        if hasattr(context, 'stock_name_list') and symbol in context.stock_name_list:
-            stock_name = context.stock_name_list[symbol]
+        stock_name = strategy.context.data_manager.instruments.get_name(symbol)
         # 完整消息
         full_msg = f"{status_msg}, 标的: {stock_name or symbol}, {detail_msg}"
-        # 更新持仓信息
-        strategy.context.risk_manager.update_position_all(context=context)
+        # 持仓记录由成交回报增量更新，此处只需使账户快照失效
+        strategy.context.risk_manager.invalidate_portfolio()
         # 根据状态选择日志级别
         if status == 3:  # 委托全部成交
             logger.info(full_msg)
@@ -163,6 +159,27 @@ def on_order_status(context, order: Dict[str, Any]) -> None:
         logger.error(f"处理订单状态时发生错误: {e}, 订单数据: {order}")
 
 
+def on_execution_report(context, execrpt: Dict[str, Any]) -> None:
+    """成交回报回调，增量更新对应标的的持仓记录"""
+    try:
+        logger.debug(
+            f"成交回报: {execrpt.get('symbol')}, 方向: {execrpt.get('side')}, "
+            f"成交数量: {execrpt.get('volume', 0):.0f}, 成交价格: ¥{execrpt.get('price', 0):.2f}"
+        )
+        strategy.context.risk_manager.apply_execution(context, execrpt)
+    except Exception as e:
+        logger.error(f"处理成交回报时发生错误: {e}, 回报数据: {execrpt}")
+
+
+def on_bar(context, bars) -> None:
+    """K线推送回调，交由策略在流式模式下处理"""
+    try:
+        if strategy is not None:
+            strategy.on_bar(context, bars)
+    except Exception as e:
+        logger.error(f"处理K线推送时发生错误: {e}")
+
+
 def init(context) -> None:
     """策略初始化函数"""
     global strategy
@@ -175,8 +192,9 @@ def init(context) -> None:
         logger.debug(f"配置加载成功，策略ID: {config.strategy_id}")
         # 创建策略工厂
         factory = StrategyFactory()
-        # 创建策略实例
-        strategy = QuantitativeTradingStrategy(config, factory)
+        # 创建策略实例，离线回放时沿用回放上下文中的适配器
+        adapter = getattr(context, 'market_adapter', None)
+        strategy = QuantitativeTradingStrategy(config, factory, adapter)
         # 初始化策略
         strategy.init_strategy(context)
         logger.info("✅ 策略初始化完成")
@@ -205,32 +223,12 @@ def main() -> None:
             # 验证回测参数
             if not config.backtest_start or not config.backtest_end:
                 raise ValueError("回测开始时间或结束时间未设置")
-            run_params = {
-                'strategy_id': config.strategy_id,
-                'filename':"main.py",
-                'mode': MODE_BACKTEST,
-                'token': config.token,
-                'backtest_start_time': config.backtest_start,
-                'backtest_end_time': config.backtest_end,
-                'backtest_initial_cash': config.initial_cash,
-                'backtest_commission_ratio': config.commission_ratio,
-                'backtest_slippage_ratio': config.slippage_ratio
-            }
-            # 添加可选参数
-            if hasattr(config, 'backtest_transaction_ratio'):
-                run_params['backtest_transaction_ratio'] = config.backtest_transaction_ratio
-            logger.info(f"回测参数: {run_params}")
-            # 执行回测
-            run(**run_params)
         else:
             logger.info("💰 进入实盘交易模式")
             logger.warning("注意：实盘交易有风险，请谨慎操作！")
-            run(
-                strategy_id=config.strategy_id,
-                filename="main.py",
-                mode=MODE_LIVE,
-                token=config.token
-            )
+        # 通过接口适配器运行策略，回调函数为本模块中的init、on_order_status等
+        adapter = StrategyFactory.create_market_adapter(config)
+        adapter.run(sys.modules[__name__])
     except KeyboardInterrupt:
         logger.info("⏹️ 用户中断策略执行")
     except Exception as e:
@@ -1,7 +1,6 @@
 # coding=utf-8
 from strategies.risk_managers.base_risk import BaseRiskManager
 from utils.logger import default_logger as logger
-from utils.data_converter import DataConverter
 
 class AggressiveRiskManager(BaseRiskManager):
     """激进型风险管理器"""
@@ -13,30 +12,15 @@ class AggressiveRiskManager(BaseRiskManager):
         if not base_result:
             return False
         # 允许更高的单只股票仓位（40%）
-        account = context.account()
-        cash = DataConverter.safe_float(account.cash)
-        positions = account.positions()
-        total_position_value = 0
-        for pos in positions:
-            volume = DataConverter.safe_float(pos['volume'])
-            price = DataConverter.safe_float(pos['price'])
-            total_position_value += volume * price
-        total_assets = cash + total_position_value
-
-        current_position_value = 0
-        for pos in positions:
-            if pos['symbol'] == symbol:
-                volume = DataConverter.safe_float(pos['volume'])
-                price = DataConverter.safe_float(pos['price'])
-                current_position_value = volume * price
-                break
-
+        portfolio = self.get_portfolio(context)
+        total_assets = portfolio.total_assets
+        current_position_value = portfolio.market_value(symbol)
         if (current_position_value + plan_amount) > total_assets * 0.4:  # 更宽松的限制
             logger.debug(f"激进型单只股票仓位限制: {symbol}")
             return False
 
         # 允许更高的总仓位（90%）
-        if (total_position_value + plan_amount) > total_assets * 0.9:
+        if (portfolio.total_position_value + plan_amount) > total_assets * 0.9:
             logger.debug("激进型总仓位限制")
             return False
 
@@ -1,7 +1,8 @@
 # coding=utf-8
-from typing import Dict, Tuple, Any
+from typing import Dict, Tuple, Any, Optional
 
-from core.base import PositionRecord, IRiskManager
+from core.base import PortfolioSnapshot, PositionRecord, IRiskManager
+from core.constants import ExecType_Trade, OrderSide_Buy
 from utils.data_converter import DataConverter
 from utils.logger import default_logger as logger
 
@@ -10,8 +11,11 @@ class BaseRiskManager(IRiskManager):
     """基础风险管理器"""
 
     def update_position_all(self, context):
+        """全量核对持仓记录，已有记录保留移动止盈的最高价"""
+        self.invalidate_portfolio()
         account = context.account()
         positions = account.positions()
+        previous = self.position_records
         self.position_records = {}
         for pos in positions:
             symbol = pos['symbol']
@@ -19,43 +23,80 @@ class BaseRiskManager(IRiskManager):
             avg_cost = pos['vwap']
             update_time = pos['updated_at']
             self.update_position_record(context=context, symbol=symbol, avg_cost=avg_cost, volume=volume,update_time=update_time)
+            if symbol in previous:
+                record = self.position_records[symbol]
+                record.highest_price = max(record.highest_price, previous[symbol].highest_price)
+
+    def apply_execution(self, context, execrpt: Dict[str, Any]):
+        """按成交回报增量更新对应标的的持仓记录"""
+        self.invalidate_portfolio()
+        if execrpt.get('exec_type', ExecType_Trade) != ExecType_Trade:
+            return
+        symbol = execrpt['symbol']
+        volume = int(DataConverter.safe_float(execrpt.get('volume', 0)))
+        if volume <= 0:
+            return
+        price = DataConverter.safe_float(execrpt.get('price', 0))
+        exec_time = execrpt.get('created_at') or context.now
+        record = self.position_records.get(symbol)
+        if execrpt.get('side') == OrderSide_Buy:
+            amount = DataConverter.safe_float(execrpt.get('amount', 0)) or price * volume
+            held_volume = record.volume if record is not None else 0
+            held_cost = record.avg_cost if record is not None else 0.0
+            total_volume = held_volume + volume
+            avg_cost = (held_cost * held_volume + amount) / total_volume
+            self.update_position_record(context, symbol, avg_cost, total_volume, exec_time)
+            if record is not None:
+                # 加仓不重置移动止盈的最高价
+                current = self.position_records[symbol]
+                current.highest_price = max(current.highest_price, record.highest_price)
+        elif record is not None:
+            record.volume -= volume
+            record.update_time = exec_time
+            if record.volume <= 0:
+                del self.position_records[symbol]
 
     def __init__(self, config):
         self.config = config
         self.position_records: Dict[str, PositionRecord] = {}
         self.today_bought = set()
+        self._portfolio: Optional[PortfolioSnapshot] = None
+        self._callback_depth = 0  # 回调嵌套层数，大于0时快照在回调内共享
+
+    def begin_callback(self):
+        """回调开始，丢弃上一次回调的账户快照"""
+        if self._callback_depth == 0:
+            self._portfolio = None
+        self._callback_depth += 1
+
+    def end_callback(self):
+        """回调结束，账户快照失效"""
+        self._callback_depth = max(0, self._callback_depth - 1)
+        if self._callback_depth == 0:
+            self._portfolio = None
+
+    def get_portfolio(self, context) -> PortfolioSnapshot:
+        """获取本次回调的账户持仓快照，首次使用或持仓变化后重新读取账户，回调之外每次重新读取"""
+        if self._callback_depth == 0:
+            return PortfolioSnapshot.from_account(context)
+        if self._portfolio is None:
+            self._portfolio = PortfolioSnapshot.from_account(context)
+        return self._portfolio
+
+    def invalidate_portfolio(self):
+        """委托或持仓变化后使快照失效"""
+        self._portfolio = None
 
     def check_position_limits(self, context, symbol: str, plan_amount: float) -> bool:
         """检查仓位限制"""
         try:
-            account = context.account()
-            cash = DataConverter.safe_float(account.cash)
-
-            positions = account.positions()
-            total_position_value = 0
-            position_count = 0
-
-            for pos in positions:
-                volume = DataConverter.safe_float(pos['volume'])
-                price = DataConverter.safe_float(pos['price'])
-                position_value = volume * price
-                total_position_value += position_value
-
-                if volume > 0:
-                    position_count += 1
-
-            total_assets = cash + total_position_value
+            portfolio = self.get_portfolio(context)
+            total_assets = portfolio.total_assets
 
             if total_assets <= 0:
                 return False
 
-            current_position_value = 0
-            for pos in positions:
-                if pos['symbol'] == symbol:
-                    volume = DataConverter.safe_float(pos['volume'])
-                    price = DataConverter.safe_float(pos['price'])
-                    current_position_value = volume * price
-                    break
+            current_position_value = portfolio.market_value(symbol)
 
             # 检查单只股票仓位限制
             if (current_position_value + plan_amount) > total_assets * self.config.max_position_ratio:
@@ -63,12 +104,12 @@ class BaseRiskManager(IRiskManager):
                 return False
 
             # 检查总仓位限制
-            if (total_position_value + plan_amount) > total_assets * self.config.total_position_ratio:
+            if (portfolio.total_position_value + plan_amount) > total_assets * self.config.total_position_ratio:
                 logger.debug("总仓位限制")
                 return False
 
             # 检查最大持仓数量限制
-            if position_count >= self.config.max_positions and current_position_value == 0:
+            if portfolio.position_count >= self.config.max_positions and current_position_value == 0:
                 logger.debug("最大持仓数量限制")
                 return False
 
@@ -112,6 +153,11 @@ class BaseRiskManager(IRiskManager):
 
         return False, ""
 
+    def holds(self, symbol: str) -> bool:
+        """按持仓记录判断是否持有，持仓记录由成交回报增量维护，不读取账户"""
+        record = self.position_records.get(symbol)
+        return record is not None and record.volume > 0
+
     def can_sell_today(self, context, symbol: str) -> bool:
         """检查是否可以当日卖出"""
         if symbol in self.today_bought:
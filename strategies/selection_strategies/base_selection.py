@@ -1,19 +1,102 @@
 # coding=utf-8
-from typing import List
-from core.base import StockInfo, IStockSelectionStrategy
+from typing import List, Optional
+
+import numpy as np
+
+from core.base import SelectionResult, IStockSelectionStrategy
 from data.base_data_manager import IDataManager
+from utils.logger import default_logger as logger
 
 
 class BaseStockSelectionStrategy(IStockSelectionStrategy):
     """基础选股策略"""
 
+    # 评分所需的K线数量
+    data_count: int = 20
+    # 评分名称，用于日志
+    score_name: str = ""
+    # 得分依赖整个股票池（如截面排名）时为True，批量评分失败时不退回逐只评分
+    batch_only: bool = False
+
     def __init__(self, config):
         self.config = config
 
-    def select_stocks(self, context, data_manager: IDataManager) -> List[StockInfo]:
-        """选股策略 - 基础实现"""
-        raise NotImplementedError("子类必须实现此方法")
+    def select_stocks(self, context, data_manager: IDataManager) -> SelectionResult:
+        """选股策略 - 对股票池评分并选出得分最高的stock_pool_size只"""
+        stock_pool = data_manager.get_stock_pool(context, self.config.stock_pool_size * 2)  # 获取更多股票进行筛选
+
+        if not stock_pool:
+            logger.warning("股票池为空，无法进行选股")
+            return SelectionResult()
+
+        logger.info(f"开始对{len(stock_pool)}只股票进行{self.score_name}评分")
+        symbols = [str(symbol).strip() for symbol in stock_pool]
+        scores = None
+        try:
+            # 批量获取整个股票池的收盘价矩阵，一次矩阵运算完成评分
+            scores = self.score_universe(self.load_universe(context, symbols, data_manager))
+        except Exception as e:
+            if self.batch_only:
+                logger.error(f"{self.score_name}批量评分失败，得分依赖整个股票池截面，不能逐只评分，本次不选股: {e}")
+                return SelectionResult()
+            logger.warning(f"批量评分失败，改为逐只评分: {e}")
+
+        if scores is not None:
+            scored_symbols = symbols
+            scores = np.maximum(scores, 0.1)
+        else:
+            scored_symbols = []
+            score_list = []
+            for symbol_str in symbols:
+                try:
+                    score_list.append(max(self.calculate_score(context, symbol_str, data_manager), 0.1))
+                    scored_symbols.append(symbol_str)
+                except Exception as e:
+                    logger.debug(f"选股计算失败 {symbol_str}: {e}")
+                    continue
+            scores = np.asarray(score_list, dtype=np.float64)
+
+        if not scored_symbols:
+            logger.warning("没有股票被选中，使用备用方案")
+            scored_symbols = symbols[:self.config.stock_pool_size]
+            scores = np.full(len(scored_symbols), 0.5)
+
+        selected_stocks = SelectionResult.top_k(scored_symbols, scores, self.config.stock_pool_size)
+
+        logger.info(f"选股完成，选中{len(selected_stocks)}只股票，{selected_stocks.describe(self.config.max_positions)}")
+        logger.debug(f"选中股票: {', '.join(selected_stocks.symbols)}")
+
+        return selected_stocks
 
     def calculate_score(self, context, symbol: str, data_manager: IDataManager) -> float:
-        """计算股票得分 - 基础实现"""
-        raise NotImplementedError("子类必须实现此方法")
+        """计算单只股票得分，与批量评分使用同一套指标"""
+        try:
+            close_prices = data_manager.get_close(context, symbol, self.data_count)
+            scores = self.score_universe(close_prices[np.newaxis, :])
+        except Exception as e:
+            logger.debug(f"计算{symbol}得分失败: {e}")
+            return 0.5
+        if scores is None:
+            raise NotImplementedError("子类必须实现calculate_score或score_universe")
+        return float(scores[0])
+
+    def load_universe(self, context, symbols: List[str], data_manager: IDataManager):
+        """批量评分的输入数据，默认为收盘价矩阵"""
+        return data_manager.get_close_matrix(context, symbols, self.data_count)
+
+    def score_universe(self, closes: np.ndarray) -> Optional[np.ndarray]:
+        """
+        对整个股票池向量化评分，结果与逐只调用calculate_score一致
+
+        Args:
+            closes: 标的数 × data_count 的收盘价矩阵，每行按K线数右对齐，左侧缺失为NaN
+
+        Returns:
+            每只股票的得分，返回None表示不支持批量评分，改为逐只评分
+        """
+        return None
+
+    @staticmethod
+    def clip_score(score: np.ndarray) -> np.ndarray:
+        """得分限制在[0.1, 1.0]，无法计算（NaN）的得分按逐只评分的结果取0.1"""
+        return np.where(np.isnan(score), 0.1, np.clip(score, 0.1, 1.0))
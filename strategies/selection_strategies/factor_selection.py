@@ -0,0 +1,79 @@
+# coding=utf-8
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from data.base_data_manager import IDataManager
+from factor.composite import CompositeFactorScorer
+from factor.store import FactorStore
+from strategies.selection_strategies.base_selection import BaseStockSelectionStrategy
+from utils.logger import default_logger as logger
+
+
+class CompositeFactorSelectionStrategy(BaseStockSelectionStrategy):
+    """多因子选股策略，按配置的因子权重合成截面排名"""
+
+    score_name = "多因子"
+    batch_only = True
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.scorer = CompositeFactorScorer(config.factor_weights)
+        # 所需K线数量由各因子的回看长度决定
+        self.data_count = self.scorer.lookback
+        # 因子值按交易日持久化，重复回测直接读取
+        self.store = FactorStore(config) if config.factor_store_enabled else None
+        self._store_keys = {factor.name: FactorStore.key(factor) for factor in self.scorer.factors}
+        # 逐只评分时使用的当日截面得分：(交易日, 标的 -> 得分)
+        self._section: Optional[Tuple[str, Dict[str, float]]] = None
+        logger.info(f"多因子选股: 因子{list(self.scorer.weights)}，计算节点{len(self.scorer.graph.nodes)}个，"
+                    f"回看{self.data_count}根K线")
+
+    def load_universe(self, context, symbols: List[str], data_manager: IDataManager) -> Dict[str, np.ndarray]:
+        """读取各因子截面，因子库中没有的因子或标的才读取行情计算并写回"""
+        names = list(self.scorer.weights)
+        if self.store is None:
+            return self._compute(context, symbols, names, data_manager)
+
+        trade_date = context.now.strftime('%Y-%m-%d')
+        values = {}
+        missing_factors = []
+        missing_rows = np.zeros(len(symbols), dtype=bool)
+        for name in names:
+            values[name], found = self.store.load(self._store_keys[name], trade_date, symbols)
+            if not found.all():
+                missing_factors.append(name)
+                missing_rows |= ~found
+        if missing_factors:
+            rows = np.flatnonzero(missing_rows)
+            subset = [symbols[i] for i in rows]
+            computed = self._compute(context, subset, missing_factors, data_manager)
+            for name in missing_factors:
+                values[name][rows] = computed[name]
+                self.store.save(self._store_keys[name], trade_date, subset, computed[name])
+            logger.info(f"补算因子{missing_factors}，{len(subset)}只股票")
+        return values
+
+    def _compute(self, context, symbols: List[str], names: List[str],
+                 data_manager: IDataManager) -> Dict[str, np.ndarray]:
+        """一次读取所需的全部行情字段并计算因子"""
+        graph = self.scorer.subgraph(names)
+        data = {field: data_manager.get_field_matrix(context, symbols, field, self.data_count)
+                for field in graph.fields}
+        return graph.evaluate(data)
+
+    def score_universe(self, values: Dict[str, np.ndarray]) -> np.ndarray:
+        return self.scorer.combine(values)
+
+    def calculate_score(self, context, symbol: str, data_manager: IDataManager) -> float:
+        """单只股票的多因子得分，即在当日股票池截面中的加权排名，股票不在股票池中时加入截面一起排名"""
+        symbol = str(symbol).strip()
+        trade_date = context.now.strftime('%Y-%m-%d')
+        if self._section is None or self._section[0] != trade_date or symbol not in self._section[1]:
+            stock_pool = data_manager.get_stock_pool(context, self.config.stock_pool_size * 2)
+            symbols = [str(item).strip() for item in stock_pool]
+            if symbol not in symbols:
+                symbols.append(symbol)
+            scores = self.score_universe(self.load_universe(context, symbols, data_manager))
+            self._section = (trade_date, {item: float(score) for item, score in zip(symbols, scores)})
+        return self._section[1][symbol]
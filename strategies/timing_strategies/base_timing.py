@@ -1,17 +1,86 @@
 # coding=utf-8
-from typing import Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 from core.base import ITimingStrategy
 from data.base_data_manager import IDataManager
+from utils.logger import default_logger as logger
+from utils.rolling_stats import RollingStats
 
 
 class BaseTimingStrategy(ITimingStrategy):
     """基础择时策略"""
 
+    # 计算信号所需的K线数量，0表示不需要历史数据
+    data_count: int = 0
+    # 流式信号的增量指标：是否支持、均线窗口、收益率标准差窗口
+    supports_rolling: bool = False
+    rolling_mean_windows: Tuple[int, ...] = ()
+    rolling_return_windows: Tuple[int, ...] = ()
+
     def __init__(self, config):
         self.config = config
 
+    def create_bar_state(self):
+        """单个标的的增量指标状态，供流式信号引擎逐根K线更新"""
+        return RollingStats(self.data_count, self.rolling_mean_windows, self.rolling_return_windows)
+
+    def bar_signal(self, state) -> Tuple[bool, bool, bool]:
+        """由增量指标状态计算交易信号"""
+        raise NotImplementedError("子类必须实现此方法")
+
+    def prefetch(self, context, symbols: List[str], data_manager: IDataManager):
+        """批量预取待判断标的的历史数据，后续get_signal直接命中缓存"""
+        if self.data_count > 0 and symbols:
+            data_manager.get_stock_data_batch(context, symbols, self.data_count)
+
     def get_signal(self, context=None, symbol: str = None, data_manager: IDataManager = None,
                    position_symbols: list = None, selected_symbols: list = None) -> Tuple[bool, bool, bool]:
-        """获取交易信号 - 基础实现"""
-        raise NotImplementedError("子类必须实现此方法")
+        """获取单只标的的交易信号，与批量计算使用同一套指标"""
+        try:
+            close_prices = data_manager.get_close(context, symbol, self.data_count)
+            signals = self.signals_universe(close_prices[np.newaxis, :])
+        except Exception as e:
+            logger.error(f"{type(self).__name__}择时判断失败 {symbol}: {e}")
+            return True, False, False
+        if signals is None:
+            raise NotImplementedError("子类必须实现get_signal或signals_universe")
+        buy_signal, sell_signal, reduce_signal = signals
+        return bool(buy_signal[0]), bool(sell_signal[0]), bool(reduce_signal[0])
+
+    def get_signals(self, context, symbols: List[str],
+                    data_manager: IDataManager) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """批量获取交易信号，返回与symbols一一对应的买入、卖出、减仓布尔数组"""
+        symbols = [str(symbol).strip() for symbol in symbols]
+        signals = None
+        if self.data_count > 0 and symbols:
+            try:
+                # 一次取出所有标的的收盘价矩阵，矩阵运算得到全部信号
+                signals = self.signals_universe(data_manager.get_close_matrix(context, symbols, self.data_count))
+            except Exception as e:
+                logger.warning(f"批量择时失败，改为逐只判断: {e}")
+        if signals is None:
+            self.prefetch(context, symbols, data_manager)
+            results = np.array([self.get_signal(context, symbol, data_manager) for symbol in symbols],
+                               dtype=bool).reshape(len(symbols), 3)
+            signals = results[:, 0], results[:, 1], results[:, 2]
+        return signals
+
+    def signals_universe(self, closes: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        向量化计算交易信号，结果与逐只调用get_signal一致
+
+        Args:
+            closes: 标的数 × data_count 的收盘价矩阵，每行按K线数右对齐，左侧缺失为NaN
+
+        Returns:
+            买入、卖出、减仓布尔数组，返回None表示不支持批量计算，改为逐只判断
+        """
+        return None
+
+    @staticmethod
+    def constant_signals(count: int, buy: bool = True, sell: bool = False,
+                         reduce: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """所有标的相同的信号"""
+        return np.full(count, buy), np.full(count, sell), np.full(count, reduce)
@@ -1,5 +1,8 @@
 # coding=utf-8
-from typing import Tuple
+from typing import List, Tuple
+
+import numpy as np
+
 from data.base_data_manager import IDataManager
 from strategies.timing_strategies.base_timing import BaseTimingStrategy
 
@@ -11,3 +14,12 @@ class DisabledTimingStrategy(BaseTimingStrategy):
                    position_symbols: list = None, selected_symbols: list = None) -> Tuple[bool, bool, bool]:
         """始终返回买入信号"""
         return True, False,False
+
+    def get_signals(self, context, symbols: List[str],
+                    data_manager: IDataManager) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """所有标的均为买入信号"""
+        return self.constant_signals(len(symbols))
+
+    def bar_signal(self, state) -> Tuple[bool, bool, bool]:
+        """始终返回买入信号"""
+        return True, False, False
@@ -1,43 +1,51 @@
 # coding=utf-8
-from typing import Tuple
+from typing import List, Tuple
 
 import numpy as np
 
 from data.base_data_manager import IDataManager
 from strategies.timing_strategies.base_timing import BaseTimingStrategy
-from utils.logger import default_logger as logger
+from utils.indicators import MovingAverage, bar_counts
+from utils.rolling_stats import RollingStats
 
 
 class MovingAverageTimingStrategy(BaseTimingStrategy):
     """移动平均线择时策略"""
 
+    data_count = 20
+    supports_rolling = True
+    rolling_mean_windows = (5, 10, 20)
+
     def get_signal(self, context=None, symbol: str = None, data_manager: IDataManager = None,
                    position_symbols: list = None, selected_symbols: list = None) -> Tuple[bool, bool, bool]:
         """基于移动平均线的交易信号"""
         if not self.config.timing_enabled:
             return True, False, False
+        return super().get_signal(context, symbol, data_manager, position_symbols, selected_symbols)
 
-        try:
-            data = data_manager.get_stock_data(context, symbol, 20)
-            if len(data) < 10:
-                return True, False, False
-
-            close_prices = data['close'].values
-            current_price = close_prices[-1]
-
-            # 计算多个均线
-            if len(close_prices) >= 5:
-                ma_5 = np.mean(close_prices[-5:])
-                ma_10 = np.mean(close_prices[-10:])
-                ma_20 = np.mean(close_prices[-20:])
-
-                # 多头排列：短期均线在长期均线之上
-                buy_signal = ma_5 > ma_10 > ma_20 and current_price > ma_5
-            else:
-                buy_signal = True
-
-            return buy_signal, False, False
-
-        except Exception as e:
-            logger.error(f"择时判断失败 {symbol}: {e}")
+    def get_signals(self, context, symbols: List[str],
+                    data_manager: IDataManager) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """批量计算均线信号，未启用择时时全部为买入信号"""
+        if not self.config.timing_enabled:
+            return self.constant_signals(len(symbols))
+        return super().get_signals(context, symbols, data_manager)
+
+    def signals_universe(self, closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """多头排列：5日均线 > 10日均线 > 20日均线且现价在5日均线之上，不足10根K线时为买入信号"""
+        counts = bar_counts(closes)
+        buy, sell, reduce = self.constant_signals(len(closes))
+        # 按K线数量分组，K线不足20根时20日均线取全部K线
+        for count in np.unique(counts[counts >= 10]):
+            rows = closes[counts == count, -count:]
+            ma_5 = MovingAverage.compute(rows, 5)[:, -1]
+            ma_10 = MovingAverage.compute(rows, 10)[:, -1]
+            ma_20 = MovingAverage.compute(rows, min(count, 20))[:, -1]
+            buy[counts == count] = (ma_5 > ma_10) & (ma_10 > ma_20) & (rows[:, -1] > ma_5)
+        return buy, sell, reduce
+
+    def bar_signal(self, stats: RollingStats) -> Tuple[bool, bool, bool]:
+        """由增量指标状态计算均线多头排列信号"""
+        if not self.config.timing_enabled or stats.count < 10:
             return True, False, False
+        ma_5, ma_10, ma_20 = stats.mean(5), stats.mean(10), stats.mean(20)
+        return ma_5 > ma_10 > ma_20 and stats.last > ma_5, False, False
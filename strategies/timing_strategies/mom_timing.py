@@ -1,37 +1,33 @@
 # coding=utf-8
 from typing import Tuple
 
-from data.base_data_manager import IDataManager
+import numpy as np
+
 from strategies.timing_strategies.base_timing import BaseTimingStrategy
-from utils.logger import default_logger as logger
+from utils.indicators import RateOfChange, bar_counts
+from utils.rolling_stats import RollingStats
 
 
 class MomentumTimingStrategy(BaseTimingStrategy):
     """动量择时策略"""
 
-    def get_signal(self, context=None, symbol: str = None, data_manager: IDataManager = None,
-                   position_symbols: list = None, selected_symbols: list = None) -> Tuple[bool, bool, bool]:
-        """基于动量的交易信号"""
-        try:
-            data = data_manager.get_stock_data(context, symbol, 10)
-            if len(data) < 5:
-                return True, False,False
-
-            close_prices = data['close'].values
-            current_price = close_prices[-1]
-
-            # 计算5日动量
-            if len(close_prices) >= 6:
-                momentum_5 = (current_price - close_prices[-6]) / close_prices[-6]
-                # 计算10日动量
-                momentum_10 = (current_price - close_prices[-11]) / close_prices[-11] if len(close_prices) >= 11 else 0
-
-                buy_signal = momentum_5 > 0 and momentum_10 > 0
-            else:
-                buy_signal = True
-
-            return buy_signal, False,False
-
-        except Exception as e:
-            logger.error(f"动量择时判断失败 {symbol}: {e}")
-            return True, False,False
+    data_count = 10
+    supports_rolling = True
+
+    def signals_universe(self, closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """5日、10日动量均为正时买入，K线不足6根时为买入信号，不足11根时10日动量按0计"""
+        counts = bar_counts(closes)
+        buy, sell, reduce = self.constant_signals(len(closes))
+        momentum_5 = RateOfChange.compute(closes, 5)[:, -1]
+        momentum_10 = np.where(counts >= 11, RateOfChange.compute(closes, 10)[:, -1], 0)
+        has_momentum = counts >= 6
+        buy[has_momentum] = (momentum_5 > 0)[has_momentum] & (momentum_10 > 0)[has_momentum]
+        return buy, sell, reduce
+
+    def bar_signal(self, stats: RollingStats) -> Tuple[bool, bool, bool]:
+        """由增量指标状态计算动量信号"""
+        if stats.count < 6:
+            return True, False, False
+        momentum_5 = (stats.last - stats.lag(5)) / stats.lag(5)
+        momentum_10 = (stats.last - stats.lag(10)) / stats.lag(10) if stats.count >= 11 else 0
+        return momentum_5 > 0 and momentum_10 > 0, False, False
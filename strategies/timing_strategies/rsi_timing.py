@@ -3,52 +3,39 @@ from typing import Tuple
 
 import numpy as np
 
-from data.base_data_manager import IDataManager
 from strategies.timing_strategies.base_timing import BaseTimingStrategy
-from utils.logger import default_logger as logger
+from utils.indicators import RSI, bar_counts
 
 
 class RSITimingStrategy(BaseTimingStrategy):
     """RSI择时策略"""
 
-    def get_signal(self, context=None, symbol: str = None, data_manager: IDataManager = None,
-                   position_symbols: list = None, selected_symbols: list = None) -> Tuple[bool, bool, bool]:
-        """基于RSI的交易信号"""
-        try:
-            data = data_manager.get_stock_data(context, symbol, 15)
-            if len(data) < 14:
-                return True, False,False
+    data_count = 15
+    supports_rolling = True
+    rsi_period = 14
 
-            close_prices = data['close'].values
+    def create_bar_state(self) -> RSI:
+        """按标的维护增量RSI，由最近data_count根K线初始化，之后每根K线O(1)递推"""
+        return RSI(self.rsi_period)
 
-            # 计算RSI
-            rsi = self.calculate_rsi(close_prices, 14)
-            current_rsi = rsi[-1] if len(rsi) > 0 else 50
-
-            # RSI低于30为超卖，买入信号
-            buy_signal = current_rsi < 30
-            sell_signal = current_rsi > 70
-
-            return buy_signal, sell_signal,False
-
-        except Exception as e:
-            logger.error(f"RSI择时判断失败 {symbol}: {e}")
-            return True, False,False
+    def bar_signal(self, state: RSI) -> Tuple[bool, bool, bool]:
+        """由增量RSI计算信号，RSI尚未生成时返回默认买入信号"""
+        rsi = state.value
+        if np.isnan(rsi):
+            return True, False, False
+        return rsi < 30, rsi > 70, False
 
     def calculate_rsi(self, prices: np.ndarray, period: int = 14) -> np.ndarray:
-        """计算RSI指标"""
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        avg_gains = np.zeros_like(prices)
-        avg_losses = np.zeros_like(prices)
-        # 初始值
-        avg_gains[period] = np.mean(gains[:period])
-        avg_losses[period] = np.mean(losses[:period])
-        # 计算后续值
-        for i in range(period + 1, len(prices)):
-            avg_gains[i] = (avg_gains[i - 1] * (period - 1) + gains[i - 1]) / period
-            avg_losses[i] = (avg_losses[i - 1] * (period - 1) + losses[i - 1]) / period
-        rs = avg_gains / (avg_losses + 1e-10)  # 避免除零
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """计算RSI指标，前period个值为0"""
+        return np.nan_to_num(RSI.compute(np.asarray(prices, dtype=np.float64)[np.newaxis, :], period)[0])
+
+    def signals_universe(self, closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """RSI低于30为超卖买入，高于70卖出，RSI尚未生成时为买入信号；按K线数量分组，同组标的一起递推"""
+        counts = bar_counts(closes)
+        buy, sell, reduce = self.constant_signals(len(closes))
+        for count in np.unique(counts[counts > self.rsi_period]):
+            rows = counts == count
+            rsi = RSI.compute(closes[rows, -count:], self.rsi_period)[:, -1]
+            buy[rows] = rsi < 30
+            sell[rows] = rsi > 70
+        return buy, sell, reduce
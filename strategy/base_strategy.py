@@ -29,7 +29,7 @@ class BaseStrategy(ABC):
         pass
 
     @abstractmethod
-    def on_bar(self, context: Any, bar: dict):
+    def on_bar(self, context: Any, bars: list):
         """K线回调"""
         pass
 
@@ -1,7 +1,10 @@
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
 
-from gm.api import *
+from core.base import IMarketAdapter
+from data.prefetcher import HistoryPrefetcher
 from strategy.base_strategy import BaseStrategy
+from strategy.streaming_engine import StreamingSignalEngine
 from factory.strategy_factory import StrategyFactory
 from config.trading_config import TradingConfig
 from utils.logger import default_logger as logger
@@ -10,34 +13,87 @@ from utils.logger import default_logger as logger
 class QuantitativeTradingStrategy(BaseStrategy):
     """量化交易策略主类 - 使用策略模式"""
 
-    def __init__(self, config: TradingConfig, strategy_factory: StrategyFactory = None):
+    def __init__(self, config: TradingConfig, strategy_factory: StrategyFactory = None,
+                 adapter: IMarketAdapter = None):
         super().__init__(config)
         self.factory = strategy_factory or StrategyFactory()
+        self.adapter = adapter or self.factory.create_market_adapter(config)
         self._initialize_strategies()
 
     def _initialize_strategies(self):
         """初始化各个策略组件"""
-        self.context.data_manager = self.factory.create_data_manager(self.config)
+        self.context.market_adapter = self.adapter
+        self.context.data_manager = self.factory.create_data_manager(self.config, self.adapter)
         self.context.timing_strategy = self.factory.create_timing_strategy(self.config)
         self.context.stock_selection_strategy = self.factory.create_stock_selection_strategy(self.config)
         self.context.risk_manager = self.factory.create_risk_manager(self.config)
         self.context.trade_executor = self.factory.create_trade_executor(
-            self.config, self.context.risk_manager
+            self.config, self.context.risk_manager, self.adapter, self.context.data_manager
         )
+        self.prefetcher = HistoryPrefetcher(self.config, self.context.data_manager)
+        self.streaming = StreamingSignalEngine(self.config, self.context.timing_strategy) \
+            if self.config.streaming_enabled else None
+        self._stream_candidates: Dict[str, Any] = {}
+        self._stream_ordered = set()
+        # 交易时段（当日秒数），K线推送时直接比较整数
+        self._trading_start = self._seconds_of_day(self.config.trading_start_time)
+        self._trading_end = self._seconds_of_day(self.config.trading_end_time)
+
+    @staticmethod
+    def _seconds_of_day(text: str) -> int:
+        """HH:MM:SS转换为当日秒数"""
+        hour, minute, second = (int(part) for part in text.split(':'))
+        return hour * 3600 + minute * 60 + second
 
     def init_strategy(self, context: Any):
         """初始化策略"""
         # 设置定时任务
-        schedule(schedule_func=self.on_market_open, date_rule='1d', time_rule='09:30:00')
-        schedule(schedule_func=self.on_midday, date_rule='1d', time_rule='11:00:00')
-        schedule(schedule_func=self.on_afternoon, date_rule='1d', time_rule='13:30:00')
-        schedule(schedule_func=self.on_market_close, date_rule='1d', time_rule='14:55:00')
+        if self.config.prefetch_enabled:
+            self.adapter.schedule(schedule_func=self._scoped(self.on_pre_open), date_rule='1d',
+                                  time_rule=self.config.prefetch_time)
+        self.adapter.schedule(schedule_func=self._scoped(self.on_market_open), date_rule='1d', time_rule='09:30:00')
+        if self.streaming is None:
+            self.adapter.schedule(schedule_func=self._scoped(self.on_midday), date_rule='1d', time_rule='11:00:00')
+            self.adapter.schedule(schedule_func=self._scoped(self.on_afternoon), date_rule='1d', time_rule='13:30:00')
+        else:
+            logger.info(f"流式模式：盘中信号及止盈止损在{self.config.streaming_frequency} K线推送时判断")
+        self.adapter.schedule(schedule_func=self._scoped(self.on_market_close), date_rule='1d', time_rule='14:55:00')
         logger.info("策略初始化完成")
 
+    @contextmanager
+    def callback_scope(self):
+        """回调作用域：行情快照与账户持仓快照只在同一回调内共享"""
+        quotes = self.context.data_manager.quotes
+        risk_manager = self.context.risk_manager
+        quotes.begin()
+        risk_manager.begin_callback()
+        try:
+            yield
+        finally:
+            risk_manager.end_callback()
+            quotes.end()
+
+    def _scoped(self, func: Callable[[Any], None]) -> Callable[[Any], None]:
+        """包装定时任务，使其在回调作用域内执行"""
+        def scheduled(context: Any):
+            with self.callback_scope():
+                func(context)
+        scheduled.__name__ = func.__name__
+        return scheduled
+
+    def on_pre_open(self, context: Any):
+        """开盘前预取股票池历史数据，开盘选股时直接命中缓存"""
+        logger.info("执行开盘前数据预取")
+        data_manager = self.context.data_manager
+        data_manager.refresh_daily(context)
+        stock_pool = data_manager.get_stock_pool(context, self.config.stock_pool_size * 2)
+        count = max(self.context.stock_selection_strategy.data_count, self.context.timing_strategy.data_count)
+        self.prefetcher.prefetch(context, [str(symbol).strip() for symbol in stock_pool], count)
+
     def on_market_open(self, context: Any):
         """开盘后执行"""
         logger.info("执行开盘策略")
-        self.context.data_manager.cache.clear()
+        self.context.data_manager.refresh_daily(context)
         self.context.risk_manager.reset_daily_flags()
         # 更新持仓信息
         self.context.risk_manager.update_position_all(context=context)
@@ -46,9 +102,8 @@ class QuantitativeTradingStrategy(BaseStrategy):
             context, self.context.data_manager
         )
         self.context.last_selection_date = context.now.strftime('%Y-%m-%d')
-        if self.context.selected_stocks:
-            for stock in self.context.selected_stocks:
-                logger.info(f"选股: {stock.symbol}, 得分: {stock.score:.3f}")
+        if self.streaming is not None:
+            self._update_subscriptions(context)
 
     def on_midday(self, context: Any):
         """中午执行"""
@@ -57,6 +112,7 @@ class QuantitativeTradingStrategy(BaseStrategy):
             return
 
         logger.info("执行中午监控")
+        self._load_quotes(context, holdings=False, candidates=True)
         self._execute_stock_selection(context)
 
     def on_afternoon(self, context: Any):
@@ -66,6 +122,7 @@ class QuantitativeTradingStrategy(BaseStrategy):
             return
 
         logger.info("执行下午监控")
+        self._load_quotes(context, holdings=True, candidates=True)
         # 检查持仓止盈止损
         self._check_holdings_stop(context)
         # 执行选股买入
@@ -74,32 +131,94 @@ class QuantitativeTradingStrategy(BaseStrategy):
     def on_market_close(self, context: Any):
         """收盘前执行"""
         logger.info("执行收盘前策略")
+        self._load_quotes(context, holdings=True, candidates=False)
         self._check_holdings_stop(context)
 
         # 记录当日表现
         performance = self.context.get_performance()
         logger.info(f"当日交易表现: {performance}")
+        logger.profile(f"行情缓存统计: {self.context.data_manager.cache.get_stats()}")
+        logger.profile(f"行情内存统计: {self.context.data_manager.get_memory_stats()}")
+        if self.streaming is not None:
+            logger.profile(f"流式信号统计: {self.streaming.get_stats()}")
+
+    def on_bar(self, context: Any, bars: list):
+        """K线回调：流式模式下逐根更新订阅标的的增量指标，即时检查止盈止损及买入信号"""
+        if self.streaming is None:
+            return
+        with self.callback_scope():
+            for bar in bars:
+                try:
+                    self._on_stream_bar(context, bar)
+                except Exception as e:
+                    logger.error(f"处理K线推送失败 {bar.get('symbol')}: {e}")
+
+    def _update_subscriptions(self, context: Any):
+        """订阅持仓及候选股票的K线，取消不再需要的订阅"""
+        try:
+            holdings = self.context.risk_manager.get_portfolio(context).holdings
+            candidates = self.context.selected_stocks[:self.config.max_positions]
+            self._stream_candidates = {stock.symbol: stock for stock in candidates}
+            self._stream_ordered = set()
+            added, removed = self.streaming.track(
+                context, holdings + list(self._stream_candidates), self.context.data_manager
+            )
+            if removed:
+                self.adapter.unsubscribe(symbols=removed, frequency=self.streaming.frequency)
+            if added:
+                self.adapter.subscribe(symbols=added, frequency=self.streaming.frequency)
+            logger.info(f"流式订阅{len(self.streaming.symbols)}只标的，新增{len(added)}只，取消{len(removed)}只")
+        except Exception as e:
+            logger.error(f"更新K线订阅失败: {e}")
+
+    def _on_stream_bar(self, context: Any, bar: dict):
+        """处理单根推送K线"""
+        symbol = bar['symbol']
+        signal = self.streaming.update(bar)
+        if signal is None:
+            return
+        self.context.data_manager.quotes.update(symbol, bar)
+        eob = bar['eob']
+        seconds = eob.hour * 3600 + eob.minute * 60 + eob.second
+        if not (self._trading_start <= seconds <= self._trading_end):
+            return
+
+        if self.context.risk_manager.holds(symbol):
+            should_sell, reason = self.context.risk_manager.check_stop_loss_profit(context, symbol, bar['close'])
+            if should_sell:
+                self.context.trade_executor.execute_sell(context, symbol, reason)
+            return
+
+        stock = self._stream_candidates.get(symbol)
+        buy_signal, sell_signal, _ = signal
+        if stock is not None and symbol not in self._stream_ordered and buy_signal and not sell_signal:
+            # 委托后不再重复买入，成交后按持仓检查止盈止损
+            self._stream_ordered.add(symbol)
+            self._buy_stock(context, stock, self._total_score())
 
-    def on_bar(self, context: Any, bar: dict):
-        """K线回调（可选）"""
-        # 可以在这里实现基于K线的实时交易信号
-        pass
+    def _load_quotes(self, context: Any, holdings: bool, candidates: bool):
+        """回调开始时一次批量获取本次涉及的持仓及候选股票行情快照"""
+        symbols = []
+        try:
+            if holdings:
+                symbols += self.context.risk_manager.get_portfolio(context).holdings
+            if candidates and self.context.selected_stocks:
+                symbols += [stock.symbol for stock in self.context.selected_stocks[:self.config.max_positions]]
+            self.context.data_manager.get_current_data(context, symbols)
+        except Exception as e:
+            logger.error(f"获取行情快照失败: {e}")
 
     def _check_holdings_stop(self, context: Any):
         """检查持仓止盈止损"""
         try:
-            positions = context.account().positions()
-            for position in positions:
-                if position['volume'] > 0:
-                    symbol = position['symbol']
-                    current_data = current(symbols=symbol, fields='price')
-                    if current_data:
-                        current_price = current_data[0]['price']
-                        should_sell, reason = self.context.risk_manager.check_stop_loss_profit(
-                            context, symbol, current_price
-                        )
-                        if should_sell:
-                            self.context.trade_executor.execute_sell(context, symbol, reason)
+            for symbol in self.context.risk_manager.get_portfolio(context).holdings:
+                current_price = self.context.data_manager.get_current_price(context, symbol)
+                if current_price > 0:
+                    should_sell, reason = self.context.risk_manager.check_stop_loss_profit(
+                        context, symbol, current_price
+                    )
+                    if should_sell:
+                        self.context.trade_executor.execute_sell(context, symbol, reason)
         except Exception as e:
             logger.error(f"检查持仓止盈止损失败: {e}")
 
@@ -109,25 +228,33 @@ class QuantitativeTradingStrategy(BaseStrategy):
             logger.info("无选股结果，跳过执行")
             return
 
-        total_score = sum(stock.score for stock in self.context.selected_stocks)
-        if total_score <= 0:
-            total_score = 1
-
-        for stock in self.context.selected_stocks[:self.config.max_positions]:
+        total_score = self._total_score()
+        portfolio = self.context.risk_manager.get_portfolio(context)
+        # 跳过已持仓的股票
+        candidates = [stock for stock in self.context.selected_stocks[:self.config.max_positions]
+                      if portfolio.volume(stock.symbol) <= 0]
+        # 一次计算所有候选股票的择时信号
+        buy_signals, sell_signals, _ = self.context.timing_strategy.get_signals(
+            context, [stock.symbol for stock in candidates], self.context.data_manager
+        )
+        for stock, buy_signal, sell_signal in zip(candidates, buy_signals, sell_signals):
             symbol = stock.symbol
-            # 检查是否已持仓
-            positions = context.account().positions(symbol=symbol)
-            if positions and positions[0]['volume'] > 0:
-                continue
-            buy_signal, sell_signal,_ = self.context.timing_strategy.get_signal(
-                context, symbol, self.context.data_manager
-            )
             if buy_signal and not sell_signal:
-                weight = stock.score / total_score * self.config.total_position_ratio
-                success = self.context.trade_executor.execute_buy(context, symbol, weight)
-                if success:
-                    logger.info(f"成功下单买入 {symbol}")
-                else:
-                    logger.warning(f"下单买入 {symbol} 失败")
+                self._buy_stock(context, stock, total_score)
             else:
                 logger.debug(f"{symbol} 无买入信号")
+
+    def _total_score(self) -> float:
+        """选股总得分，用于按得分分配仓位"""
+        total_score = self.context.selected_stocks.total_score
+        return total_score if total_score > 0 else 1
+
+    def _buy_stock(self, context: Any, stock, total_score: float) -> bool:
+        """按得分占比分配仓位买入"""
+        weight = stock.score / total_score * self.config.total_position_ratio
+        success = self.context.trade_executor.execute_buy(context, stock.symbol, weight)
+        if success:
+            logger.info(f"成功下单买入 {stock.symbol}")
+        else:
+            logger.warning(f"下单买入 {stock.symbol} 失败")
+        return success
@@ -0,0 +1,73 @@
+# coding=utf-8
+from typing import Dict, List, Optional, Tuple
+
+from core.base import IDataManager
+from data.bar_store import to_ns
+from strategies.timing_strategies.base_timing import BaseTimingStrategy
+from utils.logger import default_logger as logger
+from utils.rolling_stats import RollingStats, RollingStatsRegistry
+
+
+class StreamingSignalEngine:
+    """
+    流式信号引擎
+
+    为订阅的标的维护择时策略的增量指标状态（环形缓冲区、滑动均值、Wilder RSI等），
+    开始跟踪时由最近data_count根K线初始化，之后每根推送的K线O(1)更新并给出信号，
+    处理过程不创建数组或DataFrame
+    """
+
+    def __init__(self, config, timing_strategy: BaseTimingStrategy):
+        self.config = config
+        self.frequency = config.streaming_frequency
+        self.timing = timing_strategy
+        if timing_strategy.supports_rolling:
+            self.registry = RollingStatsRegistry(timing_strategy.create_bar_state)
+        else:
+            # 不依赖历史指标的择时策略只需要最新价格
+            logger.info(f"择时策略{type(timing_strategy).__name__}不使用增量指标，流式模式下仅跟踪最新价格")
+            self.registry = RollingStatsRegistry(lambda: RollingStats(1))
+        self.symbols: List[str] = []
+        self.bars = 0
+
+    def track(self, context, symbols: List[str], data_manager: IDataManager) -> Tuple[List[str], List[str]]:
+        """
+        设置跟踪的标的，新增标的由最近的K线初始化指标状态
+
+        Returns:
+            新增的标的、不再跟踪的标的
+        """
+        symbols = list(dict.fromkeys(str(symbol).strip() for symbol in symbols))
+        current = set(symbols)
+        tracked = set(self.symbols)
+        added = [symbol for symbol in symbols if symbol not in tracked]
+        removed = [symbol for symbol in self.symbols if symbol not in current]
+        for symbol in removed:
+            self.registry.remove(symbol)
+        count = self.timing.data_count if self.timing.supports_rolling else 0
+        if added and count > 0:
+            data_manager.get_stock_data_batch(context, added, count, self.frequency)
+        for symbol in added:
+            if count > 0:
+                fields = data_manager.get_fields(context, symbol, ('eob', 'close'), count, self.frequency)
+                self.registry.sync(symbol, fields['eob'], fields['close'])
+            else:
+                self.registry.sync(symbol, (), ())
+        self.symbols = symbols
+        return added, removed
+
+    def update(self, bar: Dict) -> Optional[Tuple[bool, bool, bool]]:
+        """
+        用推送的K线更新标的指标状态
+
+        Returns:
+            交易信号，标的未跟踪或K线已处理过时返回None
+        """
+        state = self.registry.push(bar['symbol'], to_ns(bar['eob']), float(bar['close']))
+        if state is None:
+            return None
+        self.bars += 1
+        return self.timing.bar_signal(state)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'symbols': len(self.symbols), 'bars': self.bars}
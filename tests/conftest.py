@@ -0,0 +1,6 @@
+# coding=utf-8
+import os
+import sys
+
+# 模块按仓库根目录导入（如 from core.base import ...）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
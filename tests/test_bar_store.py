@@ -0,0 +1,103 @@
+# coding=utf-8
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.trading_config import TradingConfig
+from data.bar_store import BAR_DTYPE, BarStore, from_ns, records_to_frame, to_ns
+
+SYMBOL = 'SHSE.600000'
+
+
+def make_bars(start: str, periods: int, freq: str = '1d') -> pd.DataFrame:
+    """构造与history返回格式一致的K线"""
+    eob = pd.date_range(start, periods=periods, freq='D', tz='Asia/Shanghai') + pd.Timedelta(hours=15)
+    close = np.arange(periods, dtype=np.float64) + 10
+    return pd.DataFrame({
+        'symbol': SYMBOL, 'eob': eob, 'open': close, 'high': close + 1, 'low': close - 1,
+        'close': close, 'volume': close * 100, 'amount': close * 1000,
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BarStore(str(tmp_path))
+
+
+def test_to_ns_round_trip():
+    ts = pd.Timestamp('2024-01-02 15:00', tz='Asia/Shanghai')
+    assert from_ns(to_ns(ts)) == ts
+    # 无时区时间按北京时间处理，带时区的datetime走快速路径
+    assert to_ns('2024-01-02 15:00') == to_ns(ts)
+    assert to_ns(ts.to_pydatetime()) == to_ns(ts)
+
+
+def test_append_only_adds_newer_bars(store):
+    assert store.append(SYMBOL, '1d', make_bars('2024-01-01', 5)) == 5
+    # 与已有记录重叠的部分被跳过
+    assert store.append(SYMBOL, '1d', make_bars('2024-01-04', 4)) == 2
+    records = store.load(SYMBOL, '1d')
+    assert len(records) == 7
+    assert np.all(np.diff(records['eob']) > 0)
+    assert store.first_eob(SYMBOL, '1d') == records['eob'][0]
+    assert store.last_eob(SYMBOL, '1d') == records['eob'][-1]
+
+
+def test_read_returns_latest_count_up_to_end(store):
+    bars = make_bars('2024-01-01', 10)
+    store.append(SYMBOL, '1d', bars)
+    end_ns = to_ns(bars['eob'].iloc[6])
+    records = store.read(SYMBOL, '1d', end_ns, count=3)
+    assert list(records['close']) == [14.0, 15.0, 16.0]
+    assert len(store.read(SYMBOL, '1d', end_ns)) == 7
+    assert len(store.read(SYMBOL, '1d', to_ns(bars['eob'].iloc[0]) - 1)) == 0
+    # 读取结果不依赖内存映射，文件可随后写入
+    assert not isinstance(records, np.memmap)
+
+
+def test_missing_symbol_is_empty(store):
+    assert len(store.load(SYMBOL, '1d')) == 0
+    assert len(store.read(SYMBOL, '1d', to_ns('2024-01-01'))) == 0
+    assert store.first_eob(SYMBOL, '1d') is None
+    assert store.last_eob(SYMBOL, '1d') is None
+
+
+def test_torn_tail_is_ignored_and_truncated_on_append(store, tmp_path):
+    store.append(SYMBOL, '1d', make_bars('2024-01-01', 3))
+    path = os.path.join(str(tmp_path), '1d', f'{SYMBOL}.bin')
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * (BAR_DTYPE.itemsize // 2))
+    assert len(store.load(SYMBOL, '1d')) == 3
+    assert len(store.read(SYMBOL, '1d', to_ns('2030-01-01'))) == 3
+    assert store.append(SYMBOL, '1d', make_bars('2024-01-04', 2)) == 2
+    assert os.path.getsize(path) == 5 * BAR_DTYPE.itemsize
+    assert list(store.load(SYMBOL, '1d')['close']) == [10.0, 11.0, 12.0, 10.0, 11.0]
+
+
+def test_prepend_only_adds_older_bars(store):
+    store.append(SYMBOL, '1d', make_bars('2024-01-05', 3))
+    assert store.prepend(SYMBOL, '1d', make_bars('2024-01-01', 6)) == 4
+    records = store.load(SYMBOL, '1d')
+    assert len(records) == 7
+    assert np.all(np.diff(records['eob']) > 0)
+
+
+def test_records_to_frame_matches_history_layout(store):
+    bars = make_bars('2024-01-01', 3)
+    store.append(SYMBOL, '1d', bars)
+    frame = records_to_frame(SYMBOL, store.load(SYMBOL, '1d'))
+    assert list(frame.columns) == list(bars.columns)
+    pd.testing.assert_frame_equal(frame, bars, check_dtype=False)
+
+
+def test_data_source_separates_gm_and_replay_datasets(tmp_path):
+    gm = TradingConfig(adapter_type='gm')
+    replay_a = TradingConfig(adapter_type='replay', replay_data_dir=str(tmp_path / 'a'))
+    replay_b = TradingConfig(adapter_type='replay', replay_data_dir=str(tmp_path / 'b'))
+    assert gm.get_data_source() == 'gm'
+    assert replay_a.get_data_source().startswith('replay_')
+    assert len({gm.get_data_source(), replay_a.get_data_source(), replay_b.get_data_source()}) == 3
+    assert replay_a.get_data_source() == TradingConfig(
+        adapter_type='replay', replay_data_dir=str(tmp_path / 'a')).get_data_source()
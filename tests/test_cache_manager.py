@@ -0,0 +1,119 @@
+# coding=utf-8
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import cache_manager
+from utils.cache_manager import CacheManager, estimate_size
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的单调时钟"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_manager.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = CacheManager(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # a变为最近使用
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert cache.keys() == ['a', 'c']
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_set_existing_key_replaces_value_and_size():
+    cache = CacheManager(max_bytes=1000)
+    cache.set('a', np.zeros(10))
+    cache.set('a', np.zeros(20))
+    assert len(cache) == 1
+    assert cache.total_bytes == 160
+
+
+def test_byte_budget_evicts_until_within_limit():
+    cache = CacheManager(max_size=0, max_bytes=200)
+    cache.set('a', np.zeros(10))  # 80字节
+    cache.set('b', np.zeros(10))
+    cache.set('c', np.zeros(10))
+    assert cache.keys() == ['b', 'c']
+    assert cache.total_bytes == 160
+
+
+def test_value_larger_than_budget_is_not_cached():
+    cache = CacheManager(max_bytes=100)
+    cache.set('small', np.zeros(5))
+    cache.set('big', np.zeros(100))
+    assert 'big' not in cache
+    assert cache.get('small') is not None
+    assert cache.total_bytes == 40
+
+
+def test_ttl_expiry(clock):
+    cache = CacheManager(default_ttl=10)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=100)
+    clock[0] += 10
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    stats = cache.get_stats()
+    assert stats['expirations'] == 1
+    assert 'a' not in cache
+
+
+def test_peek_does_not_touch_order_or_stats():
+    cache = CacheManager(max_size=2, max_bytes=1000)
+    cache.set('a', np.zeros(4))
+    cache.set('b', 2)
+    value, size = cache.peek('a')
+    assert value.shape == (4,) and size == 32
+    assert cache.peek('missing') == (None, 0)
+    cache.set('c', 3)
+    assert 'a' not in cache
+    assert cache.get_stats()['hits'] == 0
+
+
+def test_stats_and_reset():
+    cache = CacheManager()
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('missing')
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+    cache.reset_stats()
+    assert cache.get_stats()['hits'] == 0
+
+
+def test_delete_and_clear_release_bytes():
+    cache = CacheManager(max_bytes=1000)
+    cache.set('a', np.zeros(10))
+    cache.set('b', np.zeros(10))
+    cache.delete('a')
+    assert cache.total_bytes == 80
+    cache.clear()
+    assert len(cache) == 0 and cache.total_bytes == 0
+
+
+def test_unbounded_cache_does_not_size_values(monkeypatch):
+    def fail(value):
+        raise AssertionError("未设置内存上限时不应估算大小")
+    monkeypatch.setattr(cache_manager, 'estimate_size', fail)
+    cache = CacheManager()
+    cache.set('a', np.zeros(10))
+    assert cache.get('a') is not None
+    assert cache.total_bytes == 0 and cache.peek('a')[1] == 0
+
+
+def test_estimate_size_of_frames_uses_column_arrays():
+    frame = pd.DataFrame({
+        'symbol': ['SHSE.600000'] * 30,
+        'eob': pd.date_range('2024-01-01', periods=30, tz='Asia/Shanghai'),
+        'close': np.arange(30, dtype=np.float64),
+        'volume': np.arange(30, dtype=np.float32),
+    })
+    # 字符串列按指针计，不计算字符串内容
+    assert estimate_size(frame) == 30 * (8 + 8 + 8 + 4)
+    assert estimate_size(frame['volume']) == 30 * 4
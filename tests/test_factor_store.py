@@ -0,0 +1,73 @@
+# coding=utf-8
+import numpy as np
+import pytest
+
+from config.trading_config import TradingConfig
+from factor.factors import Momentum, Volatility
+from factor.store import FactorStore
+
+DATE = '2024-01-02'
+
+
+@pytest.fixture
+def config(tmp_path):
+    return TradingConfig(data_cache_dir=str(tmp_path))
+
+
+def test_load_empty_store(config):
+    values, found = FactorStore(config).load('momentum', DATE, ['A', 'B'])
+    assert np.isnan(values).all()
+    assert not found.any()
+
+
+def test_save_merges_and_new_value_wins(config):
+    store = FactorStore(config)
+    store.save('momentum', DATE, ['B', 'A'], np.array([2.0, 1.0]))
+    store.save('momentum', DATE, ['C', 'B'], np.array([3.0, 20.0]))
+    values, found = store.load('momentum', DATE, ['A', 'B', 'C', 'D'])
+    np.testing.assert_array_equal(values[:3], [1.0, 20.0, 3.0])
+    assert list(found) == [True, True, True, False]
+    assert np.isnan(values[3])
+
+
+def test_values_persist_across_instances(config):
+    FactorStore(config).save('momentum', DATE, ['A'], np.array([1.5]))
+    values, found = FactorStore(config).load('momentum', DATE, ['A'])
+    assert found[0] and values[0] == 1.5
+    # 其他交易日、其他因子互不影响
+    assert not FactorStore(config).load('momentum', '2024-01-03', ['A'])[1][0]
+    assert not FactorStore(config).load('volatility', DATE, ['A'])[1][0]
+
+
+def test_non_finite_values_are_not_persisted(config):
+    store = FactorStore(config)
+    store.save('momentum', DATE, ['A', 'B', 'C'], np.array([1.0, np.nan, np.inf]))
+    values, found = FactorStore(config).load('momentum', DATE, ['A', 'B', 'C'])
+    assert list(found) == [True, False, False]
+    # 全部为NaN时不写文件
+    store.save('volatility', DATE, ['A'], np.array([np.nan]))
+    assert not FactorStore(config).load('volatility', DATE, ['A'])[1].any()
+
+
+def test_stored_nan_is_reported_missing(config):
+    store = FactorStore(config)
+    store.save('momentum', DATE, ['A'], np.array([1.0]))
+    records = np.array([('A', 1.0), ('B', np.nan)], dtype=FactorStore.DTYPE)
+    np.save(store._path('momentum', DATE), records)
+    values, found = FactorStore(config).load('momentum', DATE, ['A', 'B'])
+    assert list(found) == [True, False]
+    assert np.isnan(values[1])
+
+
+def test_store_is_separated_by_data_source(tmp_path):
+    gm = FactorStore(TradingConfig(data_cache_dir=str(tmp_path)))
+    replay = FactorStore(TradingConfig(data_cache_dir=str(tmp_path), adapter_type='replay',
+                                       replay_data_dir=str(tmp_path / 'replay')))
+    gm.save('momentum', DATE, ['A'], np.array([1.0]))
+    assert not replay.load('momentum', DATE, ['A'])[1].any()
+
+
+def test_key_changes_with_factor_parameters():
+    assert FactorStore.key(Momentum(20)) == FactorStore.key(Momentum(20))
+    assert FactorStore.key(Momentum(20)) != FactorStore.key(Momentum(10))
+    assert FactorStore.key(Volatility(20)).startswith('volatility_20_')
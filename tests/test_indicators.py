@@ -0,0 +1,99 @@
+# coding=utf-8
+import math
+
+import numpy as np
+import pytest
+
+from utils.indicators import (ATR, EMA, RSI, VWAP, Bollinger, MovingAverage, RateOfChange, RingBuffer,
+                              RollingStd, _smooth, bar_counts)
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    return 10 * np.exp(np.cumsum(rng.normal(0, 0.02, (3, 600)), axis=1))
+
+
+def stream(indicator, row, *others):
+    """逐根K线递推，返回每一步的指标值"""
+    return np.array([indicator.update(value, *(other[i] for other in others))
+                     for i, value in enumerate(row)], dtype=np.float64)
+
+
+def assert_matches_batch(online: np.ndarray, batch: np.ndarray):
+    """批量结果为NaN的预热列不比较，其余与逐根递推一致"""
+    ready = ~np.isnan(batch)
+    assert ready.any()
+    np.testing.assert_allclose(online[ready], batch[ready], rtol=1e-9, atol=1e-12)
+
+
+def test_ring_buffer_overwrites_oldest():
+    buffer = RingBuffer(3)
+    assert [buffer.append(value) for value in (1.0, 2.0, 3.0, 4.0)] == [None, None, None, 1.0]
+    assert buffer.full and len(buffer) == 3
+    assert (buffer[0], buffer[-1]) == (2.0, 4.0)
+    np.testing.assert_array_equal(buffer.values(), [2.0, 3.0, 4.0])
+
+
+@pytest.mark.parametrize('indicator_class, window', [
+    (MovingAverage, 20), (RollingStd, 20), (RateOfChange, 10), (EMA, 12), (RSI, 14)])
+def test_incremental_matches_batch(prices, indicator_class, window):
+    batch = indicator_class.compute(prices, window)
+    for row, expected in zip(prices, batch):
+        assert_matches_batch(stream(indicator_class(window), row), expected)
+
+
+def test_atr_incremental_matches_batch(prices):
+    high, low = prices * 1.01, prices * 0.99
+    batch = ATR.compute(high, low, prices, 14)
+    assert np.isnan(batch[:, :13]).all()
+    for i in range(len(prices)):
+        assert_matches_batch(stream(ATR(14), high[i], low[i], prices[i]), batch[i])
+
+
+def test_bollinger_and_vwap_incremental_match_batch(prices):
+    middle, upper, lower = Bollinger.compute(prices, 20)
+    bands = Bollinger(20)
+    online = np.array([bands.update(value) for value in prices[0]])
+    for column, expected in enumerate((middle[0], upper[0], lower[0])):
+        assert_matches_batch(online[:, column], expected)
+    volumes = np.abs(prices[1]) * 100
+    assert_matches_batch(stream(VWAP(), prices[0], volumes), VWAP.compute(prices[:1], volumes[np.newaxis, :])[0])
+
+
+def test_rsi_preview_does_not_change_state(prices):
+    rsi = RSI(14)
+    for value in prices[0, :30]:
+        rsi.update(value)
+    state = (rsi.changes, rsi.avg_gain, rsi.avg_loss)
+    preview = rsi.preview(prices[0, 30])
+    assert (rsi.changes, rsi.avg_gain, rsi.avg_loss) == state
+    assert preview == pytest.approx(rsi.update(prices[0, 30]))
+
+
+@pytest.mark.parametrize('decay', [0.0, 0.01, 0.5, 13 / 14])
+def test_smooth_matches_recursion_across_blocks(prices, decay):
+    values = prices[:, 1:]
+    result = _smooth(prices[:, 0], values, decay, 2.0)
+    expected = np.empty_like(result)
+    expected[:, 0] = prices[:, 0]
+    for t in range(values.shape[1]):
+        expected[:, t + 1] = decay * expected[:, t] + values[:, t] / 2.0
+    assert np.isfinite(result).all()
+    np.testing.assert_allclose(result, expected, rtol=1e-9)
+
+
+def test_ema_span_one_is_identity(prices):
+    np.testing.assert_allclose(EMA.compute(prices, 1), prices)
+
+
+def test_bar_counts_right_aligned_matrix():
+    matrix = np.array([[np.nan, np.nan, 1.0], [1.0, 2.0, 3.0], [np.nan, np.nan, np.nan]])
+    assert list(bar_counts(matrix)) == [1, 3, 0]
+    assert list(bar_counts(np.empty((2, 0)))) == [0, 0]
+
+
+def test_warmup_values():
+    assert math.isnan(MovingAverage(3).value)
+    assert math.isnan(RSI(14).update(10.0))
+    assert math.isnan(RateOfChange(2).update(10.0))
@@ -0,0 +1,28 @@
+# coding=utf-8
+from datetime import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+
+from config.trading_config import TradingConfig
+from data.instrument_cache import InstrumentInfoCache
+
+
+class FakeAdapter:
+    def __init__(self):
+        self.calls = 0
+
+    def get_instrumentinfos(self, **kwargs):
+        self.calls += 1
+        return pd.DataFrame({'symbol': ['SHSE.600000', 'SZSE.000001'], 'sec_name': ['浦发银行', '平安银行']})
+
+
+def test_backtest_snapshot_follows_context_date(tmp_path):
+    adapter = FakeAdapter()
+    cache = InstrumentInfoCache(TradingConfig(data_cache_dir=str(tmp_path), mode='BACKTEST'), adapter)
+    cache.load(SimpleNamespace(now=datetime(2024, 1, 2, 15)))
+    cache.load(SimpleNamespace(now=datetime(2024, 1, 2, 9, 31)))
+    cache.load(SimpleNamespace(now=datetime(2024, 1, 3, 9, 31)))
+    assert adapter.calls == 2
+    assert sorted(p.name for p in (tmp_path / 'instruments' / 'gm').iterdir()) == ['2024-01-02.csv', '2024-01-03.csv']
+    assert cache.get_name('SHSE.600000') == '浦发银行'
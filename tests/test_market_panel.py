@@ -0,0 +1,111 @@
+# coding=utf-8
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from adapter.replay_adapter import ReplayAdapter
+from config.trading_config import TradingConfig
+from core.market_panel import MarketPanel
+from data.base_data_manager import BaseDataManager
+from data.bar_store import TIMEZONE
+
+
+def rows_for(lengths):
+    """按长度构造各标的的字段数组，close依次为1, 2, ..."""
+    rows = []
+    for n in lengths:
+        values = np.arange(1, n + 1, dtype=np.float64)
+        row = {field: values for field in MarketPanel.FIELDS}
+        row['eob'] = np.arange(1, n + 1, dtype=np.int64)
+        rows.append(row)
+    return rows
+
+
+def test_rows_are_right_aligned():
+    panel = MarketPanel.from_arrays(['A', 'B', 'C'], rows_for([5, 2, 0]), 3)
+    assert panel.shape == (3, 3, 6)
+    np.testing.assert_array_equal(panel.close[0], [3.0, 4.0, 5.0])
+    np.testing.assert_array_equal(panel.close[1], [np.nan, 1.0, 2.0])
+    assert np.isnan(panel.close[2]).all()
+    assert list(panel.eobs[1]) == [0, 1, 2]
+    assert list(panel.valid_counts()) == [3, 2, 0]
+    assert panel.index_of('B') == 1 and panel.index_of('X') == -1
+
+
+def test_views_are_zero_copy_and_read_only():
+    panel = MarketPanel.from_arrays(['A', 'B'], rows_for([4, 4]), 4)
+    view = panel.close[:, -2:]
+    assert np.shares_memory(view, panel.values)
+    with pytest.raises(ValueError):
+        view[0, 0] = 0.0
+    assert np.shares_memory(panel.matrix(['A', 'B'], 'close', 2), panel.values)
+
+
+def test_matrix_reorders_and_fills_unknown_symbols():
+    panel = MarketPanel.from_arrays(['A', 'B'], rows_for([4, 2]), 4)
+    matrix = panel.matrix(['B', 'X', 'A'], 'close', 3)
+    np.testing.assert_array_equal(matrix[0], [np.nan, 1.0, 2.0])
+    assert np.isnan(matrix[1]).all()
+    np.testing.assert_array_equal(matrix[2], [2.0, 3.0, 4.0])
+    assert not matrix.flags.writeable
+    assert panel.matrix([], 'close', 3).shape == (0, 3)
+
+
+class PanelContext:
+    def __init__(self, now):
+        self.now = now
+
+
+def at(text: str):
+    return pd.Timestamp(text).tz_localize(TIMEZONE).to_pydatetime()
+
+
+@pytest.fixture
+def data_manager(tmp_path):
+    replay_dir = tmp_path / 'replay'
+    os.makedirs(replay_dir / '1d')
+    eob = pd.bdate_range('2024-01-01', periods=40) + pd.Timedelta(hours=15)
+    for seed, symbol in enumerate(['SHSE.600000', 'SZSE.000001']):
+        close = 10 + np.cumsum(np.random.default_rng(seed).normal(0, 0.1, len(eob)))
+        # 第二只股票上市较晚
+        start = 0 if seed == 0 else 30
+        pd.DataFrame({'eob': eob[start:], 'open': close[start:], 'high': close[start:], 'low': close[start:],
+                      'close': close[start:], 'volume': 1e6, 'amount': 1e7}) \
+            .to_csv(replay_dir / '1d' / f'{symbol}.csv', index=False)
+    config = TradingConfig(adapter_type='replay', replay_data_dir=str(replay_dir),
+                           data_cache_dir=str(tmp_path / 'cache'), bar_store_enabled=False)
+    return BaseDataManager(config, ReplayAdapter(config))
+
+
+def test_field_matrix_is_sliced_from_one_daily_panel(data_manager):
+    context = PanelContext(at('2024-02-20 09:31'))
+    data_manager.adapter.context.now = context.now
+    symbols = ['SHSE.600000', 'SZSE.000001']
+    matrix = data_manager.get_close_matrix(context, symbols, 20)
+    for i, symbol in enumerate(symbols):
+        close = data_manager.get_close(context, symbol, 20)
+        np.testing.assert_array_equal(matrix[i, 20 - len(close):], close)
+        assert np.isnan(matrix[i, :20 - len(close)]).all()
+    panel = data_manager.get_market_panel(context, symbols, 20)
+    # 同一交易日更短的请求、子集与其他字段都由同一面板切片
+    assert data_manager.get_market_panel(context, symbols[:1], 10) is panel
+    np.testing.assert_array_equal(data_manager.get_field_matrix(context, symbols, 'volume', 5), panel.volume[:, -5:])
+
+
+def test_refresh_daily_prebuilds_panel_with_new_bar(data_manager):
+    context = PanelContext(at('2024-02-20 09:31'))
+    data_manager.adapter.context.now = context.now
+    data_manager.refresh_daily(context)
+    symbols = ['SHSE.600000', 'SZSE.000001']
+    before = data_manager.get_market_panel(context, symbols, 20)
+    context.now = data_manager.adapter.context.now = at('2024-02-22 09:31')
+    data_manager.refresh_daily(context)
+    panel = data_manager.cache.get('panel_1d')
+    assert panel is not None and panel.trade_date == '2024-02-22'
+    assert panel.symbols == symbols and panel.width == 20
+    assert data_manager.get_market_panel(context, symbols, 20) is panel
+    # 滚动追加了新的K线
+    assert panel.eobs[0, -1] > before.eobs[0, -1]
+    np.testing.assert_array_equal(panel.close[0, :-2], before.close[0, 2:])
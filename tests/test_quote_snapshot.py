@@ -0,0 +1,72 @@
+# coding=utf-8
+from data.quote_snapshot import QuoteSnapshot
+
+
+class FakeAdapter:
+    """按请求返回递增价格，记录每次请求的标的"""
+
+    def __init__(self, known=('A', 'B', 'C')):
+        self.known = set(known)
+        self.calls = []
+
+    def current(self, symbols, fields=''):
+        self.calls.append(list(symbols))
+        price = float(len(self.calls))
+        return [{'symbol': symbol, 'price': price} for symbol in symbols if symbol in self.known]
+
+
+def test_scope_shares_one_batched_request():
+    adapter = FakeAdapter()
+    quotes = QuoteSnapshot(adapter)
+    quotes.begin()
+    assert set(quotes.load(['A', 'B', 'A', ' '])) == {'A', 'B'}
+    assert quotes.get_price('A') == 1.0
+    assert quotes.get('C')['price'] == 2.0
+    quotes.end()
+    assert adapter.calls == [['A', 'B'], ['C']]
+
+
+def test_missing_symbol_is_requested_once_per_scope():
+    adapter = FakeAdapter()
+    quotes = QuoteSnapshot(adapter)
+    quotes.begin()
+    assert quotes.get('X') is None
+    assert quotes.get_price('X') == 0.0
+    quotes.end()
+    assert adapter.calls == [['X']]
+
+
+def test_new_scope_refetches_and_nested_scope_shares():
+    adapter = FakeAdapter()
+    quotes = QuoteSnapshot(adapter)
+    quotes.begin()
+    quotes.get('A')
+    quotes.begin()
+    assert quotes.get_price('A') == 1.0
+    quotes.end()
+    assert quotes.active
+    quotes.end()
+    quotes.begin()
+    assert quotes.get_price('A') == 2.0
+    quotes.end()
+    assert quotes.get_stats() == {'callbacks': 2, 'symbols': 0, 'requests': 2}
+
+
+def test_outside_scope_is_not_cached():
+    adapter = FakeAdapter()
+    quotes = QuoteSnapshot(adapter)
+    assert quotes.get_price('A') == 1.0
+    assert quotes.get_price('A') == 2.0
+    quotes.update('A', {'close': 9.0})
+    assert quotes.get_price('A') == 3.0
+
+
+def test_pushed_bar_overrides_quote_within_scope():
+    adapter = FakeAdapter()
+    quotes = QuoteSnapshot(adapter)
+    quotes.begin()
+    quotes.update('A', {'open': 8.0, 'high': 10.0, 'low': 7.5, 'close': 9.0, 'volume': 100})
+    quote = quotes.get('A')
+    assert (quote['price'], quote['open'], quote['volume']) == (9.0, 8.0, 100.0)
+    quotes.end()
+    assert adapter.calls == []
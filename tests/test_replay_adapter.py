@@ -0,0 +1,130 @@
+# coding=utf-8
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from adapter.replay_adapter import ReplayAdapter
+from config.trading_config import TradingConfig
+from core.constants import (OrderSide_Buy, OrderSide_Sell, OrderStatus_Filled, OrderStatus_Rejected,
+                            OrderType_Limit, OrderType_Market, PositionEffect_Close, PositionEffect_Open)
+from data.bar_store import TIMEZONE
+
+SYMBOL = 'SHSE.600000'
+
+
+def at(text: str) -> datetime:
+    return pd.Timestamp(text).tz_localize(TIMEZONE).to_pydatetime()
+
+
+@pytest.fixture
+def adapter(tmp_path):
+    os.makedirs(tmp_path / '1d')
+    pd.DataFrame({
+        'eob': ['2024-01-02 15:00:00', '2024-01-03 15:00:00', '2024-01-04 15:00:00'],
+        'open': [10.0, 11.0, 12.0], 'high': [11.0, 12.0, 13.0], 'low': [9.0, 10.0, 11.0],
+        'close': [10.5, 11.5, 12.5], 'volume': [1e6] * 3, 'amount': [1e7] * 3,
+    }).to_csv(tmp_path / '1d' / f'{SYMBOL}.csv', index=False)
+    config = TradingConfig(replay_data_dir=str(tmp_path), backtest_start='2024-01-01 08:00:00',
+                           backtest_end='2024-01-31 16:00:00', initial_cash=100000,
+                           commission_ratio=0.0, slippage_ratio=0.0)
+    return ReplayAdapter(config)
+
+
+class Recorder:
+    """记录回调的策略桩"""
+
+    def __init__(self, adapter):
+        self.adapter = adapter
+        self.events = []
+
+    def init(self, context):
+        self.events.append(('init', context.now))
+
+    def on_bar(self, context, bars):
+        self.events.append(('bar', context.now, [bar['close'] for bar in bars]))
+
+    def on_execution_report(self, context, execrpt):
+        self.events.append(('exec', execrpt['side'], execrpt['volume'], execrpt['price']))
+
+    def on_order_status(self, context, order):
+        self.events.append(('order', order['status']))
+
+    def on_backtest_finished(self, context, indicator):
+        self.events.append(('finished', indicator))
+
+
+def test_history_does_not_look_ahead(adapter):
+    adapter.context.now = at('2024-01-03 10:00')
+    data = adapter.history(SYMBOL, '1d', '2024-01-01', '2024-01-31')
+    assert list(data['close']) == [10.5]
+    assert data['eob'].dt.tz is not None
+    assert adapter.history('SZSE.000001', '1d', '2024-01-01', '2024-01-31').empty
+    assert adapter.available_symbols() == [SYMBOL]
+
+
+def test_price_is_open_before_close_and_close_after(adapter):
+    adapter.context.now = at('2024-01-03 09:31')
+    assert adapter.get_price(SYMBOL) == 11.0
+    adapter.context.now = at('2024-01-03 15:30')
+    assert adapter.get_price(SYMBOL) == 11.5
+    adapter.context.now = at('2024-01-06 10:00')
+    assert adapter.get_price(SYMBOL) == 12.5
+    assert adapter.current(SYMBOL)[0]['price'] == 12.5
+
+
+def test_orders_update_account_and_report_executions(adapter):
+    recorder = Recorder(adapter)
+    adapter._callbacks = recorder
+    adapter.context.now = at('2024-01-02 09:31')
+    order = adapter.order_volume(SYMBOL, 1000, OrderSide_Buy, OrderType_Market, PositionEffect_Open)[0]
+    assert (order['status'], order['filled_volume'], order['filled_vwap']) == (OrderStatus_Filled, 1000, 10.0)
+    account = adapter.context.account()
+    assert account.available == 90000
+    assert account.positions()[0]['volume'] == 1000
+    assert recorder.events == [('exec', OrderSide_Buy, 1000, 10.0), ('order', OrderStatus_Filled)]
+
+    adapter.context.now = at('2024-01-03 15:30')
+    assert account.cash.nav == pytest.approx(90000 + 11.5 * 1000)
+    adapter.order_volume(SYMBOL, 400, OrderSide_Sell, OrderType_Market, PositionEffect_Close)
+    assert account.positions()[0]['volume'] == 600
+    # 卖出数量不超过持仓
+    adapter.order_volume(SYMBOL, 1000, OrderSide_Sell, OrderType_Market, PositionEffect_Close)
+    assert account.positions() == []
+    assert account.available == pytest.approx(90000 + 11.5 * 1000)
+
+
+def test_rejected_orders(adapter):
+    adapter.context.now = at('2024-01-02 09:31')
+    limit = adapter.order_volume(SYMBOL, 100, OrderSide_Buy, OrderType_Limit, PositionEffect_Open, price=9.0)[0]
+    assert (limit['status'], limit['ord_rej_reason_detail']) == (OrderStatus_Rejected, '限价未成交')
+    cash = adapter.order_volume(SYMBOL, 100000, OrderSide_Buy, OrderType_Market, PositionEffect_Open)[0]
+    assert cash['ord_rej_reason_detail'] == '可用资金不足'
+    missing = adapter.order_volume('SZSE.000001', 100, OrderSide_Buy, OrderType_Market, PositionEffect_Open)[0]
+    assert missing['ord_rej_reason_detail'] == '无行情'
+    assert adapter.context.account().available == 100000
+
+
+def test_target_percent_rounds_to_lots(adapter):
+    adapter.context.now = at('2024-01-02 09:31')
+    adapter.order_target_percent(SYMBOL, 0.5, 1, OrderType_Market)
+    assert adapter.context.account().positions()[0]['volume'] == 5000
+    adapter.order_target_percent(SYMBOL, 0.0, 1, OrderType_Market)
+    assert adapter.context.account().positions() == []
+
+
+def test_run_schedules_and_pushes_subscribed_bars(adapter):
+    recorder = Recorder(adapter)
+    runs = []
+    adapter.schedule(lambda context: runs.append((context.now, adapter.get_price(SYMBOL))), '1d', '09:31:00')
+    adapter.subscribe(SYMBOL, '1d')
+    adapter.run(recorder)
+    assert [(now.day, now.hour, now.minute, price) for now, price in runs] == \
+        [(2, 9, 31, 10.0), (3, 9, 31, 11.0), (4, 9, 31, 12.0)]
+    bars = [event for event in recorder.events if event[0] == 'bar']
+    assert [(now.day, now.hour, closes) for _, now, closes in bars] == \
+        [(2, 15, [10.5]), (3, 15, [11.5]), (4, 15, [12.5])]
+    assert recorder.events[0][0] == 'init'
+    assert recorder.events[-1][0] == 'finished'
+    assert recorder.events[-1][1]['pnl_ratio'] == 0
@@ -0,0 +1,110 @@
+# coding=utf-8
+from datetime import datetime
+
+import pytest
+
+from config.trading_config import TradingConfig
+from core.constants import ExecType_Trade, OrderSide_Buy, OrderSide_Sell
+from strategies.risk_managers.base_risk import BaseRiskManager
+
+SYMBOL = 'SHSE.600000'
+
+
+class FakeAccount:
+    def __init__(self, cash=0.0, positions=None):
+        self.cash = cash
+        self._positions = positions or []
+
+    def positions(self):
+        return self._positions
+
+
+class FakeContext:
+    def __init__(self, now, account=None):
+        self.now = now
+        self._account = account or FakeAccount()
+        self.account_reads = 0
+
+    def account(self):
+        self.account_reads += 1
+        return self._account
+
+
+def execution(side, volume, price, created_at, amount=0.0, exec_type=ExecType_Trade):
+    return {'symbol': SYMBOL, 'side': side, 'volume': volume, 'price': price,
+            'amount': amount, 'created_at': created_at, 'exec_type': exec_type}
+
+
+@pytest.fixture
+def risk():
+    return BaseRiskManager(TradingConfig())
+
+
+@pytest.fixture
+def context():
+    return FakeContext(datetime(2024, 1, 2, 10, 0))
+
+
+def test_buy_creates_record_and_marks_today_bought(risk, context):
+    risk.apply_execution(context, execution(OrderSide_Buy, 100, 10.0, context.now))
+    record = risk.position_records[SYMBOL]
+    assert (record.volume, record.avg_cost, record.buy_date) == (100, 10.0, '2024-01-02')
+    assert risk.holds(SYMBOL)
+    assert not risk.can_sell_today(context, SYMBOL)
+    assert context.account_reads == 0
+
+
+def test_add_position_averages_cost_and_keeps_highest_price(risk, context):
+    risk.apply_execution(context, execution(OrderSide_Buy, 100, 10.0, context.now))
+    risk.position_records[SYMBOL].highest_price = 15.0
+    # 成交金额优先于价格*数量
+    risk.apply_execution(context, execution(OrderSide_Buy, 100, 12.0, context.now, amount=1210.0))
+    record = risk.position_records[SYMBOL]
+    assert record.volume == 200
+    assert record.avg_cost == pytest.approx(11.05)
+    assert record.highest_price == 15.0
+
+
+def test_sell_reduces_and_removes_record(risk, context):
+    risk.apply_execution(context, execution(OrderSide_Buy, 300, 10.0, context.now))
+    risk.apply_execution(context, execution(OrderSide_Sell, 100, 11.0, context.now))
+    assert risk.position_records[SYMBOL].volume == 200
+    assert risk.position_records[SYMBOL].avg_cost == 10.0
+    risk.apply_execution(context, execution(OrderSide_Sell, 200, 11.0, context.now))
+    assert SYMBOL not in risk.position_records
+    assert not risk.holds(SYMBOL)
+
+
+def test_ignores_non_trade_and_empty_executions(risk, context):
+    risk.apply_execution(context, execution(OrderSide_Buy, 100, 10.0, context.now, exec_type=ExecType_Trade + 1))
+    risk.apply_execution(context, execution(OrderSide_Buy, 0, 10.0, context.now))
+    risk.apply_execution(context, execution(OrderSide_Sell, 100, 10.0, context.now))
+    assert risk.position_records == {}
+
+
+def test_execution_invalidates_portfolio_snapshot(risk, context):
+    risk.begin_callback()
+    risk.get_portfolio(context)
+    risk.get_portfolio(context)
+    assert context.account_reads == 1
+    risk.apply_execution(context, execution(OrderSide_Buy, 100, 10.0, context.now))
+    risk.get_portfolio(context)
+    assert context.account_reads == 2
+    risk.end_callback()
+    # 回调之外每次重新读取账户
+    risk.get_portfolio(context)
+    risk.get_portfolio(context)
+    assert context.account_reads == 4
+
+
+def test_reconcile_matches_incremental_records_and_keeps_high(risk, context):
+    risk.apply_execution(context, execution(OrderSide_Buy, 100, 10.0, context.now))
+    risk.position_records[SYMBOL].highest_price = 13.0
+    risk.position_records['SZSE.000001'] = risk.position_records[SYMBOL]
+    context._account = FakeAccount(positions=[
+        {'symbol': SYMBOL, 'volume': 100, 'vwap': 10.0, 'price': 12.0, 'updated_at': context.now},
+    ])
+    risk.update_position_all(context)
+    assert list(risk.position_records) == [SYMBOL]
+    record = risk.position_records[SYMBOL]
+    assert (record.volume, record.avg_cost, record.highest_price) == (100, 10.0, 13.0)
@@ -0,0 +1,46 @@
+# coding=utf-8
+import numpy as np
+import pytest
+
+from core.base import SelectionResult
+
+
+def reference(symbols, scores, k):
+    """按得分稳定降序排序后取前k只，NaN排在最后"""
+    keys = [(-score if not np.isnan(score) else np.inf, i) for i, score in enumerate(scores)]
+    return [symbols[i] for _, i in sorted(keys)[:k]]
+
+
+@pytest.mark.parametrize('k', [0, 1, 3, 10, 50])
+def test_top_k_matches_stable_sort(k):
+    rng = np.random.default_rng(k)
+    scores = rng.integers(0, 5, 20).astype(np.float64)  # 大量同分
+    scores[[2, 7]] = np.nan
+    symbols = [f'S{i}' for i in range(20)]
+    result = SelectionResult.top_k(symbols, scores, k)
+    assert result.symbols == reference(symbols, scores, k)
+
+
+def test_top_k_with_nan_still_returns_k():
+    scores = [np.nan, 1.0, np.nan, 2.0]
+    result = SelectionResult.top_k(['A', 'B', 'C', 'D'], scores, 3)
+    assert result.symbols == ['D', 'B', 'A']
+    assert np.isnan(result.scores[-1])
+
+
+def test_items_are_created_lazily_and_cached():
+    result = SelectionResult(['A', 'B'], [2.0, 1.0])
+    assert len(result) == 2
+    first = result[0]
+    assert (first.symbol, first.score) == ('A', 2.0)
+    assert result[0] is first
+    assert [item.symbol for item in result[-1:]] == ['B']
+    with pytest.raises(IndexError):
+        result[2]
+    assert result.total_score == 3.0
+
+
+def test_empty_result():
+    result = SelectionResult.top_k([], [], 5)
+    assert len(result) == 0
+    assert result.describe() == "无入选股票"
@@ -0,0 +1,103 @@
+# coding=utf-8
+import numpy as np
+import pytest
+
+from config.trading_config import TradingConfig
+from data.bar_store import from_ns, to_ns
+from strategies.timing_strategies.ma_timing import MovingAverageTimingStrategy
+from strategies.timing_strategies.rsi_timing import RSITimingStrategy
+from strategy.streaming_engine import StreamingSignalEngine
+
+START = to_ns('2024-01-02 09:31')
+MINUTE = 60 * 10 ** 9
+
+
+def make_prices(seed: int, count: int) -> np.ndarray:
+    """先涨后跌的随机价格，使均线与RSI信号都会翻转"""
+    rng = np.random.default_rng(seed)
+    drift = np.where(np.arange(count) < 30, 0.01, -0.01)
+    return 10 * np.exp(np.cumsum(rng.normal(0, 0.01, count) + drift))
+
+
+class FakeDataManager:
+    """按标的提供固定价格序列的前count根K线"""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.batches = []
+
+    def get_stock_data_batch(self, context, symbols, count, frequency):
+        self.batches.append((list(symbols), count, frequency))
+
+    def get_fields(self, context, symbol, fields, count, frequency):
+        close = self.prices[symbol][:count]
+        return {'eob': START + np.arange(len(close), dtype=np.int64) * MINUTE, 'close': close}
+
+
+def bar(symbol, index, close):
+    return {'symbol': symbol, 'eob': from_ns(START + index * MINUTE).to_pydatetime(), 'close': close}
+
+
+@pytest.fixture
+def config():
+    return TradingConfig()
+
+
+@pytest.mark.parametrize('strategy_class', [MovingAverageTimingStrategy, RSITimingStrategy])
+def test_streamed_signals_match_batch_signals(config, strategy_class):
+    timing = strategy_class(config)
+    count = timing.data_count
+    prices = {'A': make_prices(1, count + 40), 'B': make_prices(2, count + 40)}
+    data_manager = FakeDataManager(prices)
+    engine = StreamingSignalEngine(config, timing)
+    added, removed = engine.track(None, ['A', 'B'], data_manager)
+    assert (added, removed) == (['A', 'B'], [])
+    assert data_manager.batches == [(['A', 'B'], count, config.streaming_frequency)]
+    seen = set()
+    for index in range(count, count + 40):
+        for symbol in ('A', 'B'):
+            signal = engine.update(bar(symbol, index, prices[symbol][index]))
+            # 增量状态自跟踪起连续递推（Wilder RSI不截断窗口），与全部已推送K线的批量结果一致
+            history = prices[symbol][:index + 1]
+            batch = timing.signals_universe(history[np.newaxis, :])
+            expected = tuple(bool(values[0]) for values in batch)
+            assert signal == expected
+            seen.add(signal)
+    assert len(seen) > 1
+    assert engine.get_stats() == {'symbols': 2, 'bars': 80}
+
+
+def test_duplicate_and_untracked_bars_are_ignored(config):
+    timing = MovingAverageTimingStrategy(config)
+    prices = {'A': make_prices(1, 30)}
+    engine = StreamingSignalEngine(config, timing)
+    engine.track(None, ['A'], FakeDataManager(prices))
+    assert engine.update(bar('A', 19, 99.0)) is None  # 已由初始化窗口覆盖
+    assert engine.update(bar('B', 20, 10.0)) is None
+    assert engine.update(bar('A', 20, prices['A'][20])) is not None
+    assert engine.update(bar('A', 20, prices['A'][20])) is None
+    assert engine.get_stats()['bars'] == 1
+
+
+def test_track_adds_and_removes_symbols(config):
+    timing = MovingAverageTimingStrategy(config)
+    prices = {symbol: make_prices(seed, 30) for seed, symbol in enumerate('ABC')}
+    data_manager = FakeDataManager(prices)
+    engine = StreamingSignalEngine(config, timing)
+    engine.track(None, ['A', 'B'], data_manager)
+    added, removed = engine.track(None, [' B', 'C', 'C'], data_manager)
+    assert (added, removed) == (['C'], ['A'])
+    assert engine.symbols == ['B', 'C']
+    assert data_manager.batches[-1][0] == ['C']
+    assert engine.update(bar('A', 20, 10.0)) is None
+    assert engine.update(bar('C', 20, prices['C'][20])) is not None
+
+
+def test_timing_without_history_only_tracks_latest_price(config):
+    timing = MovingAverageTimingStrategy(config)
+    timing.supports_rolling = False
+    data_manager = FakeDataManager({})
+    engine = StreamingSignalEngine(config, timing)
+    engine.track(None, ['A'], data_manager)
+    assert data_manager.batches == []
+    assert len(engine.registry) == 1
@@ -1,9 +1,8 @@
 # coding=utf-8
 
-from gm.api import *
-from core.base import ITradeExecutor
+from core.base import IDataManager, IMarketAdapter, ITradeExecutor
+from core.constants import OrderSide_Buy, OrderType_Market, PositionEffect_Open, PositionSide_Long
 from strategies.risk_managers.base_risk import IRiskManager
-from utils.data_converter import DataConverter
 from utils.logger import default_logger as logger
 
 
@@ -13,29 +12,22 @@ class BaseTradeExecutor(ITradeExecutor):
     def execute_reduce_position(self, context, symbol: str, weight: float) -> bool:
         pass
 
-    def __init__(self, config, risk_manager: IRiskManager):
+    def __init__(self, config, risk_manager: IRiskManager, adapter: IMarketAdapter, data_manager: IDataManager):
         self.config = config
         self.risk_manager = risk_manager
+        self.adapter = adapter
+        self.data_manager = data_manager
 
     def execute_buy(self, context, symbol: str, weight: float) -> bool:
         """执行买入"""
         try:
-            from gm.api import current
-            current_data = current(symbols=symbol, fields='price')
-            if not current_data:
+            cur_price = self.data_manager.get_current_price(context, symbol)
+            if cur_price <= 0:
                 logger.warning(f"无法获取{symbol}的当前价格")
                 return False
-            cur_price = DataConverter.safe_float(current_data[0])
-            account = context.account()
-            cash = DataConverter.safe_float(account.cash)
-            positions = account.positions()
-            total_position_value = 0
-            for pos in positions:
-                volume = DataConverter.safe_float(pos['volume'])
-                price = DataConverter.safe_float(pos['price'])
-                total_position_value += volume * price
-
-            total_assets = cash + total_position_value
+            portfolio = self.risk_manager.get_portfolio(context)
+            cash = portfolio.cash
+            total_assets = portfolio.total_assets
 
             plan_amount = total_assets * weight
             available_cash = cash * 0.95  # 保留5%现金
@@ -57,13 +49,14 @@ class BaseTradeExecutor(ITradeExecutor):
                 return False
 
             # 执行买入
-            order_volume(
+            self.adapter.order_volume(
                 symbol=symbol,
                 volume=plan_volume,
                 side=OrderSide_Buy,
                 order_type=OrderType_Market,
                 position_effect=PositionEffect_Open
             )
+            self.risk_manager.invalidate_portfolio()
             logger.info(
                 f"买入委托 {symbol}, 数量: {plan_volume}, 价格: {cur_price:.2f}, 金额: {plan_volume * cur_price:.2f}")
             return True
@@ -74,18 +67,20 @@ class BaseTradeExecutor(ITradeExecutor):
     def execute_sell(self, context, symbol: str, reason: str) -> bool:
         """执行卖出"""
         try:
-            from gm.api import current
             if not self.risk_manager.can_sell_today(context, symbol):
                 logger.debug(f"T+1限制，无法卖出 {symbol}")
                 return False
-            positions = context.account().positions(symbol=symbol)
-            if not positions or DataConverter.safe_float(positions[0]['volume']) <= 0:
+            volume = self.risk_manager.get_portfolio(context).volume(symbol)
+            if volume <= 0:
+                return False
+            volume_to_sell = int(volume)
+            cur_price = self.data_manager.get_current_price(context, symbol)
+            if cur_price <= 0:
+                logger.warning(f"无法获取{symbol}的当前价格")
                 return False
-            position = positions[0]
-            volume_to_sell = int(DataConverter.safe_float(position['volume']))
-            cur_price = DataConverter.safe_float(current(symbols=symbol, fields='price')[0])
-            order_target_percent(symbol=symbol, percent=0, order_type=OrderType_Market, price=cur_price,
-                                 position_side=PositionSide_Long)
+            self.adapter.order_target_percent(symbol=symbol, percent=0, order_type=OrderType_Market, price=cur_price,
+                                              position_side=PositionSide_Long)
+            self.risk_manager.invalidate_portfolio()
             logger.info(f"卖出 {symbol}, 数量: {volume_to_sell}, 价格: {cur_price:.2f}, 原因: {reason}")
             return True
 
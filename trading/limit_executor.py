@@ -1,8 +1,7 @@
 # coding=utf-8
 
-from gm.api import *
+from core.constants import OrderSide_Buy, OrderType_Limit, PositionEffect_Open
 from trading.base_executor import BaseTradeExecutor
-from utils.data_converter import DataConverter
 from utils.logger import default_logger as logger
 
 
@@ -12,26 +11,14 @@ class LimitPriceTradeExecutor(BaseTradeExecutor):
     def execute_buy(self, context, symbol: str, weight: float) -> bool:
         """使用限价单执行买入"""
         try:
-            from gm.api import current
-
-            current_data = current(symbols=symbol, fields='price')
-            if not current_data:
+            cur_price = self.data_manager.get_current_price(context, symbol)
+            if cur_price <= 0:
                 logger.warning(f"无法获取{symbol}的当前价格")
                 return False
 
-            cur_price = DataConverter.safe_float(current_data[0])
-
-            account = context.account()
-            cash = DataConverter.safe_float(account.cash)
-
-            positions = account.positions()
-            total_position_value = 0
-            for pos in positions:
-                volume = DataConverter.safe_float(pos['volume'])
-                price = DataConverter.safe_float(pos['price'])
-                total_position_value += volume * price
-
-            total_assets = cash + total_position_value
+            portfolio = self.risk_manager.get_portfolio(context)
+            cash = portfolio.cash
+            total_assets = portfolio.total_assets
 
             plan_amount = total_assets * weight
             available_cash = cash * 0.95
@@ -54,7 +41,7 @@ class LimitPriceTradeExecutor(BaseTradeExecutor):
 
             # 使用限价单，略高于现价
             limit_price = cur_price * 1.002  # 上浮0.2%
-            order_volume(
+            self.adapter.order_volume(
                 symbol=symbol,
                 volume=plan_volume,
                 side=OrderSide_Buy,
@@ -62,6 +49,7 @@ class LimitPriceTradeExecutor(BaseTradeExecutor):
                 position_effect=PositionEffect_Open,
                 price=limit_price
             )
+            self.risk_manager.invalidate_portfolio()
             logger.info(f"限价买入委托 {symbol}, 数量: {plan_volume}, 价格: {limit_price:.2f}")
             return True
 
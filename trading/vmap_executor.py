@@ -1,9 +1,8 @@
 # coding=utf-8
 from datetime import timedelta
 
-from gm.api import *
+from core.constants import OrderSide_Buy, OrderType_Limit, PositionEffect_Open
 from trading.base_executor import BaseTradeExecutor
-from utils.data_converter import DataConverter
 from utils.logger import default_logger as logger
 
 
@@ -13,11 +12,10 @@ class VWAPTradeExecutor(BaseTradeExecutor):
     def execute_buy(self, context, symbol: str, weight: float) -> bool:
         """使用VWAP策略执行买入"""
         try:
-            from gm.api import current, history
             end_time = context.now
             start_time = end_time - timedelta(days=5)
             # 获取近期数据计算VWAP
-            data = history(
+            data = self.adapter.history(
                 symbol=symbol,
                 frequency='1d',
                 start_time=start_time,
@@ -35,20 +33,11 @@ class VWAPTradeExecutor(BaseTradeExecutor):
                 vwap = total_amount / total_volume
             else:
                 vwap = data['close'].iloc[-1]
-            current_data = current(symbols=symbol, fields='price')
-            if not current_data:
+            if self.data_manager.get_current_price(context, symbol) <= 0:
                 return False
-            account = context.account()
-            cash = DataConverter.safe_float(account.cash)
-
-            positions = account.positions()
-            total_position_value = 0
-            for pos in positions:
-                volume = DataConverter.safe_float(pos['volume'])
-                price = DataConverter.safe_float(pos['price'])
-                total_position_value += volume * price
-
-            total_assets = cash + total_position_value
+            portfolio = self.risk_manager.get_portfolio(context)
+            cash = portfolio.cash
+            total_assets = portfolio.total_assets
 
             plan_amount = total_assets * weight
             available_cash = cash * 0.95
@@ -65,7 +54,7 @@ class VWAPTradeExecutor(BaseTradeExecutor):
             if not self.risk_manager.check_position_limits(context, symbol, plan_volume * vwap):
                 return False
             # 以VWAP价格下单
-            order_volume(
+            self.adapter.order_volume(
                 symbol=symbol,
                 volume=plan_volume,
                 side=OrderSide_Buy,
@@ -73,6 +62,7 @@ class VWAPTradeExecutor(BaseTradeExecutor):
                 position_effect=PositionEffect_Open,
                 price=vwap
             )
+            self.risk_manager.invalidate_portfolio()
             logger.info(f"VWAP买入委托 {symbol}, 数量: {plan_volume}, VWAP价格: {vwap:.2f}")
             return True
         except Exception as e:
@@ -1,40 +1,155 @@
 # coding=utf-8
-from typing import Any, Dict
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_size(value: Any) -> int:
+    """
+    估算缓存值占用的内存字节数
+
+    DataFrame/Series按各列数组的字节数计算，字符串、对象列按每行一个指针计，
+    不遍历对象内容（memory_usage(deep=True)对30行的窗口也需约0.5毫秒）
+    """
+    if isinstance(value, pd.DataFrame):
+        return len(value) * sum(getattr(dtype, 'itemsize', 8) for dtype in value.dtypes.values)
+    if isinstance(value, pd.Series):
+        return len(value) * getattr(value.dtype, 'itemsize', 8)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+    return sys.getsizeof(value)
 
 
 class CacheManager:
-    """缓存管理器"""
+    """缓存管理器，LRU淘汰（O(1)），支持过期时间、内存上限与命中统计"""
 
-    def __init__(self, max_size: int = 1000):
-        self._cache: Dict[str, Any] = {}
+    def __init__(self, max_size: int = 1000, max_bytes: int = 0, default_ttl: Optional[float] = None):
+        """
+        Args:
+            max_size: 最大缓存条目数，0表示不限制
+            max_bytes: 最大内存占用（字节），0表示不限制
+            default_ttl: 默认过期时间（秒），None表示不过期
+        """
+        # key -> (value, size, expire_at)
+        self._cache: 'OrderedDict[str, tuple]' = OrderedDict()
         self.max_size = max_size
-        self._access_count: Dict[str, int] = {}
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
 
     def get(self, key: str) -> Any:
-        """获取缓存值"""
-        value = self._cache.get(key)
-        if value is not None:
-            self._access_count[key] = self._access_count.get(key, 0) + 1
-        return value
-
-    def set(self, key: str, value: Any):
-        """设置缓存值"""
-        # 如果缓存已满，删除最不常用的项
-        if len(self._cache) >= self.max_size and key not in self._cache:
-            # 找到访问次数最少的key
-            if self._access_count:
-                min_key = min(self._access_count, key=self._access_count.get)
-                del self._cache[min_key]
-                del self._access_count[min_key]
-            else:
-                # 如果没有访问记录，删除第一个key
-                first_key = next(iter(self._cache))
-                del self._cache[first_key]
-
-        self._cache[key] = value
-        self._access_count[key] = self._access_count.get(key, 0) + 1
+        """获取缓存值，不存在或已过期返回None"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, _, expire_at = entry
+            if expire_at is not None and expire_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """设置缓存值，只在设置了内存上限时估算大小"""
+        size = estimate_size(value) if self.max_bytes else 0
+        if ttl is None:
+            ttl = self.default_ttl
+        expire_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            # 单个值超过内存上限时不缓存
+            if self.max_bytes and size > self.max_bytes:
+                return
+            self._cache[key] = (value, size, expire_at)
+            self._bytes += size
+            self._evict()
+
+    def delete(self, key: str):
+        """删除缓存值"""
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
 
     def clear(self):
         """清空缓存"""
-        self._cache.clear()
-        self._access_count.clear()
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
+
+    def keys(self) -> List[str]:
+        """当前缓存的全部key"""
+        with self._lock:
+            return list(self._cache.keys())
+
+    def peek(self, key: str) -> Tuple[Any, int]:
+        """查看缓存值及其占用字节数（未设置内存上限时为0），不影响淘汰顺序与命中统计，不存在返回(None, 0)"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None, 0
+            return entry[0], entry[1]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._cache
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def total_bytes(self) -> int:
+        """当前缓存占用的内存字节数，未设置内存上限时不统计，为0"""
+        return self._bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._cache),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests > 0 else 0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def reset_stats(self):
+        """重置统计计数"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def _remove(self, key: str):
+        _, size, _ = self._cache.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        """淘汰最久未使用的项，直到满足条目数与内存上限"""
+        while self._cache and ((self.max_size and len(self._cache) > self.max_size)
+                               or (self.max_bytes and self._bytes > self.max_bytes)):
+            key, (_, size, _) = self._cache.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
@@ -0,0 +1,429 @@
+# coding=utf-8
+"""
+技术指标库
+
+每个指标提供两种入口：
+- 增量对象：update()每根K线O(1)更新并返回最新值，使用__slots__，不创建数组
+- compute()：对 标的数 × 时间 的矩阵整体计算，返回同形状的指标矩阵，无法计算的位置为NaN
+
+矩阵每行应为等长无缺失的序列（按K线数量分组后的行情矩阵），
+增量对象在数据不足一个窗口时返回已有数据的统计值，compute()对应位置为NaN
+"""
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class RingBuffer:
+    """定长环形缓冲区，追加O(1)，按倒序下标读取O(1)，满后覆盖最早的值"""
+
+    __slots__ = ('_data', '_capacity', '_start', '_size')
+
+    def __init__(self, capacity: int):
+        self._data = np.empty(capacity, dtype=np.float64)
+        self._capacity = capacity
+        self._start = 0
+        self._size = 0
+
+    def append(self, value: float) -> Optional[float]:
+        """追加一个值，缓冲区已满时返回被覆盖的最早值"""
+        if self._size < self._capacity:
+            self._data[(self._start + self._size) % self._capacity] = value
+            self._size += 1
+            return None
+        dropped = self._data[self._start]
+        self._data[self._start] = value
+        self._start = (self._start + 1) % self._capacity
+        return float(dropped)
+
+    def __getitem__(self, index: int) -> float:
+        """按下标读取，负数表示倒数，-1为最新值"""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("环形缓冲区下标越界")
+        return float(self._data[(self._start + index) % self._capacity])
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def full(self) -> bool:
+        return self._size == self._capacity
+
+    def values(self) -> np.ndarray:
+        """按时间顺序返回全部值的副本"""
+        end = self._start + self._size
+        if end <= self._capacity:
+            return self._data[self._start:end].copy()
+        return np.concatenate([self._data[self._start:], self._data[:end - self._capacity]])
+
+
+def bar_counts(matrix: np.ndarray) -> np.ndarray:
+    """右对齐、左侧补NaN的行情矩阵（get_field_matrix返回值）中每行的K线数量"""
+    if matrix.shape[1] == 0:
+        return np.zeros(len(matrix), dtype=np.int64)
+    has_data = ~np.isnan(matrix)
+    first = np.argmax(has_data, axis=1)
+    return np.where(has_data.any(axis=1), matrix.shape[1] - first, 0)
+
+
+def _rolling(values: np.ndarray, window: int, func) -> np.ndarray:
+    """对每行最近window列的滑动窗口调用func(窗口, axis=-1)，前window-1列为NaN"""
+    result = np.full(values.shape, np.nan)
+    if window <= values.shape[1]:
+        result[:, window - 1:] = func(sliding_window_view(values, window, axis=1), axis=-1)
+    return result
+
+
+def _smooth(seed: np.ndarray, values: np.ndarray, decay: float, divisor: float, block: int = 256) -> np.ndarray:
+    """
+    一阶递归滤波 y[t] = decay * y[t-1] + x[t] / divisor（Wilder平滑、EMA）的矩阵计算
+
+    展开为 y[t] = decay^t * (y[0] + Σ x[j] * decay^-j / divisor)，按列累加得到整段序列，
+    分块计算以限制decay^-j的量级；decay为0（EMA span=1、Wilder周期1）时不依赖前值，直接为x[t] / divisor
+
+    Returns:
+        以seed为首列的 标的数 × (列数+1) 矩阵
+    """
+    result = np.empty((len(seed), values.shape[1] + 1))
+    result[:, 0] = seed
+    if decay == 0:
+        result[:, 1:] = values / divisor
+        return result
+    # decay越小decay^-j增长越快，缩小分块使其不超过约1e300
+    block = max(1, min(block, int(300 / -np.log10(decay)))) if decay < 1 else block
+    for start in range(0, values.shape[1], block):
+        chunk = values[:, start:start + block]
+        powers = decay ** np.arange(1, chunk.shape[1] + 1)
+        scaled = np.cumsum(chunk / powers, axis=1) / divisor
+        result[:, start + 1:start + 1 + chunk.shape[1]] = powers * (result[:, [start]] + scaled)
+    return result
+
+
+class MovingAverage:
+    """简单移动平均"""
+
+    __slots__ = ('window', 'buffer', 'total')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buffer = RingBuffer(window)
+        self.total = 0.0
+
+    def update(self, value: float) -> float:
+        dropped = self.buffer.append(value)
+        self.total += value
+        if dropped is not None:
+            self.total -= dropped
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.buffer.full
+
+    @property
+    def value(self) -> float:
+        return self.total / len(self.buffer) if len(self.buffer) else math.nan
+
+    @staticmethod
+    def compute(values: np.ndarray, window: int) -> np.ndarray:
+        return _rolling(values, window, np.mean)
+
+
+class RollingStd:
+    """滑动总体标准差（Welford算法，支持移出旧值）"""
+
+    __slots__ = ('window', 'buffer', 'mean', 'm2')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.buffer = RingBuffer(window)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value: float) -> float:
+        dropped = self.buffer.append(value)
+        count = len(self.buffer)
+        if dropped is None:
+            delta = value - self.mean
+            self.mean += delta / count
+            self.m2 += delta * (value - self.mean)
+        else:
+            old_mean = self.mean
+            self.mean += (value - dropped) / count
+            self.m2 = max(self.m2 + (value - dropped) * (value - self.mean + dropped - old_mean), 0.0)
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.buffer.full
+
+    @property
+    def value(self) -> float:
+        return math.sqrt(self.m2 / len(self.buffer)) if len(self.buffer) else math.nan
+
+    @staticmethod
+    def compute(values: np.ndarray, window: int) -> np.ndarray:
+        return _rolling(values, window, np.std)
+
+
+class RateOfChange:
+    """变动率（动量）：(x[t] - x[t-period]) / x[t-period]"""
+
+    __slots__ = ('period', 'buffer')
+
+    def __init__(self, period: int):
+        self.period = period
+        self.buffer = RingBuffer(period + 1)
+
+    def update(self, value: float) -> float:
+        self.buffer.append(value)
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.buffer.full
+
+    @property
+    def value(self) -> float:
+        if not self.buffer.full:
+            return math.nan
+        base = self.buffer[0]
+        return (self.buffer[-1] - base) / base if base != 0 else math.nan
+
+    @staticmethod
+    def compute(values: np.ndarray, period: int) -> np.ndarray:
+        result = np.full(values.shape, np.nan)
+        if period < values.shape[1]:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result[:, period:] = (values[:, period:] - values[:, :-period]) / values[:, :-period]
+        return result
+
+
+class EMA:
+    """指数移动平均，alpha = 2 / (span + 1)，以首个值为初值"""
+
+    __slots__ = ('span', 'alpha', 'count', '_value')
+
+    def __init__(self, span: int):
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.count = 0
+        self._value = math.nan
+
+    def update(self, value: float) -> float:
+        self._value = value if self.count == 0 else self._value + self.alpha * (value - self._value)
+        self.count += 1
+        return self._value
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.span
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    @staticmethod
+    def compute(values: np.ndarray, span: int) -> np.ndarray:
+        if values.shape[1] == 0:
+            return np.full(values.shape, np.nan)
+        return _smooth(values[:, 0], values[:, 1:], (span - 1) / (span + 1), (span + 1) / 2)
+
+
+class RSI:
+    """
+    相对强弱指标（Wilder平滑）
+
+    前period个价格变动取均值作为初始平均涨跌幅，之后每根K线递推
+    """
+
+    __slots__ = ('period', 'changes', 'previous', 'avg_gain', 'avg_loss')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.changes = 0
+        self.previous = math.nan
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, price: float) -> float:
+        if not math.isnan(self.previous):
+            self.avg_gain, self.avg_loss = self._next(price)
+            self.changes += 1
+        self.previous = price
+        return self.value
+
+    def _next(self, price: float) -> Tuple[float, float]:
+        delta = price - self.previous
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        if self.changes < self.period:
+            # 初始阶段累加，满period个变动时取均值
+            avg_gain, avg_loss = self.avg_gain + gain, self.avg_loss + loss
+            if self.changes + 1 == self.period:
+                avg_gain, avg_loss = avg_gain / self.period, avg_loss / self.period
+            return avg_gain, avg_loss
+        return ((self.avg_gain * (self.period - 1) + gain) / self.period,
+                (self.avg_loss * (self.period - 1) + loss) / self.period)
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        return 100 - (100 / (1 + avg_gain / (avg_loss + 1e-10)))  # 避免除零
+
+    @property
+    def ready(self) -> bool:
+        return self.changes >= self.period
+
+    @property
+    def value(self) -> float:
+        """当前RSI，初始阶段为NaN"""
+        return self._rsi(self.avg_gain, self.avg_loss) if self.ready else math.nan
+
+    def preview(self, price: float) -> float:
+        """以price作为下一根K线（如盘中最新价）计算RSI，不改变状态"""
+        if math.isnan(self.previous) or self.changes + 1 < self.period:
+            return math.nan
+        return self._rsi(*self._next(price))
+
+    @staticmethod
+    def compute(prices: np.ndarray, period: int = 14) -> np.ndarray:
+        """前period列为NaN"""
+        rsi = np.full(prices.shape, np.nan)
+        if prices.shape[1] <= period:
+            return rsi
+        deltas = np.diff(prices, axis=1)
+        gains = np.where(deltas > 0, deltas, 0)
+        losses = np.where(deltas < 0, -deltas, 0)
+        decay = (period - 1) / period
+        avg_gains = _smooth(np.mean(gains[:, :period], axis=1), gains[:, period:], decay, period)
+        avg_losses = _smooth(np.mean(losses[:, :period], axis=1), losses[:, period:], decay, period)
+        rsi[:, period:] = RSI._rsi(avg_gains, avg_losses)
+        return rsi
+
+
+class ATR:
+    """
+    平均真实波幅（Wilder平滑）
+
+    首根K线的真实波幅为high-low，前period个真实波幅取均值作为初值
+    """
+
+    __slots__ = ('period', 'count', 'prev_close', 'total', '_value')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self.prev_close = math.nan
+        self.total = 0.0
+        self._value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = high - low
+        if not math.isnan(self.prev_close):
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+        if self.count < self.period:
+            self.total += true_range
+        elif self.count == self.period:
+            self._value = (self.total + true_range) / self.period
+        else:
+            self._value = (self._value * (self.period - 1) + true_range) / self.period
+        return self._value
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    @staticmethod
+    def compute(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+        """前period-1列为NaN"""
+        result = np.full(close.shape, np.nan)
+        if close.shape[1] < period:
+            return result
+        true_range = high - low
+        previous = close[:, :-1]
+        true_range[:, 1:] = np.maximum(true_range[:, 1:],
+                                       np.maximum(np.abs(high[:, 1:] - previous), np.abs(low[:, 1:] - previous)))
+        result[:, period - 1:] = _smooth(np.mean(true_range[:, :period], axis=1), true_range[:, period:],
+                                         (period - 1) / period, period)
+        return result
+
+
+class Bollinger:
+    """布林带：中轨为滑动均值，上下轨为中轨加减num_std倍滑动标准差"""
+
+    __slots__ = ('window', 'num_std', 'std')
+
+    def __init__(self, window: int = 20, num_std: float = 2.0):
+        self.window = window
+        self.num_std = num_std
+        self.std = RollingStd(window)
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        self.std.update(value)
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.std.ready
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        """中轨、上轨、下轨"""
+        if not len(self.std.buffer):
+            return math.nan, math.nan, math.nan
+        middle, width = self.std.mean, self.num_std * self.std.value
+        return middle, middle + width, middle - width
+
+    @staticmethod
+    def compute(values: np.ndarray, window: int = 20,
+                num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        middle = MovingAverage.compute(values, window)
+        width = num_std * RollingStd.compute(values, window)
+        return middle, middle + width, middle - width
+
+
+class VWAP:
+    """成交量加权均价，自创建或reset()起累计"""
+
+    __slots__ = ('amount', 'volume')
+
+    def __init__(self):
+        self.amount = 0.0
+        self.volume = 0.0
+
+    def reset(self):
+        self.amount = 0.0
+        self.volume = 0.0
+
+    def update(self, price: float, volume: float) -> float:
+        self.amount += price * volume
+        self.volume += volume
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.volume > 0
+
+    @property
+    def value(self) -> float:
+        return self.amount / self.volume if self.volume > 0 else math.nan
+
+    @staticmethod
+    def compute(prices: np.ndarray, volumes: np.ndarray) -> np.ndarray:
+        """按列累计的VWAP，累计成交量为0的位置为NaN"""
+        volume = np.cumsum(volumes, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(volume > 0, np.cumsum(prices * volumes, axis=1) / volume, np.nan)
@@ -0,0 +1,119 @@
+# coding=utf-8
+import math
+from typing import Callable, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from utils.indicators import RSI, MovingAverage, RingBuffer, RollingStd
+
+
+class RollingStats:
+    """
+    单个标的的在线滚动统计
+
+    价格保存在容量为capacity的环形缓冲区中，另按窗口维护滑动均值与收益率滑动标准差，
+    每根新K线O(1)更新、O(1)读取
+    """
+
+    __slots__ = ('prices', 'means', 'return_stats')
+
+    def __init__(self, capacity: int, mean_windows: Sequence[int] = (), return_windows: Sequence[int] = ()):
+        self.prices = RingBuffer(capacity)
+        self.means: Dict[int, MovingAverage] = {window: MovingAverage(window) for window in mean_windows}
+        self.return_stats: Dict[int, RollingStd] = {window: RollingStd(window) for window in return_windows}
+
+    def update(self, price: float):
+        """追加一根K线的价格"""
+        if len(self.prices) > 0 and self.return_stats:
+            previous = self.prices[-1]
+            value = (price - previous) / previous if previous != 0 else math.nan
+            for stats in self.return_stats.values():
+                stats.update(value)
+        for average in self.means.values():
+            average.update(price)
+        self.prices.append(price)
+
+    @property
+    def count(self) -> int:
+        """缓冲区中的K线数量，最多为capacity"""
+        return len(self.prices)
+
+    @property
+    def last(self) -> float:
+        return self.prices[-1]
+
+    def lag(self, k: int) -> float:
+        """k根K线之前的价格"""
+        return self.prices[-k - 1]
+
+    def mean(self, window: int) -> float:
+        """最近window根（不足时为全部）K线的均价"""
+        return self.means[window].value
+
+    def return_std(self, window: int) -> float:
+        """最近window个（不足时为全部）收益率的总体标准差"""
+        return self.return_stats[window].value
+
+
+class RollingStatsRegistry:
+    """
+    按标的维护RollingStats、RSI等增量指标
+
+    供流式信号引擎使用：以K线eob判断新增的K线，每根推送的K线只追加一次；
+    首次同步或状态与最近的K线窗口不衔接时由窗口重建
+    """
+
+    def __init__(self, factory: Callable[[], Union[RollingStats, RSI]]):
+        self._factory = factory
+        self._states: Dict[str, RollingStats] = {}
+        self._last_eobs: Dict[str, int] = {}
+
+    def sync(self, symbol: str, eobs: np.ndarray, prices: np.ndarray) -> Union[RollingStats, RSI]:
+        """
+        用最近的K线窗口同步标的状态
+
+        Args:
+            eobs: K线结束时间（UTC纳秒），升序
+            prices: 对应的价格
+        """
+        stats = self._states.get(symbol)
+        last_eob = self._last_eobs.get(symbol)
+        if len(eobs) == 0:
+            if stats is None:
+                stats = self._states[symbol] = self._factory()
+            return stats
+        if stats is None or last_eob is None or last_eob < eobs[0] or last_eob > eobs[-1]:
+            stats = self._factory()
+            for price in prices:
+                stats.update(float(price))
+            self._states[symbol] = stats
+        else:
+            start = int(np.searchsorted(eobs, last_eob, side='right'))
+            for price in prices[start:]:
+                stats.update(float(price))
+        self._last_eobs[symbol] = int(eobs[-1])
+        return stats
+
+    def push(self, symbol: str, eob: int, price: float) -> Optional[Union[RollingStats, RSI]]:
+        """追加一根推送的K线，标的未同步过或K线不晚于已同步的K线时返回None"""
+        stats = self._states.get(symbol)
+        if stats is None:
+            return None
+        last_eob = self._last_eobs.get(symbol)
+        if last_eob is not None and eob <= last_eob:
+            return None
+        stats.update(price)
+        self._last_eobs[symbol] = eob
+        return stats
+
+    def remove(self, symbol: str):
+        self._states.pop(symbol, None)
+        self._last_eobs.pop(symbol, None)
+
+    def clear(self):
+        self._states.clear()
+        self._last_eobs.clear()
+
+    def __len__(self) -> int:
+        return len(self._states)
+